@@ -0,0 +1,164 @@
+"""
+==============
+associations.py
+==============
+
+Streaming lookup of the collections associated to a CMR UMM-S service or UMM-T tool, and an
+incremental diff of those associations against a snapshot of the last lookup.
+"""
+
+import json
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+PAGE_SIZE = 2000
+# Overlap between updated_since windows, for clock skew between here and CMR
+UPDATED_SINCE_MARGIN = timedelta(minutes=5)
+
+
+def _headers(authorization: Optional[str]) -> dict:
+    return {"Authorization": authorization} if authorization else {}
+
+
+def iter_associations(cmr_env: str, concept_id: str, umm_type: str = "service", authorization: Optional[str] = None,
+                      page_size: int = PAGE_SIZE, session: Optional[requests.Session] = None,
+                      updated_since: Optional[str] = None) -> Iterator[str]:
+    """
+    Yield the concept ids of the collections associated to a service or tool, one CMR page at a time.
+
+    Pages are requested in the CMR reference format, which only carries the id, name and revision
+    of each collection, and are followed with the CMR-Search-After header so nothing is truncated
+    past page_size.
+
+    Parameters
+    ----------
+    cmr_env : string CMR search url prefix, e.g. cmr.queries.CMR_OPS
+    concept_id : string concept id of the service or tool
+    umm_type : string service or tool
+    authorization : string optional Authorization header value, e.g. "Bearer <EDL token>" or a
+        Launchpad token, sent as given
+    page_size : int collections per request, at most 2000
+    session : requests.Session optional session to reuse connections
+    updated_since : string optional ISO 8601 time, to only list collections updated since then
+
+    Returns
+    -------
+    Iterator of collection concept ids
+    """
+    session = session or requests.Session()
+    params = {f"{umm_type}_concept_id": concept_id, "page_size": page_size}
+    if updated_since:
+        params["updated_since"] = updated_since
+    headers = _headers(authorization)
+    while True:
+        response = session.get(f"{cmr_env}collections.xml", params=params, headers=headers, timeout=60)
+        response.raise_for_status()
+        ids = [element.text for element in ET.fromstring(response.content).iter("id")]
+        yield from ids
+        search_after = response.headers.get("CMR-Search-After")
+        if not search_after or len(ids) < page_size:
+            return
+        headers = {**headers, "CMR-Search-After": search_after}
+
+
+def association_hits(cmr_env: str, concept_id: str, umm_type: str = "service", authorization: Optional[str] = None,
+                     session: Optional[requests.Session] = None, collection_ids: Optional[List[str]] = None) -> int:
+    """
+    Number of collections associated to a service or tool, without listing them. With
+    collection_ids, only those of them that are still associated are counted.
+    """
+    session = session or requests.Session()
+    params = {f"{umm_type}_concept_id": concept_id, "page_size": 0}
+    if collection_ids is None:
+        response = session.get(f"{cmr_env}collections.xml", params=params, headers=_headers(authorization), timeout=60)
+    else:
+        # Posted as a form, as thousands of ids do not fit in a URL
+        response = session.post(f"{cmr_env}collections.xml", data={**params, "concept_id[]": collection_ids},
+                                headers=_headers(authorization), timeout=60)
+    response.raise_for_status()
+    return int(response.headers["CMR-Hits"])
+
+
+def diff_sorted(old: Iterable[str], new: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """
+    Added and removed ids between two sorted sequences, in a single pass over both.
+
+    Returns
+    -------
+    (added, removed) lists of string
+    """
+    added, removed = [], []
+    old, new = iter(old), iter(new)
+    old_id, new_id = next(old, None), next(new, None)
+    while old_id is not None or new_id is not None:
+        if new_id is None or (old_id is not None and old_id < new_id):
+            removed.append(old_id)
+            old_id = next(old, None)
+        elif old_id is None or new_id < old_id:
+            added.append(new_id)
+            new_id = next(new, None)
+        else:
+            old_id, new_id = next(old, None), next(new, None)
+    return added, removed
+
+
+def load_snapshot(path: str) -> Optional[dict]:
+    """The last association lookup saved by save_snapshot, or None when there is none."""
+    try:
+        with open(path, encoding='utf-8') as snapshot_file:
+            return json.load(snapshot_file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_snapshot(path: str, snapshot: dict) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as snapshot_file:
+        json.dump(snapshot, snapshot_file)
+    os.replace(tmp_path, path)
+
+
+def refresh_associations(cmr_env: str, concept_id: str, umm_type: str = "service", authorization: Optional[str] = None,
+                         snapshot: Optional[dict] = None, max_age: Optional[timedelta] = None,
+                         session: Optional[requests.Session] = None) -> dict:
+    """
+    Current associations of a service or tool as a new snapshot.
+
+    With a snapshot of the same service or tool younger than max_age, only the collections
+    updated since the snapshot are listed and merged in. The result is then checked with two
+    counts: every collection of the snapshot must still be associated, and the association count
+    in CMR must match. Counting the total alone would miss an association removed while another
+    was added. Removed associations, or any other mismatch, fall back to listing every association.
+
+    Returns
+    -------
+    snapshot dict with concept_id, updated, full_refresh (time of the last full listing), mode
+    (full or incremental) and the sorted associations
+    """
+    session = session or requests.Session()
+    started = datetime.now(timezone.utc)
+    updated = (started - UPDATED_SINCE_MARGIN).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    if snapshot and snapshot.get("concept_id") == concept_id and snapshot.get("full_refresh"):
+        age = started - datetime.fromisoformat(snapshot["full_refresh"])
+        if max_age is None or age < max_age:
+            changed = iter_associations(cmr_env, concept_id, umm_type, authorization, session=session,
+                                        updated_since=snapshot["updated"])
+            previous = snapshot["associations"]
+            associations = sorted(set(previous).union(changed))
+            none_removed = not previous or association_hits(cmr_env, concept_id, umm_type, authorization, session,
+                                                            collection_ids=previous) == len(previous)
+            if none_removed and association_hits(cmr_env, concept_id, umm_type, authorization, session) == len(associations):
+                return {"concept_id": concept_id, "updated": updated, "full_refresh": snapshot["full_refresh"],
+                        "mode": "incremental", "associations": associations}
+
+    associations = sorted(set(iter_associations(cmr_env, concept_id, umm_type, authorization, session=session)))
+    return {"concept_id": concept_id, "updated": updated, "full_refresh": updated, "mode": "full",
+            "associations": associations}
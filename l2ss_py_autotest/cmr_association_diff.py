@@ -11,12 +11,22 @@ See usage information by running cmr_association_diff.py -h
 
 python cmr_association_diff.py -e uat -t tool -a hitide_uat_associations.txt -p POCLOUD -n hitide
 python cmr_association_diff.py -c TL1240538128-POCLOUD -e uat -t tool -a hitide_uat_associations.txt
+
+With --snapshot, the CMR association list is kept between runs and only collections updated
+since the last run are requested, with a full listing every --full_refresh_hours:
+
+python cmr_association_diff.py -e ops -t service -p POCLOUD -n 'PODAAC L2 Cloud Subsetter' -a ops/ -s ops_snapshot.json
 """
 
 import json
 import argparse
 import cmr
 import os.path
+import sys
+from datetime import timedelta
+
+from l2ss_py_autotest.associations import (diff_sorted, iter_associations, load_snapshot, refresh_associations,
+                                           save_snapshot)
 
 
 def pull_concept_id(cmr_env, provider, umm_name, umm_type):
@@ -58,7 +68,7 @@ def cmr_environment(env):
     Determine ops or uat url prefix based on env string
     Parameters
     ----------
-    env : string uat or ops
+    env : string uat, ops or local
 
     Returns
     -------
@@ -70,8 +80,11 @@ def cmr_environment(env):
     # CMR UAT (User Acceptance Testing)
     elif env.lower() == 'uat':
         return cmr.queries.CMR_UAT
+    # Mock services from tests/mock_services.py
+    elif env.lower() == 'local':
+        return os.environ.get('L2SS_MOCK_URL', 'http://localhost:3000').rstrip('/') + '/search/'
     else:
-        raise Exception('CMR environment selection not recognized, select uat or ops.')
+        raise Exception('CMR environment selection not recognized, select uat, ops or local.')
 
 
 def current_association(concept_id, cmr_env, umm_type, token):
@@ -82,20 +95,14 @@ def current_association(concept_id, cmr_env, umm_type, token):
     concept_id : string concept id of umm_type
     cmr_env : string url prefix
     umm_type: string tool or service
+    token: string sent as the Authorization header as given, like python-cmr's .token()
 
     Returns
     -------
     List of string with concept id or exception
     """
 
-    cmr_query = cmr.queries.CollectionQuery(mode=cmr_env)
-
-    if umm_type == "tool":
-        results = cmr_query.tool_concept_id(concept_id).token(token).get()
-    elif umm_type == "service":
-        results = cmr_query.service_concept_id(concept_id).token(token).get()
-
-    return [res.get('id') for res in results]
+    return list(iter_associations(cmr_env, concept_id, umm_type, token))
 
 
 def parse_args():
@@ -119,8 +126,8 @@ def parse_args():
     parser.add_argument('-e', '--env',
                         help='CMR environment used to pull results from.',
                         required=True,
-                        choices=["uat", "ops"],
-                        metavar='uat or ops')
+                        choices=["uat", "ops", "local"],
+                        metavar='uat, ops or local')
 
     parser.add_argument('-p', '--provider',
                         help='Provider of the umm',
@@ -151,6 +158,23 @@ def parse_args():
                         required=False,
                         default=None)
 
+    parser.add_argument('-r', '--removed_file',
+                        help='File to output associations removed from CMR to',
+                        required=False,
+                        default=None)
+
+    parser.add_argument('-s', '--snapshot',
+                        help='File keeping the CMR association list between runs. When set,'
+                             ' only collections updated since the last run are requested.',
+                        required=False,
+                        default=None)
+
+    parser.add_argument('-f', '--full_refresh_hours',
+                        help='Hours after which the whole association list is requested again'
+                             ' even with a snapshot',
+                        type=float,
+                        default=24)
+
     parser.add_argument('-to', '--token',
                         help='CMR UMM token string.',
                         default=None,
@@ -196,14 +220,29 @@ def run():
             raise Exception(f"Could not retrieve umm {umm_type} using concept_id {concept_id}")
 
     if os.path.isdir(association_file):
-        collections = [os.listdir(association_file)]
+        collections = os.listdir(association_file)
     else:
         with open(association_file) as file:  # pylint: disable=W1514
             collections = [x.strip() for x in file.readlines()]
-
-    current_concept_ids = current_association(concept_id, cmr_env, umm_type, current_token)
-
-    new_associations = list(set(current_concept_ids) - set(collections))
+    collections = sorted({x for x in collections if x})
+
+    if _args.snapshot:
+        snapshot = refresh_associations(cmr_env, concept_id, umm_type, current_token,
+                                        load_snapshot(_args.snapshot),
+                                        timedelta(hours=_args.full_refresh_hours))
+        save_snapshot(_args.snapshot, snapshot)
+        current_concept_ids = snapshot["associations"]
+        print(f"{snapshot['mode']} association refresh: {len(current_concept_ids)} associations",
+              file=sys.stderr)
+    else:
+        current_concept_ids = sorted(set(current_association(concept_id, cmr_env, umm_type, current_token)))
+
+    new_associations, removed_associations = diff_sorted(collections, current_concept_ids)
+    if removed_associations:
+        print(f"No longer associated in CMR: {json.dumps(removed_associations)}", file=sys.stderr)
+        if _args.removed_file:
+            with open(_args.removed_file, 'w', encoding='utf-8') as removed_file:
+                json.dump(removed_associations, removed_file, ensure_ascii=False, indent=4)
     if new_associations:
         if _args.output_file:
             with open(_args.output_file, 'w', encoding='utf-8') as output_file:
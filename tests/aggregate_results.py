@@ -2,13 +2,19 @@ import glob
 import json
 import os
 import requests
-import time
 import re
 import textwrap
 import yaml
+from contextlib import closing
 from datetime import datetime
 from podaac_agents.agents.stack_trace_agent import stack_trace_agent
 import cmr
+import collection_lookup
+import failure_rules
+import failure_summaries
+import github_sync
+from l2ss_py_autotest.associations import iter_associations
+import results_store
 from token_utils import fetch_bearer_token_by_provider
 
 # Load DAAC assignees from config file
@@ -40,24 +46,19 @@ def get_associations(token, env):
     mode = cmr.queries.CMR_UAT
     if env.lower() == "ops":
         mode = cmr.queries.CMR_OPS
-
-    headers = {
-        "Authorization": f"Bearer {token}"
-    }
+    elif env.lower() == "local":
+        import mock_services
+        mode = mock_services.cmr_url()
 
     service_concept_id = cmr.queries.ServiceQuery(mode=mode).provider('POCLOUD').name('PODAAC L2 Cloud Subsetter').get()[0].get('concept_id')
-    url = cmr.queries.CollectionQuery(mode=mode).service_concept_id(service_concept_id)._build_url()
     print(f"[get_associations] env={env}, service_concept_id={service_concept_id}")
-    print(f"[get_associations] url={url}")
-    resp = requests.get(url, headers=headers, params={'page_size': 2000})
-    print(f"[get_associations] response status={resp.status_code}")
-    if resp.status_code != 200:
-        print(f"[get_associations] response body (first 500 chars): {resp.text[:500]}")
+    try:
+        collections = list(iter_associations(mode, service_concept_id, "service", f"Bearer {token}" if token else None))
+    except requests.RequestException as e:
+        print(f"[get_associations] request failed: {e}")
+        if getattr(e, "response", None) is not None:
+            print(f"[get_associations] response body (first 500 chars): {e.response.text[:500]}")
         return []
-    data = resp.json()
-    collections_query = data.get('feed', {}).get('entry', [])
-    print(f"[get_associations] entries returned={len(collections_query)}")
-    collections = [a.get('id') for a in collections_query]
     if collections:
         print(f"[get_associations] sample ids (first 3): {collections[:3]}")
     print(f"[get_associations] total collection ids={len(collections)}")
@@ -65,105 +66,6 @@ def get_associations(token, env):
     return collections
 
 
-def create_github_issue(repo, token, title, body, labels=None, assignees=None):
-    url = f"https://api.github.com/repos/{repo}/issues"
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github+json"
-    }
-    data = {
-        "title": title,
-        "body": body,
-    }
-    if labels:
-        data["labels"] = labels
-
-    if assignees:
-        data["assignees"] = assignees
-
-    response = requests.post(url, headers=headers, json=data)
-    if response.status_code == 201:
-        print(f"Created issue: {title}")
-    else:
-        print(f"Failed to create issue: {title} (status {response.status_code})\n{response.text}")
-
-
-def get_github_issue_by_title(repo, token, title, max_retries=5, delay=2):
-    url = f"https://api.github.com/repos/{repo}/issues"
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github+json"
-    }
-    # Search both open and closed issues
-    for state in ["open", "closed"]:
-        params = {"state": state, "per_page": 100}
-        for attempt in range(1, max_retries + 1):
-            try:
-                response = requests.get(url, headers=headers, params=params, timeout=10)
-                if response.status_code == 200:
-                    issues = response.json()
-                    for issue in issues:
-                        if issue.get("title") == title:
-                            # If closed, reopen it
-                            if issue.get("state") == "closed":
-                                issue_number = issue["number"]
-                                reopen_url = f"https://api.github.com/repos/{repo}/issues/{issue_number}"
-                                reopen_data = {"state": "open"}
-                                reopen_resp = requests.patch(reopen_url, headers=headers, json=reopen_data)
-                                if reopen_resp.status_code == 200:
-                                    print(f"Reopened closed issue: {title}")
-                                else:
-                                    print(f"Failed to reopen issue: {title} (status {reopen_resp.status_code})\n{reopen_resp.text}")
-                                # Refresh issue data after reopening
-                                response2 = requests.get(reopen_url, headers=headers)
-                                if response2.status_code == 200:
-                                    return response2.json()
-                                else:
-                                    return issue
-                            return issue
-                    # If not found, wait and retry
-                    if attempt < max_retries:
-                        print(f"Issue with title '{title}' not found in state '{state}', retrying ({attempt}/{max_retries})...")
-                        time.sleep(delay)
-                else:
-                    print(f"Failed to fetch issues (attempt {attempt}, state {state}): {response.status_code}\n{response.text}")
-            except Exception as e:
-                print(f"Exception fetching issues (attempt {attempt}, state {state}): {e}")
-            if attempt < max_retries:
-                time.sleep(delay)
-    return None
-
-
-def create_or_update_github_issue(repo, token, title, body, labels=None, issue_number=None, assignees=None):
-    if issue_number is None:
-        existing_issue = get_github_issue_by_title(repo, token, title)
-    else:
-        existing_issue = {
-            "number" : issue_number
-        }
-    if existing_issue:
-        issue_number = existing_issue["number"]
-        url = f"https://api.github.com/repos/{repo}/issues/{issue_number}"
-        headers = {
-            "Authorization": f"token {token}",
-            "Accept": "application/vnd.github+json"
-        }
-        data = {"body": body}
-        if labels:
-            data["labels"] = labels
-
-        if assignees:
-            data["assignees"] = assignees
-
-        response = requests.patch(url, headers=headers, json=data)
-        if response.status_code == 200:
-            print(f"Updated issue: {title}")
-        else:
-            print(f"Failed to update issue: {title} (status {response.status_code})\n{response.text}")
-    else:
-        create_github_issue(repo, token, title, body, labels=labels, assignees=assignees)
-
-
 def format_message(msg, max_lines=30):
     import re
     msg = msg.replace("\\n", "\n")
@@ -178,19 +80,7 @@ def extract_labels_from_message(message):
     """
     Extract GitHub labels from a failed test message.
     """
-    labels = []
-    message = str(message or "")
-    if "No granules found" in message:
-        labels.append("No Granules")
-    if "There are no umm-v associated with this collection" in message:
-        labels.append("No UMM-V")
-    if re.search(r"Failed: Timeout \(>\d+(\.\d+)?s\) from pytest-timeout", message):
-        labels.append("Timeout")
-    if "Unable to download" in message:
-        labels.append("Forbidden")
-    if "Could not determine time variable" in message:
-        labels.append("No Time Var")
-    return labels
+    return failure_rules.labels(message)
 
 
 def bedrock_summarize_error(runtime, error_message):
@@ -317,7 +207,7 @@ def bedrock_suggest_solution_anthropic(runtime, error_message):
     return clean_answer
 
 
-def create_aggregated_github_issue(repo, token, all_failures, env, collection_names, no_associations=None):
+def create_aggregated_github_issue(client, all_failures, env, collection_names, no_associations=None):
     title = f"Aggregated Regression Failures {env}"
     timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
 
@@ -336,7 +226,9 @@ def create_aggregated_github_issue(repo, token, all_failures, env, collection_na
         # Ensure links are valid URLs or empty
         job_url_str = f"[regression]({job_url})" if job_url and job_url.startswith('http') else ''
         issue_url_str = f"[issue]({issue_url})" if issue_url and issue_url.startswith('http') else ''
-        line = f"- `{concept_id}` ({short_name}) –– {test_type} –– {issue_url_str} {summary}".strip()
+        # Collection issues are only rewritten when their failure changes, so this line is where the latest
+        # run that saw the failure is linked
+        line = f"- `{concept_id}` ({short_name}) –– {test_type} –– {issue_url_str} {job_url_str} {summary}".strip()
         body_lines.append(line)
     
     if no_associations:
@@ -347,124 +239,24 @@ def create_aggregated_github_issue(repo, token, all_failures, env, collection_na
     
     body = "\n".join(body_lines)
 
+    labels = ["regression-aggregated", TEAM_TVA_LABEL]
     if env == "UAT":
-        issue_number = "3919"
+        plan = github_sync.IssuePlan()
+        issue_number = 3919
     elif env == "OPS":
-        issue_number = "3973"
+        plan = github_sync.IssuePlan()
+        issue_number = 3973
     else:
+        plan = github_sync.IssuePlan(github_sync.IssueCatalog.fetch(client, labels[0]))
         issue_number = None
-    labels = ["regression-aggregated", TEAM_TVA_LABEL]
-    create_or_update_github_issue(repo, token, title, body, labels=labels, issue_number=issue_number)
-
-
-def get_all_regression_failure_issues(repo, token, label, state="open", max_pages=10):
-    """
-    Fetch all issues with the label 'regression-failure' from the given repo.
-    :param repo: GitHub repo in 'owner/repo' format
-    :param token: GitHub token
-    :param state: 'open', 'closed', or 'all' (default)
-    :param max_pages: Max number of pages to fetch (pagination)
-    :return: List of issues with the label 'regression-failure'
-    """
-    url = f"https://api.github.com/repos/{repo}/issues"
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github+json"
-    }
-    issues = []
-    page = 1
-    while page <= max_pages:
-        params = {
-            "state": state,
-            "labels": label,
-            "per_page": 100,
-            "page": page
-        }
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        if response.status_code == 200:
-            page_issues = response.json()
-            if not page_issues:
-                break
-            issues.extend(page_issues)
-            if len(page_issues) < 100:
-                break  # Last page
-            page += 1
-        else:
-            print(f"Failed to fetch regression-failure issues (page {page}): {response.status_code}\n{response.text}")
-            break
-    return issues
+    plan.upsert(title, body, labels=labels, number=issue_number)
+    github_sync.sync_issues(client, plan)
 
 
 def get_collection_names(providers, env, collections_list):
-
-    lower_env = env.lower()
-
-    if lower_env == "uat":
-        url = "https://graphql.uat.earthdata.nasa.gov/api"
-    elif lower_env == "ops":
-        url = "https://graphql.earthdata.nasa.gov/api"
-
+    """Short names of the given collections, keyed by concept id."""
     token = bearer_token(env, os.environ.get("CMR_TOKEN_PROVIDER", "direct").lower())
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
-
-    # Get providers
-    collections = {}
-
-    for provider in providers:
-
-        offset = 0
-        more_data = True
-        while more_data:
-
-            try:
-
-                # Define your GraphQL query
-                graphql_query_template = """
-                    query {{
-                      collections(provider: "{provider}", limit: 2000, offset: {offset}) {{
-                        items {{
-                          conceptId
-                          shortName
-                        }}
-                      }}
-                    }}
-                """
-
-                graphql_query = graphql_query_template.format(
-                    provider=provider, offset=offset)
-
-                # Create the request payload
-                payload = {"query": graphql_query}
-
-                # Make the GraphQL request with headers
-                response = requests.post(url, headers=headers, json=payload)
-                # Check the status code
-                if response.status_code == 200:
-                    # Parse the JSON response
-                    data = response.json().get('data').get('collections').get('items')
-
-                    for item in data:
-                        concept_id = item.get('conceptId')
-                        if concept_id in collections_list:
-                            collections[concept_id] = item.get("shortName")
-
-                    if len(data) < 2000:
-                        more_data = False
-                    else:
-                        offset += 2000
-                else:
-                    more_data = False
-                    print(f"Error: {response.status_code}\n{response.text}")
-
-            except Exception as ex:
-                print(f"Error: {ex}")
-                more_data = False
-
-    return collections
+    return collection_lookup.lookup_short_names(env, collections_list, f"Bearer {token}")
 
 
 # -----------------------------------------------------------------------------
@@ -485,14 +277,8 @@ def load_current_associations(token, env):
     return set(raw)
 
 
-def collect_concept_ids_and_providers(job_status_files):
-    """
-    First pass over failed job status files: parse the failure reason JSON and
-    collect unique concept_ids and providers. Used to fetch collection short
-    names from GraphQL and to know which collections we care about.
-    """
-    collection_concept_id = []
-    providers = []
+def iter_failures(job_status_files):
+    """Failure entries of the failed job status files whose reason is the failure JSON."""
     for fpath in job_status_files:
         with open(fpath) as f:
             data = json.load(f)
@@ -500,19 +286,63 @@ def collect_concept_ids_and_providers(job_status_files):
             reason = data.get("reason", "")
             try:
                 reason_json = json.loads(reason)
-                if isinstance(reason_json, dict) and "failed" in reason_json:
-                    for fail in reason_json["failed"]:
-                        concept_id = fail.get("concept_id", "")
-                        if concept_id and concept_id not in collection_concept_id:
-                            collection_concept_id.append(concept_id)
-                            provider = concept_id.split("-")[1]
-                            if provider not in providers:
-                                providers.append(provider)
             except Exception:
-                pass
+                continue
+            if isinstance(reason_json, dict) and "failed" in reason_json:
+                yield from reason_json["failed"]
+
+
+def collect_concept_ids_and_providers(job_status_files):
+    """
+    First pass over failed job status files: parse the failure reason JSON and
+    collect unique concept_ids and providers. Used to fetch collection short
+    names from GraphQL and to know which collections we care about.
+    """
+    collection_concept_id = []
+    providers = []
+    for fail in iter_failures(job_status_files):
+        concept_id = fail.get("concept_id", "")
+        if concept_id and concept_id not in collection_concept_id:
+            collection_concept_id.append(concept_id)
+            provider = concept_id.split("-")[1]
+            if provider not in providers:
+                providers.append(provider)
     return collection_concept_id, providers
 
 
+def agent_summary(message):
+    """stack_trace_agent summaries and suggested solution of one failure message."""
+    output = stack_trace_agent(message).structured_output
+    return {
+        "short_summary": output.short_summary,
+        "detailed_summary": output.detailed_summary,
+        "suggested_solution": output.suggested_solution,
+    }
+
+
+def summarize_failures(job_status_files, current_associations):
+    """
+    Summarize the failures of associated collections before the issues are built, keyed by
+    failure_summaries.traceback_key. Failures recognized by failure_rules are left out, since
+    their rule gives the summary. Failures sharing a traceback are only summarized once,
+    previously summarized tracebacks come from the summary cache, and the rest run concurrently.
+    """
+    messages = [
+        format_message(fail.get("message", ""))
+        for fail in iter_failures(job_status_files)
+        if fail.get("concept_id", "") in current_associations
+    ]
+    unclassified = [message for message in messages if not failure_rules.classify(message)]
+    print(f"{len(messages) - len(unclassified)} of {len(messages)} failures matched a known failure rule")
+    messages = unclassified
+    return failure_summaries.summarize_all(messages, agent_summary, "stack_trace_agent")
+
+
+def regression_issue_title(env, concept_id, collection_names):
+    short_name = collection_names.get(concept_id, "Unknown Collection")
+    return github_sync.regression_issue_title(env, concept_id, short_name)
+
+
 def build_old_issue_concept_map(old_issues):
     """
     Build a mapping from concept_id to GitHub issue number for existing
@@ -521,12 +351,9 @@ def build_old_issue_concept_map(old_issues):
     """
     mapping = {}
     for issue in old_issues:
-        title = issue.get("title", "")
-        if "|" in title:
-            parts = title.split("|")
-            if len(parts) >= 2:
-                concept_id = parts[1].strip()
-                mapping[concept_id] = issue["number"]
+        key = github_sync.parse_regression_issue_title(issue.get("title", ""))
+        if key:
+            mapping[key[1]] = issue["number"]
     return mapping
 
 
@@ -537,26 +364,30 @@ def process_one_failure(
     collection_names,
     current_associations,
     old_issue_concept_map,
-    repo,
-    token,
+    plan,
     env,
     label,
+    summaries=None,
 ):
     """
     Process a single failure entry from a job's reason JSON.
 
     For collections that are still associated (concept_id in current_associations),
     this will:
-      - call stack_trace_agent to summarize the failure and suggest a solution
-      - create or update the per-collection regression GitHub issue
+      - take the summary and suggested solution from the matching failure_rules, else from
+        summaries (see summarize_failures), or call stack_trace_agent when no summaries are given
+      - plan the create or update of the per-collection regression GitHub issue
       - return a failure_record (for all_failures) and a rich markdown section.
 
     For collections that are no longer associated, this will:
       - NOT call stack_trace_agent (we don't spend LLM calls on non-associated collections)
-      - close any existing regression issue for that concept_id
+      - plan the close of any existing regression issue for that concept_id
       - return no failure_record and a minimal markdown section with just the raw message.
 
-    Returns (failure_record, issue_number, is_no_association, section).
+    plan is the github_sync.IssuePlan collecting the issue changes, or None without GitHub access.
+    Returns (failure_record, issue_number, is_no_association, section). issue_number is the
+    existing issue of the collection, if any; the failure_record issue_url is filled in once the
+    plan has been applied.
     section is the markdown block for the aggregated body; caller uses it to build error_sections.
     """
     fail["message"] = format_message(fail["message"])
@@ -565,28 +396,14 @@ def process_one_failure(
     short_name = collection_names.get(concept_id, "Unknown Collection")
     test_type = fail.get("test_type", "")
 
-    issue_url = None
     issue_number = None
     is_no_association = concept_id not in current_associations
 
     if is_no_association:
         # Track for "no associations" section; close existing issue if any
-        if repo and token and concept_id in old_issue_concept_map:
+        if plan is not None and concept_id in old_issue_concept_map:
             issue_number = old_issue_concept_map[concept_id]
-            close_url = f"https://api.github.com/repos/{repo}/issues/{issue_number}"
-            close_headers = {
-                "Authorization": f"token {token}",
-                "Accept": "application/vnd.github+json",
-            }
-            close_response = requests.patch(
-                close_url, headers=close_headers, json={"state": "closed"}
-            )
-            if close_response.status_code == 200:
-                print(f"Closed issue for concept_id not in associations: {concept_id} (issue #{issue_number})")
-            else:
-                print(
-                    f"Failed to close issue for concept_id {concept_id} (status {close_response.status_code})\n{close_response.text}"
-                )
+            plan.close(issue_number, f"for concept_id not in associations: {concept_id}")
         # Minimal section with just the formatted error message; no LLM summary/solution.
         section = (
             f"### Concept ID: `{concept_id}` | Short Name: `{short_name}` | Test Type: `{test_type}`\n"
@@ -596,12 +413,20 @@ def process_one_failure(
         failure_record = None
         return failure_record, issue_number, is_no_association, section
 
-    # concept_id is in current_associations: create or update GitHub issue
-    response = stack_trace_agent(fail["message"])
-    solution = response.structured_output.suggested_solution
+    # concept_id is in current_associations: plan the create or update of its GitHub issue
+    summary = failure_rules.rule_summary(fail["message"])
+    if summary is None and summaries is None:
+        summary = agent_summary(fail["message"])
+    elif summary is None:
+        summary = summaries.get(failure_summaries.traceback_key(fail["message"])) or {
+            "short_summary": "Summary unavailable",
+            "detailed_summary": "Summary unavailable",
+            "suggested_solution": "",
+        }
+    solution = summary["suggested_solution"]
     wrapped_solution = "\n".join(textwrap.wrap(solution, width=100))
-    short_summary = response.structured_output.short_summary
-    detailed_summary = response.structured_output.detailed_summary
+    short_summary = summary["short_summary"]
+    detailed_summary = summary["detailed_summary"]
     wrapped_detailed_summary = "\n".join(textwrap.wrap(detailed_summary, width=100))
 
     section = (
@@ -614,41 +439,28 @@ def process_one_failure(
         f"```text\n{wrapped_solution}\n```\n"
     )
 
-    if repo and token:
-        title = f"Regression Failure: {env} | {concept_id} | {short_name}"
+    if plan is not None:
+        title = regression_issue_title(env, concept_id, collection_names)
         body_md = f"**Updated:** {timestamp}\n\nJob URL: {url}\n\n" + section
-        issue = get_github_issue_by_title(repo, token, title)
         issue_labels = [label] + error_labels
         issue_labels.append(TEAM_TVA_LABEL)
 
         assignee = get_assignee_from_concept_id(concept_id)
 
         assignees = [assignee] if assignee else None
-        if not issue:
-            create_github_issue(repo, token, title, body_md, labels=issue_labels, assignees=assignees)
-            issue = get_github_issue_by_title(repo, token, title)
-        elif issue.get("number") is not None:
-            create_or_update_github_issue(
-                repo,
-                token,
-                title,
-                body_md,
-                labels=issue_labels,
-                issue_number=issue.get("number"),
-                assignees=assignees
-            )
-        if issue:
-            issue_url = issue.get("html_url")
-            issue_number = issue.get("number")
+        plan.upsert(title, body_md, labels=issue_labels, assignees=assignees,
+                    content=[test_type, failure_summaries.normalize_traceback(fail.get("message", ""))])
+        issue_number = plan.number(title)
 
     failure_record = {
         "concept_id": concept_id,
         "test_type": fail.get("test_type", ""),
         "message": fail.get("message", "").strip(),
         "labels": error_labels,
+        "categories": [rule.category for rule in failure_rules.classify(fail["message"])],
         "solution": solution,
         "job_url": url,
-        "issue_url": issue_url,
+        "issue_url": None,
         "summary": short_summary,
     }
     return failure_record, issue_number, False, section
@@ -660,20 +472,20 @@ def process_failed_job_file(
     old_issue_concept_map,
     collection_names,
     collection_concept_id,
-    repo,
-    token,
+    plan,
     env,
     label,
     all_failures,
     failure_issue_numbers,
     no_associations,
+    summaries=None,
 ):
     """
     Process one failed job status file: read it, parse the failure reason, and
     for each failed collection run process_one_failure. Appends to
     all_failures, failure_issue_numbers, and no_associations. For non-JSON or
-    non-'failed' reasons, optionally create/update a single issue if we have a
-    concept_id in current_associations. Returns True if this job was a failure
+    non-'failed' reasons, optionally plan the create/update of a single issue if
+    the job's collection is in current_associations. Returns True if this job was a failure
     (so caller can set failed = True).
     """
     with open(fpath) as f:
@@ -696,7 +508,7 @@ def process_failed_job_file(
             for fail in reason_json["failed"]:
                 failure_record, issue_number, is_no_assoc, section = process_one_failure(
                     fail, url, timestamp, collection_names, current_associations,
-                    old_issue_concept_map, repo, token, env, label,
+                    old_issue_concept_map, plan, env, label, summaries,
                 )
                 concept_id = fail.get("concept_id", "")
                 if concept_id and concept_id not in collection_concept_id:
@@ -710,84 +522,108 @@ def process_failed_job_file(
                 error_sections.append(section)
 
             pretty_reason = json.dumps(reason_json, indent=2)
-            body_md = (
-                f"**Updated:** {timestamp}\n\nJob Run: {url}\n\nRegression Failures:\n\n"
-                + "\n".join(error_sections)
+            plan_collection_issues(
+                reason_json["failed"], error_sections, url, timestamp, collection_names,
+                current_associations, plan, env, label,
             )
+            # The per-failure issues are planned; the fallback below is for non-JSON reasons only
+            concept_id = None
         else:
             pretty_reason = format_message(reason)
-            body_md = f"**Updated:** {timestamp}\n\nJob Run: {url}\n\nRegression Results:\n```text\n{pretty_reason}\n```"
+            concept_id = data.get("file")
     except Exception as ex:
         print(ex)
         pretty_reason = format_message(reason)
-        body_md = f"**Updated:** {timestamp}\n\nJob Run: {url}\n\nRegression Results:\n```text\n{pretty_reason}\n```"
+        concept_id = data.get("file")
 
     print(pretty_reason)
     print("----------------------")
 
-    # Fallback: if we have a single concept_id (e.g. non-JSON reason), create/update one issue
-    if repo and token and concept_id and concept_id in current_associations:
-        short_name = collection_names.get(concept_id, "Unknown Collection")
-        title = f"Regression Failure: {env} | {concept_id} | {short_name}"
+    # Fallback: for a non-JSON reason, create/update one issue for the job's collection
+    if plan is not None and concept_id and concept_id in current_associations:
+        body_md = f"**Updated:** {timestamp}\n\nJob Run: {url}\n\nRegression Results:\n```text\n{pretty_reason}\n```"
+        title = regression_issue_title(env, concept_id, collection_names)
         error_labels = extract_labels_from_message(pretty_reason)
         labels = [label] + error_labels
         labels.append(TEAM_TVA_LABEL)
         assignee = get_assignee_from_concept_id(concept_id)
         assignees = [assignee] if assignee else None
-        create_or_update_github_issue(
-            repo, token, title, body_md,
-            labels=labels, assignees=assignees
-        )
+        plan.upsert(title, body_md, labels=labels, assignees=assignees,
+                    content=failure_summaries.normalize_traceback(pretty_reason))
 
     return True
 
 
+def plan_collection_issues(failures, sections, url, timestamp, collection_names, current_associations, plan, env,
+                           label):
+    """
+    A collection with several failures in one job (e.g. spatial and temporal) shares one issue, so
+    re-plan its issue with all of their sections. Its content hash only covers the test types and
+    messages of the failures, not the rest of the results JSON, so an unchanged failure is not
+    rewritten.
+    """
+    if plan is None:
+        return
+    by_concept = {}
+    for fail, section in zip(failures, sections):
+        concept_id = fail.get("concept_id", "")
+        if concept_id in current_associations:
+            by_concept.setdefault(concept_id, []).append((fail, section))
+    for concept_id, entries in by_concept.items():
+        if len(entries) < 2:
+            continue
+        title = regression_issue_title(env, concept_id, collection_names)
+        body_md = (
+            f"**Updated:** {timestamp}\n\nJob Run: {url}\n\nRegression Failures:\n\n"
+            + "\n".join(section for _, section in entries)
+        )
+        error_labels = []
+        for fail, _ in entries:
+            error_labels.extend(l for l in extract_labels_from_message(fail["message"]) if l not in error_labels)
+        labels = [label] + error_labels
+        labels.append(TEAM_TVA_LABEL)
+        assignee = get_assignee_from_concept_id(concept_id)
+        assignees = [assignee] if assignee else None
+        plan.upsert(title, body_md, labels=labels, assignees=assignees,
+                    content=[(fail.get("test_type"), failure_summaries.normalize_traceback(fail["message"]))
+                             for fail, _ in entries])
+
+
 def close_issues_not_in_associations(
-    repo, token, old_issue_concept_map, current_associations, failure_issue_numbers
+    plan, old_issue_concept_map, current_associations, failure_issue_numbers
 ):
     """
-    Close GitHub issues for concept_ids that are no longer in current
-    associations. This runs after processing all jobs so we close issues for
-    collections that were removed from the service even if they didn't fail
-    this run.
+    Plan the close of GitHub issues for concept_ids that are no longer in
+    current associations. This runs after processing all jobs so we close
+    issues for collections that were removed from the service even if they
+    didn't fail this run.
     """
-    if not repo or not token:
+    if plan is None:
         return
     for concept_id, issue_number in old_issue_concept_map.items():
         if concept_id not in current_associations and issue_number not in failure_issue_numbers:
-            close_url = f"https://api.github.com/repos/{repo}/issues/{issue_number}"
-            close_headers = {
-                "Authorization": f"token {token}",
-                "Accept": "application/vnd.github+json",
-            }
-            close_response = requests.patch(
-                close_url, headers=close_headers, json={"state": "closed"}
-            )
-            if close_response.status_code == 200:
-                print(f"Closed issue for concept_id not in associations: {concept_id} (issue #{issue_number})")
-            else:
-                print(
-                    f"Failed to close issue for concept_id {concept_id} (status {close_response.status_code})\n{close_response.text}"
-                )
+            plan.close(issue_number, f"for concept_id not in associations: {concept_id}")
 
 
-def close_resolved_regression_issues(repo, token, old_issue_numbers, failure_issue_numbers):
+def close_resolved_regression_issues(plan, old_issue_numbers, failure_issue_numbers):
     """
-    Close GitHub issues that are no longer failing (i.e. the collection is
-    back to passing). Keeps the issue list in sync with current failures.
+    Plan the close of GitHub issues that are no longer failing (i.e. the
+    collection is back to passing). Keeps the issue list in sync with current
+    failures.
     """
+    if plan is None:
+        return
     for number in old_issue_numbers:
         if number not in failure_issue_numbers:
-            url = f"https://api.github.com/repos/{repo}/issues/{number}"
-            headers = {
-                "Authorization": f"token {token}",
-                "Accept": "application/vnd.github+json",
-            }
-            response = requests.patch(url, headers=headers, json={"state": "closed"})
-            if response.status_code == 200:
-                print(f"Closed issue number: {number}")
-            else:
-                print(f"Failed to close issue number: {number} (status {response.status_code})\n{response.text}")
+            plan.close(number)
+
+
+def record_results_history(results_db, env, job_status_files):
+    """Append the results carried by this run's job status files to the results history."""
+    run_id = results_store.default_run_id()
+    with closing(results_store.connect(results_db)) as conn:
+        added = sum(results_store.ingest_job_status(conn, run_id, env, fpath) for fpath in job_status_files)
+    print(f"Appended {added} results of run {run_id} to {results_db}")
 
 
 def main():
@@ -798,6 +634,10 @@ def main():
     env = os.environ.get("REGRESSION_ENV", "uat")
     token_provider = os.environ.get("CMR_TOKEN_PROVIDER", "direct").lower()
     label = f"regression-failure-{env}"
+    results_db = os.environ.get(results_store.RESULTS_DB_ENV_VAR)
+
+    if results_db:
+        record_results_history(results_db, env, job_status_files)
 
     edl_token = bearer_token(env, token_provider)
     current_associations = load_current_associations(edl_token, env)
@@ -806,12 +646,24 @@ def main():
     collection_concept_id, providers = collect_concept_ids_and_providers(job_status_files)
     collection_names = get_collection_names(providers, env, collection_concept_id)
 
-    # --- Fetch existing open regression-failure issues and map concept_id -> issue number ---
-    old_issues = get_all_regression_failure_issues(repo, token, label)
+    # --- Fetch all regression-failure issues once, and map open ones concept_id -> issue number ---
+    client = None
+    plan = None
+    old_issues = []
+    if repo and token:
+        client = github_sync.GitHubClient(
+            repo, token, max_workers=int(os.environ.get("L2SS_GITHUB_WORKERS", github_sync.MAX_WORKERS))
+        )
+        catalog = github_sync.IssueCatalog.fetch(client, label)
+        old_issues = catalog.open_issues()
+        plan = github_sync.IssuePlan(catalog)
     old_issue_numbers = [issue["number"] for issue in old_issues]
     old_issue_concept_map = build_old_issue_concept_map(old_issues)
 
-    # --- Process each failed job file: create/update or close issues, build failure lists ---
+    # --- Summarize the distinct failure tracebacks up front, concurrently and through the cache ---
+    summaries = summarize_failures(job_status_files, current_associations)
+
+    # --- Process each failed job file: plan issue creates/updates/closes, build failure lists ---
     all_failures = []
     failure_issue_numbers = []
     no_associations = []
@@ -823,28 +675,36 @@ def main():
             old_issue_concept_map,
             collection_names,
             collection_concept_id,
-            repo,
-            token,
+            plan,
             env,
             label,
             all_failures,
             failure_issue_numbers,
             no_associations,
+            summaries,
         ):
             failed = True
 
     # --- Close GitHub issues for collections no longer in current associations ---
     close_issues_not_in_associations(
-        repo, token, old_issue_concept_map, current_associations, failure_issue_numbers
+        plan, old_issue_concept_map, current_associations, failure_issue_numbers
     )
 
     # --- Close GitHub issues for collections that are no longer failing ---
-    close_resolved_regression_issues(repo, token, old_issue_numbers, failure_issue_numbers)
-
-    # --- Update the single aggregated regression-failures issue ---
-    if (all_failures or no_associations) and repo and token:
+    close_resolved_regression_issues(plan, old_issue_numbers, failure_issue_numbers)
+
+    # --- Apply the planned creates, updates and closes concurrently ---
+    if plan is not None:
+        issues = github_sync.sync_issues(client, plan)
+        for failure in all_failures:
+            issue = issues.get(regression_issue_title(env, failure["concept_id"], collection_names))
+            if issue:
+                failure["issue_url"] = issue.get("html_url")
+
+    # --- Update the single aggregated regression-failures issue, now that the issue links are known ---
+    if (all_failures or no_associations) and client is not None:
         create_aggregated_github_issue(
-            repo, token, all_failures, env, collection_names, no_associations
+            client, all_failures, env, collection_names, no_associations
         )
 
     if not failed:
@@ -0,0 +1,202 @@
+"""
+End-to-end benchmark of the spatial verification pipeline against the local mock services.
+
+Each collection goes through the same phases as test_spatial_subset: granule search, UMM-Var
+fetch, Harmony submission, waiting for the job, listing its results, download, file open and the
+bounds check. The
+mock generates granules of every requested size, in a separate process for each size. Per-phase
+timings and the peak RSS of the run are written as JSON so they can be compared across commits.
+With --trace-memory, each phase also records the memory it allocated, from tracemalloc.
+
+    python benchmark.py --sizes 60x40,600x400,2400x1600 --collections 3 --output benchmark.json
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import harmony
+import requests
+
+import download_utils
+import mock_services
+import subset_verification
+import token_utils
+from harmony_jobs import DEFAULT_MIN_POLL_INTERVAL, HarmonyJobEngine
+from metadata_cache import JsonCache, UmmVarCache
+from timing import PhaseTimer, peak_rss_bytes
+from verify_collection import (build_spatial_request, fetch_collection_variables, get_spatial_subset_bounds,
+                               make_harmony_client, probe_subsetted_file, select_granule, select_science_variable,
+                               wait_for_harmony_job)
+
+ENV = "local"
+# Named as in the "timings" recorded by the verification tests
+PHASES = ("cmr_search", "variable_fetch", "harmony_submit", "harmony_wait", "harmony_results", "download", "open",
+          "verification")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL, cwd=os.path.dirname(os.path.abspath(__file__))).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def run_collection(collection_concept_id: str, session: requests.Session, engine: HarmonyJobEngine,
+                   token: str, work_dir: str, chunks) -> dict:
+    cmr_mode = mock_services.cmr_url()
+    timer = PhaseTimer()
+
+    def authed_request(method, url, **kwargs):
+        headers = {**kwargs.pop("headers", {}), "Authorization": f"Bearer {token}"}
+        response = session.request(method, url, headers=headers, **kwargs)
+        response.raise_for_status()
+        return response
+
+    with timer.phase("cmr_search"):
+        granule, _ = select_granule(ENV, cmr_mode, collection_concept_id, authed_request, None, None,
+                                    JsonCache("granules"))
+    with timer.phase("variable_fetch"):
+        variables = fetch_collection_variables(ENV, cmr_mode, collection_concept_id, token, UmmVarCache(), session)
+
+    north, south, east, west = get_spatial_subset_bounds(granule, None, {})
+    with timer.phase("harmony_submit"):
+        job = engine.submit(build_spatial_request(collection_concept_id, granule, (north, south, east, west)))
+    wait_for_harmony_job(engine, job, timer)
+    with timer.phase("harmony_results"):
+        result_urls = list(engine.client().result_urls(job.job_id))
+
+    output_dir = os.path.join(work_dir, collection_concept_id)
+    os.makedirs(output_dir, exist_ok=True)
+    with timer.phase("download") as record:
+        downloads = download_utils.download_all(authed_request, result_urls, output_dir)
+    record["bytes"] = sum(result.size for result in downloads)
+
+    with timer.phase("open"):
+        tree, resolution = probe_subsetted_file(downloads[-1].path, variables, chunks)
+    with timer.phase("verification"):
+        _, mask, _ = select_science_variable(tree, resolution["science_candidates"])
+        lat, lon = tree[resolution["lat"]], tree[resolution["lon"]]
+        bounds = subset_verification.verify_bounds(lat, lon, mask, (west, south, east, north),
+                                                   (lat.encoding.get('_FillValue'), lon.encoding.get('_FillValue')))
+    tree.close()
+
+    return {
+        "collection": collection_concept_id,
+        "bytes": timer.phases["download"]["bytes"],
+        "in_bounds": bounds.in_bounds,
+        "total_seconds": sum(timer.phases[phase]["seconds"] for phase in PHASES),
+        "phases": timer.as_dict(),
+    }
+
+
+def summarize(results: list) -> dict:
+    summary = {}
+    for size in dict.fromkeys(result["size"] for result in results):
+        runs = [result for result in results if result["size"] == size]
+        summary[size] = {
+            phase: {
+                "median_seconds": statistics.median(run["phases"][phase]["seconds"] for run in runs),
+                "max_seconds": max(run["phases"][phase]["seconds"] for run in runs),
+                **({"max_peak_traced_bytes": max(run["phases"][phase]["peak_traced_bytes"] for run in runs)}
+                   if all("peak_traced_bytes" in run["phases"][phase] for run in runs) else {}),
+            }
+            for phase in PHASES
+        }
+        summary[size]["bytes"] = statistics.median(run["bytes"] for run in runs)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the verification pipeline against the local mock services")
+    parser.add_argument("--sizes", default="60x40,600x400,2400x1600",
+                        help="Comma separated rows x columns of the synthetic granules")
+    parser.add_argument("--collections", type=int, default=3, help="Collections verified for each size")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the mock adds to every response")
+    parser.add_argument("--job-seconds", type=float, default=0.0, help="Seconds a mock Harmony job takes")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_MIN_POLL_INTERVAL,
+                        help="Minimum Harmony status poll interval")
+    parser.add_argument("--fixtures-dir", help="Recorded UMM-G/UMM-Var fixtures served instead of generated ones")
+    parser.add_argument("--verify-chunks", help="Open outputs with dask chunks, as --verify-chunks in pytest")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Record the memory each phase allocates with tracemalloc. Slows the timings")
+    parser.add_argument("--output", help="File to write the JSON results to. Defaults to stdout")
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    if args.trace_memory:
+        tracemalloc.start()
+    session = requests.Session()
+    chunks = subset_verification.parse_chunks(args.verify_chunks)
+
+    results = []
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in sizes:
+            # The mock runs in its own process, so generating and serving the granules is not
+            # counted in the phase timings or the memory measured here. One process per size,
+            # as the granule shape is part of its configuration.
+            port = free_port()
+            mock_env = {"L2SS_MOCK_COLLECTIONS": str(args.collections), "L2SS_MOCK_LATENCY": str(args.latency),
+                        "L2SS_MOCK_JOB_SECONDS": str(args.job_seconds), "L2SS_MOCK_GRANULE_SHAPE": size}
+            if args.fixtures_dir:
+                mock_env["L2SS_MOCK_FIXTURES_DIR"] = args.fixtures_dir
+            process = mock_services.start_subprocess(port, env=mock_env)
+            os.environ[mock_services.MOCK_URL_ENV_VAR] = f"http://localhost:{port}"
+            engine = None
+            try:
+                token = token_utils.fetch_bearer_token(ENV, session, "mock", "mock")
+                engine = HarmonyJobEngine(lambda refresh: make_harmony_client(harmony.config.Environment.LOCAL, token),
+                                          min_poll_interval=args.poll_interval)
+                for collection_concept_id in mock_services.list_collection_ids()[:args.collections]:
+                    result = run_collection(collection_concept_id, session, engine, token, os.path.join(work_dir, size),
+                                            chunks)
+                    result["size"] = size
+                    results.append(result)
+                    print(f"{size} {result['collection']}: {result['total_seconds']:.2f}s, {result['bytes']} bytes",
+                          file=sys.stderr)
+            finally:
+                if engine is not None:
+                    engine.close()
+                process.terminate()
+                process.wait(timeout=10)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"sizes": sizes, "collections": args.collections, "latency": args.latency,
+                   "job_seconds": args.job_seconds, "poll_interval": args.poll_interval,
+                   "verify_chunks": args.verify_chunks, "fixtures_dir": args.fixtures_dir,
+                   "trace_memory": args.trace_memory},
+        "wall_seconds": time.perf_counter() - started,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "summary": summarize(results),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote benchmark results to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""
+Short names of collections by concept id, from the CMR GraphQL API.
+
+Only the requested concept ids are queried, in batches, with one batch per request running
+concurrently across providers. The short name, version, provider and revision date of every
+collection seen are kept in a shared cache file (L2SS_SHORT_NAME_CACHE, or short_names.json
+under L2SS_CACHE_DIR). Cached names are returned straight away. Entries not checked for
+REFRESH_INTERVAL are refreshed in a background thread that only asks CMR for the collections
+revised since they were last checked, so no lookup waits for CMR unless a collection has never
+been seen.
+
+    python collection_lookup.py --env ops --token <token> C1234-POCLOUD C5678-POCLOUD
+"""
+import argparse
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from metadata_cache import default_cache_dir, read_json, write_json_atomic
+
+SHORT_NAME_CACHE_ENV_VAR = "L2SS_SHORT_NAME_CACHE"
+GRAPHQL_URLS = {
+    "uat": "https://graphql.uat.earthdata.nasa.gov/api",
+    "ops": "https://graphql.earthdata.nasa.gov/api",
+}
+BATCH_SIZE = 100
+MAX_WORKERS = 4
+# Seconds before a cached collection is checked again for a new revision
+REFRESH_INTERVAL = 24 * 60 * 60
+# Overlap between updatedSince windows, for clock skew between here and CMR
+UPDATED_SINCE_MARGIN = 5 * 60
+
+COLLECTIONS_QUERY = """
+    query {{
+      collections(conceptId: {concept_ids}, limit: {limit}{updated_since}) {{
+        items {{
+          conceptId
+          shortName
+          version
+          provider
+          revisionDate
+        }}
+      }}
+    }}
+"""
+
+
+def graphql_url(env: str) -> str:
+    if env.lower() == "local":
+        import mock_services
+        return mock_services.graphql_url()
+    return GRAPHQL_URLS[env.lower()]
+
+
+def default_cache_path() -> Optional[str]:
+    if os.environ.get(SHORT_NAME_CACHE_ENV_VAR):
+        return os.environ[SHORT_NAME_CACHE_ENV_VAR]
+    cache_dir = default_cache_dir()
+    return os.path.join(cache_dir, "short_names.json") if cache_dir else None
+
+
+def _batches(concept_ids: List[str], size: int) -> List[List[str]]:
+    """Batches of at most size ids, each from a single provider."""
+    by_provider = {}
+    for concept_id in concept_ids:
+        by_provider.setdefault(concept_id.split("-")[-1], []).append(concept_id)
+    return [ids[i:i + size] for ids in by_provider.values() for i in range(0, len(ids), size)]
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def query_collections(url: str, authorization: str, concept_ids: List[str], updated_since: Optional[str] = None,
+                      session: Optional[requests.Session] = None) -> Dict[str, dict]:
+    """
+    Short name, version, provider and revision date of one batch of concept ids in a single
+    GraphQL request. With updated_since, only the collections revised since then are returned.
+    Raises ValueError when the response has GraphQL errors, so the batch counts as failed.
+    """
+    query = COLLECTIONS_QUERY.format(concept_ids=json.dumps(concept_ids), limit=len(concept_ids),
+                                     updated_since=f', updatedSince: "{updated_since}"' if updated_since else "")
+    response = (session or requests).post(url, headers={"Content-Type": "application/json",
+                                                        "Authorization": authorization},
+                                          json={"query": query}, timeout=60)
+    response.raise_for_status()
+    result = response.json()
+    if result.get("errors"):
+        # GraphQL reports errors with status 200, and "data" null or partial
+        raise ValueError(f"GraphQL errors: {result['errors']}")
+    items = ((result.get("data") or {}).get("collections") or {}).get("items") or []
+    return {item["conceptId"]: {"short_name": item.get("shortName"), "version": item.get("version"),
+                                "provider": item.get("provider"), "revision_date": item.get("revisionDate")}
+            for item in items}
+
+
+class ShortNameCache:
+    """
+    Collection records by environment and concept id, kept in a single JSON file so the
+    workflows can carry it between runs. Without a path, records only live in memory.
+    """
+
+    def __init__(self, path: Optional[str] = None, refresh_interval: float = REFRESH_INTERVAL):
+        self.path = pathlib.Path(path) if path else None
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._records = (read_json(self.path) if self.path else None) or {}
+        self._refresh_thread = None
+
+    def get(self, env: str, concept_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._records.get(env, {}).get(concept_id)
+
+    def update(self, env: str, records: Dict[str, dict], checked: Iterable[str] = ()) -> None:
+        """Store records, and mark the checked concept ids as up to date."""
+        now = time.time()
+        with self._lock:
+            env_records = self._records.setdefault(env, {})
+            for concept_id, record in records.items():
+                env_records[concept_id] = {**record, "checked_at": now}
+            for concept_id in checked:
+                if concept_id in env_records:
+                    env_records[concept_id]["checked_at"] = now
+        self.save()
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            # Keep entries written by other processes since this cache was loaded
+            merged = read_json(self.path) or {}
+            for env, env_records in self._records.items():
+                merged.setdefault(env, {}).update(env_records)
+            self._records = merged
+            try:
+                write_json_atomic(self.path, merged)
+            except OSError as e:
+                logging.warning("Unable to write short name cache %s: %s", self.path, e)
+
+    def stale(self, env: str, concept_ids: Iterable[str]) -> List[str]:
+        cutoff = time.time() - self.refresh_interval
+        return [concept_id for concept_id in concept_ids
+                if (self.get(env, concept_id) or {}).get("checked_at", 0) < cutoff]
+
+    def refresh_in_background(self, env: str, url: str, authorization: str, concept_ids: List[str]) -> None:
+        """Ask CMR for the collections revised since they were last checked, without blocking the caller."""
+        if not concept_ids or (self._refresh_thread is not None and self._refresh_thread.is_alive()):
+            return
+        checked_at = min(self.get(env, concept_id).get("checked_at", 0) for concept_id in concept_ids)
+        updated_since = _timestamp(max(0, checked_at - UPDATED_SINCE_MARGIN))
+
+        def _refresh():
+            failed = []
+            found = _query_all(url, authorization, concept_ids, updated_since, failed=failed)
+            self.update(env, found, checked=set(concept_ids).difference(failed))
+            logging.info("Refreshed %d cached collections, %d revised", len(concept_ids) - len(failed), len(found))
+
+        # Not a daemon, so a script exiting right after its lookup still finishes the refresh
+        self._refresh_thread = threading.Thread(target=_refresh, name="short-name-refresh")
+        self._refresh_thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout)
+
+
+def _query_all(url: str, authorization: str, concept_ids: List[str], updated_since: Optional[str] = None,
+               batch_size: int = BATCH_SIZE, max_workers: int = MAX_WORKERS,
+               failed: Optional[list] = None) -> Dict[str, dict]:
+    """Records of all concept ids, batched and queried concurrently. Ids of failed batches are added to failed."""
+    session = requests.Session()
+
+    def _query(batch):
+        try:
+            return query_collections(url, authorization, batch, updated_since, session)
+        except (requests.RequestException, ValueError) as e:
+            logging.warning("Unable to look up %d collections in GraphQL: %s", len(batch), e)
+            if failed is not None:
+                failed.extend(batch)
+            return {}
+
+    found = {}
+    batches = _batches(concept_ids, batch_size)
+    if not batches:
+        return found
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+        for records in executor.map(_query, batches):
+            found.update(records)
+    return found
+
+
+_caches: Dict[Optional[str], ShortNameCache] = {}
+
+
+def get_cache(path: Optional[str] = None) -> ShortNameCache:
+    """The process-wide cache for path, defaulting to default_cache_path()."""
+    path = path or default_cache_path()
+    if path not in _caches:
+        _caches[path] = ShortNameCache(path)
+    return _caches[path]
+
+
+def lookup_collections(env: str, concept_ids: Iterable[str], authorization: Optional[str] = None,
+                       cache: Optional[ShortNameCache] = None) -> Dict[str, dict]:
+    """
+    Record of each concept id found, from the cache when possible. Collections never seen
+    before are looked up in GraphQL before returning. authorization is the Authorization
+    header value, e.g. "Bearer <EDL token>" or a Launchpad token. Without it only the cache
+    is used.
+    """
+    cache = cache or get_cache()
+    env = env.lower()
+    concept_ids = list(dict.fromkeys(concept_ids))
+    records = {concept_id: cache.get(env, concept_id) for concept_id in concept_ids}
+    missing = [concept_id for concept_id, record in records.items() if record is None]
+    if authorization:
+        url = graphql_url(env)
+        if missing:
+            found = _query_all(url, authorization, missing)
+            cache.update(env, found)
+            records.update(found)
+        missing_set = set(missing)
+        cached = [concept_id for concept_id in concept_ids if concept_id not in missing_set]
+        cache.refresh_in_background(env, url, authorization, cache.stale(env, cached))
+    return {concept_id: record for concept_id, record in records.items() if record is not None}
+
+
+def lookup_short_names(env: str, concept_ids: Iterable[str], authorization: Optional[str] = None,
+                       cache: Optional[ShortNameCache] = None) -> Dict[str, str]:
+    """Short name of each concept id found, see lookup_collections."""
+    return {concept_id: record["short_name"]
+            for concept_id, record in lookup_collections(env, concept_ids, authorization, cache).items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up and cache collection short names")
+    parser.add_argument("--env", required=True, help="CMR environment")
+    parser.add_argument("--token", help="Authorization header value. Without it only the cache is read")
+    parser.add_argument("--cache", default=default_cache_path(), help="Short name cache file")
+    parser.add_argument("--associations-dir", help="Look up every collection in this directory, e.g. cmr/l2ss-py/ops")
+    parser.add_argument("concept_ids", nargs="*")
+    args = parser.parse_args()
+
+    concept_ids = list(args.concept_ids)
+    if args.associations_dir:
+        concept_ids.extend(sorted(os.listdir(args.associations_dir)))
+    cache = get_cache(args.cache)
+    records = lookup_collections(args.env, concept_ids, args.token, cache)
+    cache.join()
+    print(json.dumps(records, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,12 @@ import pathlib
 import json
 import pytest
 import re
+from contextlib import closing
+from urllib.parse import urlparse
 import create_or_update_issue
+import incremental
+import results_store
+import scheduler
 from groq import Groq
 import time
 import re
@@ -46,7 +51,8 @@ def record_results(request):
 
 
 def pytest_addoption(parser):
-    parser.addoption("--env", action="store", choices=['uat', 'ops'], help="Environment to use for testing",
+    parser.addoption("--env", action="store", choices=['uat', 'ops', 'local'],
+                     help="Environment to use for testing. 'local' runs against the mock services in mock_services.py",
                      required=True)
     parser.addoption(
         "--token-provider",
@@ -61,6 +67,74 @@ def pytest_addoption(parser):
         default=os.environ.get("L2SS_OVERRIDES_FILE"),
         help="Path to JSON overrides for per-provider or per-collection test behavior",
     )
+    parser.addoption(
+        "--metadata-cache-dir",
+        action="store",
+        default=os.environ.get("L2SS_CACHE_DIR"),
+        help="Directory for on-disk CMR metadata caches shared across pytest-xdist workers and runs. "
+             "When unset, metadata is only cached in memory for the session.",
+    )
+    parser.addoption(
+        "--granule-cache-ttl",
+        action="store",
+        type=float,
+        default=float(os.environ.get("L2SS_GRANULE_CACHE_TTL", 6 * 60 * 60)),
+        help="Seconds a selected granule stays cached before CMR is searched again",
+    )
+    parser.addoption(
+        "--variable-cache-ttl",
+        action="store",
+        type=float,
+        default=float(os.environ.get("L2SS_VARIABLE_CACHE_TTL", 24 * 60 * 60)),
+        help="Seconds before the UMM-Var revisions associated to a collection are checked again",
+    )
+    parser.addoption(
+        "--harmony-lookahead",
+        action="store",
+        type=int,
+        default=int(os.environ.get("L2SS_HARMONY_LOOKAHEAD", 0)),
+        help="Number of upcoming collections whose Harmony jobs are submitted ahead of their tests. "
+             "Ignored under pytest-xdist",
+    )
+    parser.addoption(
+        "--verify-chunks",
+        action="store",
+        default=os.environ.get("L2SS_VERIFY_CHUNKS"),
+        help="Open subsetted files with dask chunks ('auto' or a chunk length per dimension) and verify "
+             "them with a single streaming reduction. When unset, files are loaded fully into memory.",
+    )
+    parser.addoption(
+        "--runtime-history",
+        action="store",
+        default=os.environ.get(scheduler.RUNTIME_HISTORY_ENV_VAR),
+        help="Runtime history JSON (see scheduler.py). --regression runs the slowest collections first.",
+    )
+    parser.addoption(
+        "--incremental",
+        action="store_true",
+        default=os.environ.get("L2SS_INCREMENTAL", "").lower() in ("1", "true", "yes"),
+        help="Skip generic tests whose collection inputs (collection and UMM-Var revisions, granule, l2ss-py "
+             "version, overrides and custom tests) are unchanged since they last passed",
+    )
+    parser.addoption(
+        "--incremental-max-age",
+        action="store",
+        type=float,
+        default=float(os.environ.get("L2SS_INCREMENTAL_MAX_AGE", incremental.DEFAULT_MAX_AGE_HOURS)),
+        help="Hours after which an unchanged collection is verified again anyway",
+    )
+    parser.addoption(
+        "--incremental-dir",
+        action="store",
+        default=os.environ.get(incremental.INCREMENTAL_DIR_ENV_VAR),
+        help="Directory for the --incremental fingerprints. Defaults to --metadata-cache-dir, then tests/.incremental",
+    )
+    parser.addoption(
+        "--results-db",
+        action="store",
+        default=os.environ.get(results_store.RESULTS_DB_ENV_VAR),
+        help="SQLite results history (see results_store.py) to append this run's test outcomes to",
+    )
 
     group = parser.getgroup('test_mode')
     group.addoption("--concept_id", action="store", help="Concept ID of single collection to test")
@@ -77,12 +151,39 @@ def pytest_addoption(parser):
     group.addoption("--regression", action="store_true", help="Run tests for all known collection associations")
 
 
+def pytest_configure(config):
+    # Start the local mock services once per run; pytest-xdist workers reuse the controller's server
+    if config.getoption("env", None) != 'local' or os.environ.get("PYTEST_XDIST_WORKER"):
+        return
+    # Only imported for --env local, as it needs netCDF4 and numpy to generate files
+    import mock_services
+    os.environ.setdefault(mock_services.MOCK_URL_ENV_VAR, f"http://localhost:{mock_services.DEFAULT_PORT}")
+    if not mock_services.is_running():
+        port = urlparse(mock_services.base_url()).port or mock_services.DEFAULT_PORT
+        config._mock_services = mock_services.start_subprocess(port)
+
+
+def pytest_unconfigure(config):
+    process = getattr(config, "_mock_services", None)
+    if process is not None:
+        process.terminate()
+        process.wait(timeout=10)
+
+
 def pytest_generate_tests(metafunc):
     if metafunc.config.option.regression:
         cmr_dirpath = pathlib.Path('cmr/l2ss-py')
 
-        association_dir = 'uat' if metafunc.config.option.env == 'uat' else 'ops'
-        associations = os.listdir(cmr_dirpath.joinpath(association_dir))
+        if metafunc.config.option.env == 'local':
+            import mock_services
+            associations = mock_services.list_collection_ids()
+        else:
+            association_dir = 'uat' if metafunc.config.option.env == 'uat' else 'ops'
+            associations = os.listdir(cmr_dirpath.joinpath(association_dir))
+
+        # Longest first, so a slow collection does not start last and hold up the run
+        runtimes = scheduler.runtimes_from_history(scheduler.load_history(metafunc.config.option.runtime_history))
+        associations = scheduler.order_longest_first(associations, runtimes)
 
         if 'collection_concept_id' in metafunc.fixturenames and associations is not None:
             metafunc.parametrize("collection_concept_id", associations)
@@ -99,6 +200,42 @@ def log_global_env_facts(record_testsuite_property, request):
     record_testsuite_property("env", request.config.getoption('env'))
 
 
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    # Keep each phase's report on the item so fixtures can see the test outcome at teardown
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+
+
+# Outcome, duration and per-phase timings of each test, by node id. Filled from the reports so
+# the controller also sees the tests run on pytest-xdist workers.
+TEST_TIMINGS = {}
+
+
+def pytest_runtest_logreport(report):
+    # duration covers setup, call and teardown, since fixtures do part of the work
+    entry = TEST_TIMINGS.setdefault(report.nodeid, {})
+    entry["duration"] = entry.get("duration", 0.0) + report.duration
+    if report.when == "setup" and not report.passed:
+        entry["outcome"] = "error" if report.failed else report.outcome
+        return
+    if report.when == "call":
+        entry["outcome"] = report.outcome
+        return
+    if report.when != "teardown":
+        return
+    match = re.search(r"\[(.*)\]$", report.nodeid)
+    entry.setdefault("outcome", "error")
+    entry.update({
+        "concept_id": match.group(1) if match else None,
+        "test_type": "spatial" if "spatial" in report.nodeid else "temporal" if "temporal" in report.nodeid else None,
+    })
+    timings = dict(report.user_properties).get("timings")
+    if timings is not None:
+        entry["phases"] = json.loads(timings)
+
+
 def get_error_message(report):
 
     # If it's a regular test failure (not a skipped or xfailed test)
@@ -154,8 +291,19 @@ def pytest_terminal_summary(terminalreporter, exitstatus, config):
                 "message": full_message
             })
 
+    timings = [
+        {"test": nodeid, **entry} for nodeid, entry in TEST_TIMINGS.items() if "phases" in entry
+    ]
+
+    tests = [
+        {"test": nodeid, **{key: value for key, value in entry.items() if key != "phases"}}
+        for nodeid, entry in TEST_TIMINGS.items() if "concept_id" in entry
+    ]
+
     test_results = {
         'failed': failed, 
+        'timings': timings,
+        'tests': tests,
     }
 
     env = config.option.env
@@ -166,10 +314,24 @@ def pytest_terminal_summary(terminalreporter, exitstatus, config):
         with open(file_path, 'w') as file:
             json.dump(test_results, file)
 
-        for outcome, tests in test_results.items():
-            if tests:
-                print(f'{outcome.capitalize()} Tests')
-                print(tests)
+        if failed:
+            print('Failed Tests')
+            print(failed)
+
+        if config.option.results_db:
+            with closing(results_store.connect(config.option.results_db)) as conn:
+                added = results_store.append_run(conn, results_store.default_run_id(), env,
+                                                 results_store.rows_from_results(test_results), source="pytest")
+            print(f'Appended {added} results to {config.option.results_db}')
+
+        if timings:
+            phase_seconds = {}
+            for entry in timings:
+                for phase, record in entry["phases"].items():
+                    phase_seconds[phase] = phase_seconds.get(phase, 0.0) + record["seconds"]
+            print('Seconds per phase across all tests')
+            for phase, seconds in sorted(phase_seconds.items(), key=lambda item: -item[1]):
+                print(f'  {phase}: {seconds:.1f}')
 
 
 def pytest_collection_modifyitems(config, items):
@@ -3,9 +3,12 @@ import requests
 import json
 from datetime import datetime
 from groq import Groq
-import time
 from requests.auth import HTTPBasicAuth
 
+import collection_lookup
+import failure_rules
+import failure_summaries
+
 TEAM_TVA_LABEL = "team:tva"
 
 
@@ -29,76 +32,8 @@ def bearer_token(env):
         print(f"Error getting the token (status code {status_code}): {e}")
 
 def get_collection_names(providers, env, collections_list):
-
-    lower_env = env.lower()
-
-    if lower_env == "uat":
-        url = "https://graphql.uat.earthdata.nasa.gov/api"
-    elif lower_env == "ops":
-        url = "https://graphql.earthdata.nasa.gov/api"
-
-    token = bearer_token(env)
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
-
-    # Get providers
-    collections = {}
-
-    for provider in providers:
-
-        offset = 0
-        more_data = True
-        while more_data:
-
-            try:
-
-                # Define your GraphQL query
-                graphql_query_template = """
-                    query {{
-                      collections(provider: "{provider}", limit: 2000, offset: {offset}) {{
-                        items {{
-                          conceptId
-                          shortName
-                        }}
-                      }}
-                    }}
-                """
-
-                graphql_query = graphql_query_template.format(
-                    provider=provider, offset=offset)
-
-                # Create the request payload
-                payload = {"query": graphql_query}
-
-                # Make the GraphQL request with headers
-                response = requests.post(url, headers=headers, json=payload)
-                # Check the status code
-                if response.status_code == 200:
-                    # Parse the JSON response
-                    data = response.json().get('data').get('collections').get('items')
-
-                    for item in data:
-                        concept_id = item.get('conceptId')
-                        if concept_id in collections_list:
-                            collections[concept_id] = item.get("shortName")
-
-                    if len(data) < 2000:
-                        more_data = False
-                    else:
-                        offset += 2000
-                else:
-                    more_data = False
-                    print(f"Error: {response.status_code}\n{response.text}")
-
-            except Exception as ex:
-                print(f"Error: {ex}")
-                more_data = False
-
-    return collections
-
+    """Short names of the given collections, keyed by concept id."""
+    return collection_lookup.lookup_short_names(env, collections_list, f"Bearer {bearer_token(env)}")
 
 def get_existing_issue_number(env):
 
@@ -221,18 +156,23 @@ def create_or_update_issue(repo_name, github_token, env, groq_api_key):
             if provider not in providers:
                 providers.append(provider)
 
+        summaries = {}
+        if client:
+            # Known failures are summarized by their rule, and each other distinct traceback once,
+            # paced by failure_summaries' rate limiter
+            summaries = failure_summaries.summarize_all(
+                [item.get('message') for item in failed if not failure_rules.classify(item.get('message'))],
+                lambda message: summarize_error(client, message),
+                "groq",
+            )
         for item in failed:
             message = item.get('message')
-            try:
-                if client:
-                    error_message = summarize_error(client, message)
-                    time.sleep(10)
-                else:
-                    error_message = message
-                item['error_message'] = error_message
-            except Exception:
+            rule_summary = failure_rules.rule_summary(message)
+            if rule_summary:
+                item['error_message'] = rule_summary['short_summary']
+            else:
                 # fallback to original message if there's an error with the summarization
-                item['error_message'] = message
+                item['error_message'] = summaries.get(failure_summaries.traceback_key(message)) or message
 
         collection_names = get_collection_names(providers, env, all_collections)
         issue_body = datetime.now().strftime("Updated on %m-%d-%Y\n")
@@ -0,0 +1,219 @@
+import hashlib
+import logging
+import os
+import pathlib
+import re
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from urllib.parse import unquote, urlparse
+
+import requests
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_RETRY_DELAY = 2
+DOWNLOAD_TIMEOUT = (30, 300)
+DOWNLOAD_WORKERS = int(os.environ.get("L2SS_DOWNLOAD_WORKERS", 4))
+
+TRANSIENT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+# UMM-G checksum algorithm names -> hashlib names
+HASHLIB_ALGORITHMS = {
+    "MD5": "md5",
+    "SHA-1": "sha1",
+    "SHA-256": "sha256",
+    "SHA-384": "sha384",
+    "SHA-512": "sha512",
+}
+
+
+class DownloadError(Exception):
+    pass
+
+
+@dataclass
+class DownloadResult:
+    url: str
+    path: pathlib.Path
+    size: int
+    transferred: int
+    seconds: float
+    resumed: bool = False
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.transferred / self.seconds if self.seconds > 0 else 0.0
+
+
+class _Checksum:
+    """Incremental checksum supporting the algorithms UMM-G can declare."""
+
+    def __init__(self, algorithm: str):
+        name = algorithm.upper()
+        self._adler = None
+        self._crc = None
+        self._hash = None
+        if name == "ADLER-32":
+            self._adler = 1
+        elif name == "CRC32":
+            self._crc = 0
+        elif name in HASHLIB_ALGORITHMS:
+            self._hash = hashlib.new(HASHLIB_ALGORITHMS[name])
+        else:
+            raise ValueError(f"Unsupported checksum algorithm {algorithm}")
+
+    def update(self, data: bytes) -> None:
+        if self._adler is not None:
+            self._adler = zlib.adler32(data, self._adler)
+        elif self._crc is not None:
+            self._crc = zlib.crc32(data, self._crc)
+        else:
+            self._hash.update(data)
+
+    def hexdigest(self) -> str:
+        if self._adler is not None:
+            return f"{self._adler:08x}"
+        if self._crc is not None:
+            return f"{self._crc:08x}"
+        return self._hash.hexdigest()
+
+
+def file_checksum(path: pathlib.Path, algorithm: str) -> str:
+    checksum = _Checksum(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def filename_from_url(url: str) -> str:
+    return unquote(pathlib.PurePosixPath(urlparse(url).path).name)
+
+
+def _total_size(response: requests.Response, offset: int) -> Optional[int]:
+    content_range = response.headers.get("Content-Range")
+    if response.status_code == 206 and content_range:
+        match = re.match(r"bytes \d+-\d+/(\d+)", content_range)
+        if match:
+            return int(match.group(1))
+    content_length = response.headers.get("Content-Length")
+    if content_length is None:
+        return None
+    return int(content_length) + (offset if response.status_code == 206 else 0)
+
+
+def download_file(request: Callable, url: str, destination: pathlib.Path, expected_size: Optional[int] = None,
+                  checksum: Optional[str] = None, checksum_algorithm: Optional[str] = None,
+                  retries: int = DOWNLOAD_RETRIES) -> DownloadResult:
+    """
+    Stream url to destination. Data is written to destination.part and an interrupted
+    transfer is resumed with an HTTP Range request instead of starting over. Once complete,
+    the size is checked against expected_size (or the server-reported length) and the
+    checksum is verified if one is given.
+
+    request is called as request(method, url, **kwargs), e.g. the authed_request fixture.
+    """
+    destination = pathlib.Path(destination)
+    part_path = destination.with_name(destination.name + ".part")
+    start = time.monotonic()
+    transferred = 0
+    resumed = False
+    total = expected_size
+
+    for attempt in range(retries + 1):
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            response = request("GET", url, stream=True, headers=headers, timeout=DOWNLOAD_TIMEOUT)
+            with response:
+                if offset and response.status_code == 416:
+                    # Nothing left to fetch; the previous attempt got every byte
+                    break
+                response.raise_for_status()
+                if offset and response.status_code != 206:
+                    logging.info("Server ignored range request for %s; restarting download", url)
+                    offset = 0
+                resumed = resumed or offset > 0
+                total = total or _total_size(response, offset)
+                with open(part_path, "ab" if offset else "wb") as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        transferred += len(chunk)
+            if total is None or part_path.stat().st_size >= total:
+                break
+            logging.warning("Download of %s ended early (%d of %d bytes)", url, part_path.stat().st_size, total)
+        except TRANSIENT_ERRORS as e:
+            logging.warning("Download of %s interrupted (attempt %d/%d): %s", url, attempt + 1, retries + 1, e)
+        if attempt < retries:
+            time.sleep(DOWNLOAD_RETRY_DELAY * (attempt + 1))
+    else:
+        raise DownloadError(f"Unable to download {url} after {retries + 1} attempts")
+
+    size = part_path.stat().st_size
+    if total is not None and size != total:
+        raise DownloadError(f"Downloaded size of {url} is {size} bytes, expected {total}")
+
+    if checksum and checksum_algorithm:
+        try:
+            actual = file_checksum(part_path, checksum_algorithm)
+        except ValueError as e:
+            logging.warning("Skipping checksum verification for %s: %s", url, e)
+        else:
+            if actual.lower() != checksum.lower():
+                os.remove(part_path)
+                raise DownloadError(f"{checksum_algorithm} checksum mismatch for {url}: got {actual}, expected {checksum}")
+
+    os.replace(part_path, destination)
+    return DownloadResult(url=url, path=destination, size=size, transferred=transferred,
+                          seconds=time.monotonic() - start, resumed=resumed)
+
+
+def download_all(request: Callable, urls: List[str], directory: pathlib.Path,
+                 max_workers: int = DOWNLOAD_WORKERS) -> List[DownloadResult]:
+    """Download urls into directory with a bounded pool. Results are in the same order as urls."""
+    directory = pathlib.Path(directory)
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+        return list(executor.map(
+            lambda url: download_file(request, url, directory.joinpath(filename_from_url(url))), urls))
+
+
+def summarize_downloads(label: str, results: List[DownloadResult]) -> dict:
+    transferred = sum(result.transferred for result in results)
+    seconds = max((result.seconds for result in results), default=0.0)
+    summary = {
+        "files": len(results),
+        "bytes": transferred,
+        "seconds": seconds,
+        "bytes_per_second": transferred / seconds if seconds > 0 else 0.0,
+    }
+    logging.info("Downloaded %d file(s), %d bytes in %.1fs (%.0f bytes/sec) for %s",
+                 summary["files"], summary["bytes"], summary["seconds"], summary["bytes_per_second"], label)
+    return summary
+
+
+def granule_file_info(granule_json: dict, url: str) -> dict:
+    """
+    Find the size and checksum UMM-G declares for the file at url, matched by file name
+    against DataGranule.ArchiveAndDistributionInformation.
+    """
+    name = filename_from_url(url)
+    infos = granule_json.get('umm', {}).get('DataGranule', {}).get('ArchiveAndDistributionInformation', []) or []
+    for info in infos:
+        if info.get('Name') != name:
+            continue
+        checksum = info.get('Checksum') or {}
+        return {
+            "expected_size": info.get('SizeInBytes'),
+            "checksum": checksum.get('Value'),
+            "checksum_algorithm": checksum.get('Algorithm'),
+        }
+    return {}
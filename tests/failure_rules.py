@@ -0,0 +1,92 @@
+"""
+Known failure modes of the collection tests, recognized without an LLM.
+
+RULES is the table of known failures. Each rule's pattern is a named group of one combined
+regular expression, so a message is classified in a single scan however many rules there are.
+The GitHub labels of xml_to_json.py and aggregate_results.py come from these rules. Failures
+matching a rule use its summary and suggested fix, and only unclassified tracebacks are sent to
+the LLM.
+"""
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+@dataclass(frozen=True)
+class FailureRule:
+    name: str
+    # Regular expression without capturing groups
+    pattern: str
+    label: str
+    category: str
+    summary: str
+    suggested_fix: str
+
+
+RULES = [
+    FailureRule(
+        "no_granules", re.escape("No granules found"), "No Granules", "data",
+        "No granules were found for the collection",
+        "Check that the collection has granules in CMR for this environment, or test it with a specific granule.",
+    ),
+    FailureRule(
+        "no_umm_v", re.escape("There are no umm-v associated with this collection"), "No UMM-V", "metadata",
+        "No UMM-Var records are associated with the collection",
+        "Associate UMM-Var records to the collection in CMR.",
+    ),
+    FailureRule(
+        "timeout", r"Failed: Timeout \(>\d+(?:\.\d+)?s\) from pytest-timeout", "Timeout", "infrastructure",
+        "The test exceeded the pytest timeout",
+        "Check whether the Harmony job was queued or slow, and re-run the collection once Harmony has caught up.",
+    ),
+    FailureRule(
+        "forbidden", r"403 Client Error|Forbidden for url", "Forbidden", "access",
+        "Downloading the subsetted output or granule was refused (403)",
+        "Check that the test user's EDL token can download the collection, e.g. EULA or access constraints.",
+    ),
+    FailureRule(
+        "download_retries", r"Unable to download \S+ after \d+ attempts", "Download Failed", "infrastructure",
+        "The download kept failing with connection errors or timeouts",
+        "Check whether the data or Harmony endpoints were unavailable, and re-run the collection.",
+    ),
+    FailureRule(
+        "no_time_var", re.escape("Could not determine time variable"), "No Time Var", "metadata",
+        "The time variable of the subsetted file could not be determined",
+        "Check the time variable's UMM-Var record and CF attributes, or skip the temporal test in overrides.json.",
+    ),
+    FailureRule(
+        "no_lat_lon", re.escape("Unable to find latitude and longitude variables"), "No Lat/Lon", "metadata",
+        "The latitude and longitude variables of the subsetted file could not be found",
+        "Check the coordinate variables' UMM-Var records and CF attributes.",
+    ),
+]
+
+_RULES_BY_NAME = {rule.name: rule for rule in RULES}
+_COMBINED = re.compile("|".join(f"(?P<{rule.name}>{rule.pattern})" for rule in RULES))
+
+
+def classify(message) -> List[FailureRule]:
+    """Rules matching the message, in RULES order."""
+    names = {match.lastgroup for match in _COMBINED.finditer(str(message or ""))}
+    return [rule for rule in RULES if rule.name in names]
+
+
+def labels(message) -> List[str]:
+    """GitHub labels of the known failures in the message."""
+    return [rule.label for rule in classify(message)]
+
+
+def rule_summary(message) -> Optional[dict]:
+    """
+    Summary of a classified message in the form of aggregate_results.agent_summary, or None
+    when no rule matches and the message needs an LLM summary.
+    """
+    rules = classify(message)
+    if not rules:
+        return None
+    summary = "; ".join(rule.summary for rule in rules)
+    return {
+        "short_summary": summary,
+        "detailed_summary": summary,
+        "suggested_solution": " ".join(rule.suggested_fix for rule in rules),
+    }
@@ -0,0 +1,124 @@
+"""
+LLM summaries of failure messages, deduplicated and cached.
+
+Most failures of a regression run share a handful of tracebacks (timeouts, "No granules found",
+403s) that only differ in concept ids, job ids, paths and times. Messages are normalized and
+hashed so each distinct traceback is summarized once. Summaries are kept on disk under
+L2SS_SUMMARY_CACHE_DIR, or summaries/ under L2SS_CACHE_DIR, and the tracebacks not summarized
+before are sent to the LLM concurrently, paced by a token bucket instead of fixed sleeps.
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from metadata_cache import JsonCache, default_cache_dir
+
+SUMMARY_CACHE_DIR_ENV_VAR = "L2SS_SUMMARY_CACHE_DIR"
+MAX_WORKERS = int(os.environ.get("L2SS_LLM_WORKERS", 4))
+# LLM requests per minute
+RATE_PER_MINUTE = float(os.environ.get("L2SS_LLM_RATE", 30))
+# Summaries are regenerated after 30 days, in case the model or prompt changed
+SUMMARY_TTL = 30 * 24 * 60 * 60
+
+# Parts of a message that change between runs and collections without changing the failure
+VOLATILE_PATTERNS = [
+    (re.compile(r"\b[CGSVT]\d+-[A-Z0-9_]+\b"), "<concept-id>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I), "<uuid>"),
+    (re.compile(r"\b0x[0-9a-f]+\b", re.I), "<address>"),
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:?\d{2})?"), "<time>"),
+    (re.compile(r"(/tmp|/private/var|/var/folders)/\S+"), "<tmp-path>"),
+    # Query strings (signed links) and numeric path segments (e.g. Harmony work item ids) of URLs
+    (re.compile(r"https?://[^\s'\")]+"), lambda match: re.sub(r"/\d+(?=/|$)", "/<n>",
+                                                               re.sub(r"[?#].*", "", match.group(0)))),
+    (re.compile(r"\b\d+\.\d+s\b"), "<seconds>"),
+    (re.compile(r"[ \t]+"), " "),
+]
+
+
+def default_cache_path() -> Optional[str]:
+    if os.environ.get(SUMMARY_CACHE_DIR_ENV_VAR):
+        return os.environ[SUMMARY_CACHE_DIR_ENV_VAR]
+    return default_cache_dir()
+
+
+def normalize_traceback(message: str) -> str:
+    normalized = str(message or "").replace("\\n", "\n")
+    for pattern, replacement in VOLATILE_PATTERNS:
+        normalized = pattern.sub(replacement, normalized)
+    return "\n".join(line.strip() for line in normalized.splitlines() if line.strip())
+
+
+def traceback_key(message: str) -> str:
+    return hashlib.sha256(normalize_traceback(message).encode("utf-8")).hexdigest()
+
+
+class TokenBucket:
+    """Allows rate requests per second on average, in bursts of at most capacity."""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def summarize_all(messages: Iterable[str], summarize: Callable[[str], Any], namespace: str,
+                  cache_dir: Optional[str] = None, max_workers: int = MAX_WORKERS,
+                  rate_per_minute: float = RATE_PER_MINUTE) -> Dict[str, Any]:
+    """
+    Summary of every message, by traceback_key.
+
+    summarize turns one message into a JSON serializable summary. Messages with the same normalized
+    traceback are only summarized once, with the first of them as the example, and cached
+    summaries are reused. namespace separates the summaries of different prompts in the cache.
+    A message whose summary failed maps to None and is not cached, so the next run tries again.
+    """
+    cache = JsonCache(f"summaries/{namespace}", cache_dir if cache_dir is not None else default_cache_path(),
+                      ttl=SUMMARY_TTL)
+    unique = {}
+    for message in messages:
+        unique.setdefault(traceback_key(message), message)
+
+    summaries = {key: cache.get(key) for key in unique}
+    missing = [key for key, summary in summaries.items() if summary is None]
+    print(f"Summarizing {len(missing)} distinct failures ({len(unique) - len(missing)} cached)")
+    if not missing:
+        return summaries
+
+    bucket = TokenBucket(rate_per_minute / 60, capacity=max_workers)
+
+    def _summarize(key):
+        bucket.acquire()
+        try:
+            summary = summarize(unique[key])
+        except Exception as e:
+            logging.warning("Unable to summarize failure %s: %s", key[:12], e)
+            return None
+        if summary is not None:
+            cache.set(key, summary)
+        return summary
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as executor:
+        for key, summary in zip(missing, executor.map(_summarize, missing)):
+            summaries[key] = summary
+    print(f"Summarized {len(missing)} distinct failures in {time.time() - started:.1f}s")
+    return summaries
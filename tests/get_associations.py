@@ -3,6 +3,7 @@ import requests
 import json
 from datetime import datetime
 import cmr
+from l2ss_py_autotest.associations import iter_associations
 
 
 def bearer_token(env):
@@ -46,14 +47,8 @@ def get_associations(token, env):
     if env == "ops":
         mode = cmr.queries.CMR_OPS
 
-    headers = {
-        "Authorization": f"Bearer {token}"
-    }
-
     service_concept_id = cmr.queries.ServiceQuery(mode=mode).provider('POCLOUD').name('PODAAC L2 Cloud Subsetter').get()[0].get('concept_id')
-    url = cmr.queries.CollectionQuery(mode=mode).service_concept_id(service_concept_id)._build_url()
-    collections_query = requests.get(url, headers=headers, params={'page_size': 2000}).json()['feed']['entry']
-    collections = [a.get('id') for a in collections_query]
+    collections = list(iter_associations(mode, service_concept_id, "service", f"Bearer {token}" if token else None))
 
     filename = f"{env}_associations.json"
     with open(filename, 'w') as file:
@@ -0,0 +1,294 @@
+"""
+Concurrent synchronization of the regression GitHub issues.
+
+The existing issues are fetched once, every page of them, into an IssueCatalog indexed by title
+and by the env and concept id of regression failure titles, so looking an issue up never searches
+GitHub. The desired state of every issue is planned in an IssuePlan against the catalog, and
+sync_issues then applies the creates, updates and closes concurrently over a pooled session.
+An upsert given its semantic content carries a hash of it in a hidden marker in the issue body,
+and an open issue whose marker already matches is left alone instead of being rewritten.
+
+Every response's rate limit headers are tracked: when X-RateLimit-Remaining runs out, or GitHub
+sends Retry-After, all workers pause until the limit resets, and requests rejected by the primary
+or secondary rate limit are retried after the pause.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MAX_WORKERS = 4
+MAX_RETRIES = 3
+# Longest pause for a rate limit before the request is given up
+MAX_WAIT = 15 * 60
+# Pause after a secondary rate limit response without Retry-After, doubled on each retry
+SECONDARY_LIMIT_WAIT = 60
+
+CONTENT_HASH_MARKER = re.compile(r"<!-- content-hash: (?P<hash>[0-9a-f]+) -->")
+REGRESSION_TITLE = re.compile(r"^Regression Failure: (?P<env>[^|]+?) \| (?P<concept_id>[^|]+?)(?: \||$)")
+
+
+def api_url() -> str:
+    return os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
+
+def regression_issue_title(env: str, concept_id: str, short_name: str) -> str:
+    return f"Regression Failure: {env} | {concept_id} | {short_name}"
+
+
+def parse_regression_issue_title(title: str) -> Optional[Tuple[str, str]]:
+    """(env, concept_id) of a regression failure issue title, env lower case, or None for other titles."""
+    match = REGRESSION_TITLE.match(title or "")
+    if not match:
+        return None
+    return match.group("env").strip().lower(), match.group("concept_id").strip()
+
+
+def content_hash(content, labels: Optional[List[str]] = None, assignees: Optional[List[str]] = None) -> str:
+    """Hash of what an issue says, independent of timestamps and run links in its body."""
+    key = json.dumps({"content": content, "labels": sorted(labels or []), "assignees": sorted(assignees or [])},
+                     sort_keys=True, default=str)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+def body_content_hash(body: Optional[str]) -> Optional[str]:
+    match = CONTENT_HASH_MARKER.search(body or "")
+    return match.group("hash") if match else None
+
+
+class GitHubClient:
+    """GitHub REST client for one repository, safe to share between threads."""
+
+    def __init__(self, repo: str, token: str, max_workers: int = MAX_WORKERS, max_retries: int = MAX_RETRIES):
+        self.repo = repo
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=self.max_workers))
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=self.max_workers))
+        self.session.headers.update({
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github+json",
+        })
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def _wait(self) -> None:
+        with self._lock:
+            delay = self._resume_at - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _pause_until(self, resume_at: float) -> None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, min(resume_at, time.time() + MAX_WAIT))
+
+    def _note_rate_limit(self, response: requests.Response, attempt: int) -> bool:
+        """Pause for the rate limit reported by response. True when the request was rejected by it."""
+        headers = response.headers
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        retry_after = headers.get("Retry-After")
+        limited = response.status_code == 429 or (response.status_code == 403 and (
+            retry_after is not None or remaining == "0" or "rate limit" in response.text.lower()))
+
+        if retry_after is not None:
+            try:
+                self._pause_until(time.time() + float(retry_after))
+            except ValueError:
+                pass
+        elif remaining == "0" and reset:
+            print(f"GitHub rate limit used up, pausing until {time.strftime('%H:%M:%S', time.localtime(int(reset)))}")
+            self._pause_until(float(reset) + 1)
+        elif limited:
+            self._pause_until(time.time() + SECONDARY_LIMIT_WAIT * 2 ** attempt)
+        return limited
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Request path under the repository, e.g. /issues/12, waiting out the rate limit."""
+        kwargs.setdefault("timeout", 30)
+        url = f"{api_url()}/repos/{self.repo}{path}"
+        for attempt in range(self.max_retries + 1):
+            self._wait()
+            response = self.session.request(method, url, **kwargs)
+            if not self._note_rate_limit(response, attempt) or attempt == self.max_retries:
+                return response
+            print(f"GitHub rate limited {method} {path} (status {response.status_code}), retrying")
+        return response
+
+    def list_issues(self, labels: str, state: str = "open") -> List[dict]:
+        """Every issue with the given labels, newest first, following the pagination links to the last page."""
+        issues = []
+        params = {"state": state, "labels": labels, "per_page": 100}
+        page = 1
+        while True:
+            response = self.request("GET", "/issues", params={**params, "page": page})
+            if response.status_code != 200:
+                print(f"Failed to fetch {labels} issues (page {page}): {response.status_code}\n{response.text}")
+                break
+            issues.extend(issue for issue in response.json() if "pull_request" not in issue)
+            if "next" not in response.links:
+                break
+            page += 1
+        return issues
+
+
+class IssueCatalog:
+    """
+    Issues fetched once, indexed by title and, for regression failure issues, by env and concept
+    id, so an issue is still found when the short name in its title has changed. When several
+    issues match, the open one, then the newest, is kept.
+    """
+
+    def __init__(self, issues: Iterable[dict] = ()):
+        self.issues = list(issues)
+        self.by_title = {}
+        self.by_collection = {}
+        for issue in self.issues:
+            self._index(self.by_title, issue.get("title"), issue)
+            key = parse_regression_issue_title(issue.get("title"))
+            if key:
+                self._index(self.by_collection, key, issue)
+
+    @staticmethod
+    def _index(index: dict, key, issue: dict) -> None:
+        current = index.get(key)
+        if current is None or (current.get("state") != "open" and issue.get("state") == "open") or (
+                current.get("state") == issue.get("state") and issue.get("number", 0) > current.get("number", 0)):
+            index[key] = issue
+
+    @classmethod
+    def fetch(cls, client: GitHubClient, labels: str) -> "IssueCatalog":
+        """All issues with the given labels, open and closed."""
+        issues = client.list_issues(labels, state="all")
+        print(f"Fetched {len(issues)} {labels} issues")
+        return cls(issues)
+
+    def get(self, env: str, concept_id: str) -> Optional[dict]:
+        """The regression failure issue of a collection in env."""
+        return self.by_collection.get((env.lower(), concept_id))
+
+    def find(self, title: str) -> Optional[dict]:
+        """The regression failure issue of the same env and concept id as title, else the issue with this title."""
+        key = parse_regression_issue_title(title)
+        if key and key in self.by_collection:
+            return self.by_collection[key]
+        return self.by_title.get(title)
+
+    def open_issues(self) -> List[dict]:
+        return [issue for issue in self.issues if issue.get("state") == "open"]
+
+
+class IssuePlan:
+    """
+    Desired state of a set of issues, matched to the existing ones with IssueCatalog.find.
+    A later upsert of the same title replaces the earlier one.
+    """
+
+    def __init__(self, catalog: Optional[IssueCatalog] = None):
+        self.catalog = catalog or IssueCatalog()
+        self.upserts = {}
+        self.closes = {}
+
+    def existing(self, title: str) -> Optional[dict]:
+        return self.catalog.find(title)
+
+    def number(self, title: str) -> Optional[int]:
+        """Number of the existing issue with this title, if any."""
+        return (self.existing(title) or {}).get("number")
+
+    def upsert(self, title: str, body: str, labels: Optional[List[str]] = None,
+               assignees: Optional[List[str]] = None, number: Optional[int] = None, content=None) -> None:
+        """
+        Create the issue, or update (and reopen) the issue with this title or number. With content,
+        e.g. the failure messages, an open issue already showing the same content, labels and
+        assignees is not updated.
+        """
+        digest = None
+        if content is not None:
+            digest = content_hash(content, labels, assignees)
+            body = f"{body}\n\n<!-- content-hash: {digest} -->"
+        self.upserts[title] = {"body": body, "labels": labels, "assignees": assignees, "number": number,
+                               "hash": digest}
+
+    def close(self, number: int, description: str = "") -> None:
+        self.closes.setdefault(number, description)
+
+
+def _upsert(client: GitHubClient, plan: IssuePlan, title: str, change: dict) -> Tuple[Optional[dict], bool]:
+    """The created or updated issue, and whether it was changed."""
+    data = {"body": change["body"]}
+    if change["labels"]:
+        data["labels"] = change["labels"]
+    if change["assignees"]:
+        data["assignees"] = change["assignees"]
+
+    existing = plan.existing(title)
+    number = change["number"] or (existing or {}).get("number")
+    if number is None:
+        response = client.request("POST", "/issues", json={"title": title, **data})
+        if response.status_code == 201:
+            print(f"Created issue: {title}")
+            return response.json(), True
+        print(f"Failed to create issue: {title} (status {response.status_code})\n{response.text}")
+        return None, False
+
+    reopen = existing is not None and existing.get("state") == "closed"
+    if reopen:
+        data["state"] = "open"
+    if existing is not None and existing.get("title") != title:
+        # e.g. the short name of the collection changed
+        data["title"] = title
+    if (change["hash"] and existing is not None and existing.get("number") == number and "state" not in data
+            and "title" not in data and body_content_hash(existing.get("body")) == change["hash"]):
+        print(f"Unchanged issue: {title}")
+        return existing, False
+    response = client.request("PATCH", f"/issues/{number}", json=data)
+    if response.status_code == 200:
+        print(f"{'Reopened and updated' if reopen else 'Updated'} issue: {title}")
+        return response.json(), True
+    print(f"Failed to update issue: {title} (status {response.status_code})\n{response.text}")
+    return existing, False
+
+
+def _close(client: GitHubClient, number: int, description: str) -> None:
+    response = client.request("PATCH", f"/issues/{number}", json={"state": "closed"})
+    if response.status_code == 200:
+        print(f"Closed issue number: {number} {description}".rstrip())
+    else:
+        print(f"Failed to close issue number: {number} (status {response.status_code})\n{response.text}")
+
+
+def sync_issues(client: GitHubClient, plan: IssuePlan) -> Dict[str, dict]:
+    """
+    Apply the plan concurrently. Issues that are also upserted are not closed.
+
+    Returns
+    -------
+    dict of the created, updated or unchanged issue by title, for the upserts that succeeded
+    """
+    upserted_numbers = {change["number"] or plan.number(title) for title, change in plan.upserts.items()}
+    closes = {number: description for number, description in plan.closes.items() if number not in upserted_numbers}
+    if not plan.upserts and not closes:
+        return {}
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=client.max_workers) as executor:
+        upserts = {title: executor.submit(_upsert, client, plan, title, change)
+                   for title, change in plan.upserts.items()}
+        close_futures = [executor.submit(_close, client, number, description)
+                         for number, description in closes.items()]
+        results = {title: future.result() for title, future in upserts.items()}
+        for future in close_futures:
+            future.result()
+    changed = sum(1 for _, was_changed in results.values() if was_changed)
+    print(f"Synchronized {len(upserts)} issues ({changed} changed, {len(upserts) - changed} unchanged) "
+          f"and closed {len(closes)} in {time.time() - started:.1f}s")
+    return {title: issue for title, (issue, _) in results.items() if issue}
@@ -0,0 +1,260 @@
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional
+
+import harmony
+
+from metadata_cache import make_cache_key
+from token_utils import is_auth_error
+
+TERMINAL_STATUSES = ("successful", "complete_with_errors", "failed", "canceled")
+FAILED_STATUSES = ("failed", "canceled")
+QUEUED_STATUSES = ("accepted", "paused")
+
+DEFAULT_MIN_POLL_INTERVAL = 2.0
+DEFAULT_MAX_POLL_INTERVAL = 30.0
+DEFAULT_POLL_BACKOFF = 1.5
+MAX_CONSECUTIVE_POLL_ERRORS = 5
+CLAIM_WAIT_TIMEOUT = 120
+
+
+class HarmonyJobError(Exception):
+    pass
+
+
+class HarmonyJob:
+    """A submitted Harmony job and the latest status seen by the polling thread."""
+
+    def __init__(self, key: str, job_id: str):
+        self.key = key
+        self.job_id = job_id
+        self.status = {}
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.poll_errors = 0
+        self._done = threading.Event()
+
+    @property
+    def state(self) -> Optional[str]:
+        return self.status.get("status")
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def queue_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return self.started_at - self.submitted_at
+
+    def processing_seconds(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def _update(self, status: dict) -> bool:
+        """Record a polled status. Returns True if the job state or progress changed."""
+        changed = (status.get("status"), status.get("progress")) != (self.state, self.status.get("progress"))
+        self.status = status
+        self.poll_errors = 0
+        now = time.time()
+        if self.started_at is None and status.get("status") not in QUEUED_STATUSES:
+            self.started_at = now
+        if status.get("status") in TERMINAL_STATUSES:
+            self.finished_at = now
+            self._done.set()
+        return changed
+
+    def _fail(self, error: Exception) -> None:
+        self.error = error
+        self.finished_at = time.time()
+        self._done.set()
+
+
+class HarmonyJobEngine:
+    """
+    Submits Harmony requests without blocking and tracks every outstanding job from a
+    single background polling thread. The poll interval starts at min_poll_interval and
+    backs off towards max_poll_interval while no job changes state.
+
+    Identical requests are only submitted once per engine. When claims_dir is set (a
+    directory shared by the pytest-xdist workers of one run), a request submitted by one
+    worker is reused by the others instead of being submitted again.
+    """
+
+    def __init__(self, client_factory: Callable[[bool], harmony.Client], claims_dir: Optional[str] = None,
+                 min_poll_interval: float = DEFAULT_MIN_POLL_INTERVAL,
+                 max_poll_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+                 backoff: float = DEFAULT_POLL_BACKOFF):
+        self.client_factory = client_factory
+        self.claims_dir = pathlib.Path(claims_dir) if claims_dir else None
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self._client = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._completed = threading.Condition()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        if self.claims_dir is not None:
+            self.claims_dir.mkdir(parents=True, exist_ok=True)
+
+    def client(self, refresh: bool = False) -> harmony.Client:
+        with self._lock:
+            if refresh or self._client is None:
+                self._client = self.client_factory(refresh)
+            return self._client
+
+    def _call(self, func):
+        try:
+            return func(self.client())
+        except Exception as e:
+            if not is_auth_error(e):
+                raise
+            logging.info("Auth error from Harmony. Refreshing token and retrying once.")
+            return func(self.client(refresh=True))
+
+    def submit(self, request: harmony.Request) -> HarmonyJob:
+        key = self.client().request_as_url(request)
+        digest = make_cache_key(key)
+        with self._lock:
+            job = self._jobs.get(digest)
+        if job is not None:
+            return job
+
+        job = HarmonyJob(key, self._claim_or_submit(digest, request, key))
+        with self._lock:
+            self._jobs[digest] = job
+        self._ensure_polling()
+        self._wakeup.set()
+        return job
+
+    def submit_many(self, requests: Iterable[harmony.Request]) -> List[HarmonyJob]:
+        return [self.submit(request) for request in requests]
+
+    def _submit(self, request: harmony.Request, key: str) -> str:
+        logging.info("Sending harmony request %s", key)
+        job_id = self._call(lambda client: client.submit(request))
+        logging.info("Submitted harmony job %s", job_id)
+        return job_id
+
+    def _claim_or_submit(self, digest: str, request: harmony.Request, key: str) -> str:
+        if self.claims_dir is None:
+            return self._submit(request, key)
+
+        claim_path = self.claims_dir.joinpath(f"{digest}.json")
+        try:
+            fd = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            job_id = self._wait_for_claim(claim_path)
+            if job_id:
+                logging.info("Reusing harmony job %s submitted by another worker for %s", job_id, key)
+                return job_id
+            return self._submit(request, key)
+
+        try:
+            job_id = self._submit(request, key)
+        except BaseException:
+            os.close(fd)
+            os.remove(claim_path)
+            raise
+        with os.fdopen(fd, "w") as f:
+            json.dump({"job_id": job_id, "request": key}, f)
+        return job_id
+
+    @staticmethod
+    def _wait_for_claim(claim_path: pathlib.Path) -> Optional[str]:
+        deadline = time.monotonic() + CLAIM_WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                with open(claim_path) as f:
+                    return json.load(f)["job_id"]
+            except FileNotFoundError:
+                # The claiming worker failed to submit; submit it ourselves
+                return None
+            except (ValueError, KeyError):
+                # Claimed but the job id has not been written yet
+                time.sleep(0.5)
+        logging.warning("Timed out waiting for another worker to submit %s", claim_path.name)
+        return None
+
+    def _ensure_polling(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._poll_loop, name="harmony-job-poller", daemon=True)
+                self._thread.start()
+
+    def _pending_jobs(self) -> List[HarmonyJob]:
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.done()]
+
+    def _poll_loop(self) -> None:
+        interval = self.min_poll_interval
+        while not self._stopped.is_set():
+            pending = self._pending_jobs()
+            changed = False
+            for job in pending:
+                try:
+                    status = self._call(lambda client: client.status(job.job_id))
+                except Exception as e:
+                    job.poll_errors += 1
+                    logging.warning("Error polling harmony job %s (%d/%d): %s",
+                                    job.job_id, job.poll_errors, MAX_CONSECUTIVE_POLL_ERRORS, e)
+                    if job.poll_errors >= MAX_CONSECUTIVE_POLL_ERRORS:
+                        job._fail(e)
+                        changed = True
+                    continue
+                if job._update(status):
+                    changed = True
+
+            if changed:
+                with self._completed:
+                    self._completed.notify_all()
+            interval = self.min_poll_interval if changed else min(interval * self.backoff, self.max_poll_interval)
+
+            # Sleep until the next poll, or until a new job is submitted
+            woken = self._wakeup.wait(interval if pending else None)
+            if woken:
+                self._wakeup.clear()
+                interval = self.min_poll_interval
+
+    def wait(self, job: HarmonyJob, timeout: Optional[float] = None) -> dict:
+        """Block until job finishes. Returns the final status, raising if the job failed."""
+        if not job._done.wait(timeout):
+            raise HarmonyJobError(f"Timed out waiting for harmony job {job.job_id}")
+        if job.error is not None:
+            raise HarmonyJobError(f"Unable to get status of harmony job {job.job_id}: {job.error}")
+        if job.state in FAILED_STATUSES:
+            raise HarmonyJobError(f"Harmony job {job.job_id} {job.state}: {job.status.get('message')}")
+        return job.status
+
+    def as_completed(self, jobs: Iterable[HarmonyJob], timeout: Optional[float] = None) -> Iterator[HarmonyJob]:
+        """Yield jobs as they finish, in completion order."""
+        remaining = list(jobs)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while remaining:
+            finished = [job for job in remaining if job.done()]
+            for job in finished:
+                remaining.remove(job)
+                yield job
+            if not remaining:
+                break
+            wait_for = None if deadline is None else deadline - time.monotonic()
+            if wait_for is not None and wait_for <= 0:
+                raise HarmonyJobError(f"Timed out waiting for {len(remaining)} harmony jobs")
+            with self._completed:
+                self._completed.wait(min(wait_for, self.max_poll_interval) if wait_for is not None
+                                     else self.max_poll_interval)
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -0,0 +1,64 @@
+import hashlib
+import logging
+import pathlib
+import time
+from typing import Iterable, Optional
+
+from metadata_cache import JsonCache, make_cache_key
+
+INCREMENTAL_DIR_ENV_VAR = "L2SS_INCREMENTAL_DIR"
+# Default --incremental-max-age in hours
+DEFAULT_MAX_AGE_HOURS = 7 * 24
+
+
+def file_digest(paths: Iterable[pathlib.Path]) -> str:
+    """Digest of the names and contents of paths, in sorted order. Missing files are ignored."""
+    digest = hashlib.sha256()
+    for path in sorted(pathlib.Path(p) for p in paths):
+        try:
+            content = path.read_bytes()
+        except OSError:
+            continue
+        digest.update(str(path).encode("utf-8"))
+        digest.update(hashlib.sha256(content).digest())
+    return digest.hexdigest()
+
+
+def fingerprint(inputs: dict) -> str:
+    return make_cache_key(inputs)
+
+
+class IncrementalState:
+    """
+    The fingerprint of each collection's inputs when a generic test last ran, and its outcome.
+    A test can be skipped while its fingerprint is unchanged and it last passed less than
+    max_age seconds ago. Entries are stored one file per test so pytest-xdist workers can
+    record results concurrently.
+    """
+
+    def __init__(self, state_dir: str, max_age: float):
+        self.max_age = max_age
+        self._cache = JsonCache("incremental", state_dir)
+
+    def last(self, env: str, collection_concept_id: str, test_kind: str) -> Optional[dict]:
+        return self._cache.get([env, collection_concept_id, test_kind])
+
+    def unchanged(self, env: str, collection_concept_id: str, test_kind: str, current: str) -> Optional[dict]:
+        """The last passing result if it matches the current fingerprint and is recent enough, else None."""
+        last = self.last(env, collection_concept_id, test_kind)
+        if not last or last.get("outcome") != "passed" or last.get("fingerprint") != current:
+            return None
+        if time.time() - last.get("verified_at", 0) > self.max_age:
+            return None
+        return last
+
+    def record(self, env: str, collection_concept_id: str, test_kind: str, current: str, outcome: str,
+               inputs: Optional[dict] = None) -> None:
+        logging.info("Recording %s %s result for %s with fingerprint %s", outcome, test_kind, collection_concept_id,
+                     current[:12])
+        self._cache.set([env, collection_concept_id, test_kind], {
+            "fingerprint": current,
+            "outcome": outcome,
+            "verified_at": time.time(),
+            "inputs": inputs,
+        })
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import threading
+import time
+from typing import Any, Optional
+
+CACHE_DIR_ENV_VAR = "L2SS_CACHE_DIR"
+
+
+def default_cache_dir() -> Optional[str]:
+    return os.environ.get(CACHE_DIR_ENV_VAR) or None
+
+
+def make_cache_key(key) -> str:
+    raw = json.dumps(key, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def write_json_atomic(path: pathlib.Path, data) -> None:
+    """
+    Write JSON to path via a temporary file and rename so concurrent readers
+    (e.g. other pytest-xdist workers) never see a partially written file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+
+
+def read_json(path: pathlib.Path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.warning("Ignoring unreadable cache file %s: %s", path, e)
+        return None
+
+
+class JsonCache:
+    """
+    Keyed cache of JSON-serializable values with an optional TTL in seconds.
+
+    Entries are always kept in memory for the life of the process. When
+    cache_dir is set, entries are also written under cache_dir/namespace so
+    other pytest-xdist workers and later runs can reuse them until they expire.
+    """
+
+    def __init__(self, namespace: str, cache_dir: Optional[str] = None, ttl: Optional[float] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.root = pathlib.Path(cache_dir).joinpath(namespace) if cache_dir else None
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str) -> pathlib.Path:
+        return self.root.joinpath(digest[:2], f"{digest}.json")
+
+    def _is_fresh(self, entry: dict) -> bool:
+        if self.ttl is None:
+            return True
+        return (time.time() - entry.get("stored_at", 0)) <= self.ttl
+
+    def get(self, key, default=None) -> Any:
+        digest = make_cache_key(key)
+        with self._lock:
+            entry = self._memory.get(digest)
+        if entry is None and self.root is not None:
+            entry = read_json(self._path(digest))
+        if not entry or not self._is_fresh(entry):
+            return default
+        with self._lock:
+            self._memory[digest] = entry
+        return entry.get("value")
+
+    def set(self, key, value) -> None:
+        digest = make_cache_key(key)
+        entry = {"key": key, "stored_at": time.time(), "value": value}
+        with self._lock:
+            self._memory[digest] = entry
+        if self.root is not None:
+            try:
+                write_json_atomic(self._path(digest), entry)
+            except OSError as e:
+                logging.warning("Unable to write %s cache entry: %s", self.namespace, e)
+
+    def delete(self, key) -> None:
+        digest = make_cache_key(key)
+        with self._lock:
+            self._memory.pop(digest, None)
+        if self.root is not None:
+            try:
+                os.remove(self._path(digest))
+            except FileNotFoundError:
+                pass
+
+    def evict_expired(self) -> int:
+        """Remove expired entries from disk. Returns the number of files removed."""
+        if self.root is None or self.ttl is None or not self.root.exists():
+            return 0
+        removed = 0
+        for path in self.root.rglob("*.json"):
+            entry = read_json(path)
+            if entry is None or not self._is_fresh(entry):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+
+class UmmVarCache:
+    """
+    Content-addressed store of UMM-Var records keyed by (env, concept-id, revision-id),
+    plus a per-collection index of the variable revisions associated to each collection.
+
+    Records never change for a given revision so they are only evicted after
+    record_ttl. The collection index expires after ttl, or as soon as the collection
+    revision or its variable associations change, after which the variable revisions
+    are listed again and only new or changed revisions are fetched.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: Optional[float] = None,
+                 record_ttl: Optional[float] = 30 * 24 * 60 * 60):
+        self.records = JsonCache("umm_var/records", cache_dir, ttl=record_ttl)
+        self.index = JsonCache("umm_var/collections", cache_dir, ttl=ttl)
+
+    def get_record(self, env: str, concept_id: str, revision_id) -> Optional[dict]:
+        if revision_id is None:
+            return None
+        return self.records.get([env, concept_id, revision_id])
+
+    def put_record(self, env: str, record: dict) -> None:
+        meta = record.get("meta", {})
+        self.records.set([env, meta.get("concept-id"), meta.get("revision-id")], record)
+
+    def collection_entry(self, env: str, collection_concept_id: str) -> Optional[dict]:
+        return self.index.get([env, collection_concept_id])
+
+    def load_collection(self, env: str, collection_concept_id: str, collection_revision=None,
+                        variable_concept_ids: Optional[list] = None) -> Optional[list]:
+        """
+        Return the cached variables for a collection, or None when the index has
+        expired, was stored for another collection revision or other associated
+        variables, or any of the referenced revisions are missing from the store.
+        """
+        entry = self.collection_entry(env, collection_concept_id)
+        if entry is None:
+            return None
+        if collection_revision is not None and entry.get("collection_revision") != collection_revision:
+            return None
+        if variable_concept_ids is not None and \
+                sorted(concept_id for concept_id, _ in entry.get("variables", [])) != sorted(variable_concept_ids):
+            return None
+        variables = []
+        for concept_id, revision_id in entry.get("variables", []):
+            record = self.get_record(env, concept_id, revision_id)
+            if record is None:
+                return None
+            variables.append(record)
+        return variables
+
+    def store_collection(self, env: str, collection_concept_id: str, collection_revision, variables: list) -> None:
+        self.index.set([env, collection_concept_id], {
+            "collection_revision": collection_revision,
+            "variables": [[v["meta"]["concept-id"], v["meta"]["revision-id"]] for v in variables],
+        })
+
+    def evict_expired(self) -> int:
+        return self.records.evict_expired() + self.index.evict_expired()
+
+
+class CoordinateCache:
+    """
+    Resolved coordinate and science variables of each collection's subsetted output,
+    keyed by (env, collection concept-id). An entry is only used while the collection
+    revision and its UMM-Var revisions match those it was resolved against.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: Optional[float] = None):
+        self.cache = JsonCache("coordinates", cache_dir, ttl=ttl)
+
+    @staticmethod
+    def _revision(collection_entry: Optional[dict]) -> Optional[str]:
+        if not collection_entry:
+            return None
+        return make_cache_key([collection_entry.get("collection_revision"), collection_entry.get("variables")])
+
+    def get(self, env: str, collection_concept_id: str, collection_entry: Optional[dict]) -> Optional[dict]:
+        revision = self._revision(collection_entry)
+        entry = self.cache.get([env, collection_concept_id])
+        if revision is None or entry is None or entry.get("revision") != revision:
+            return None
+        return entry.get("coordinates")
+
+    def put(self, env: str, collection_concept_id: str, collection_entry: Optional[dict], coordinates: dict) -> None:
+        revision = self._revision(collection_entry)
+        if revision is None:
+            return
+        self.cache.set([env, collection_concept_id], {"revision": revision, "coordinates": coordinates})
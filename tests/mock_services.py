@@ -0,0 +1,706 @@
+"""
+Local stand-in for CMR, Harmony, EDL and the CMR GraphQL API, used by ``--env local``.
+
+Everything is served from one HTTP server on localhost (port 3000 by default, which is where
+harmony-py's LOCAL environment looks for Harmony):
+
+    /search/...                 CMR search (collections, granules, variables, services, tools)
+    /{collection}/ogc-api-...   Harmony job submission
+    /jobs/{job_id}              Harmony job status and result links
+    /outputs/{job_id}/{file}    synthetic subsetted netCDF outputs
+    /data/{granule}.nc          synthetic original granules
+    /edl/api/users/...          EDL tokens
+    /graphql/api                CMR GraphQL collection short names
+
+Collections, granules and UMM-Var records are generated deterministically from their index.
+Recorded UMM-G or UMM-Var JSON can be dropped into --fixtures-dir to replace the generated ones.
+Latency, HTTP failures and failed Harmony jobs can be injected to exercise the retry paths.
+
+Run standalone with:
+
+    python mock_services.py --port 3000 --collections 900 --latency 0.05 --failure-rate 0.01
+"""
+import argparse
+import email
+import email.policy
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import netCDF4
+import numpy as np
+
+MOCK_URL_ENV_VAR = "L2SS_MOCK_URL"
+DEFAULT_PORT = 3000
+MOCK_PROVIDER = "MOCK_CLOUD"
+MOCK_TOKEN = "mock-edl-token"
+SERVICE_CONCEPT_ID = f"S1200000000-{MOCK_PROVIDER}"
+TOOL_CONCEPT_ID = f"TL1200000000-{MOCK_PROVIDER}"
+SERVICE_NAME = "PODAAC L2 Cloud Subsetter"
+SERVICE_VERSION = "0.0.0-mock"
+GRANULE_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def base_url() -> str:
+    return os.environ.get(MOCK_URL_ENV_VAR, f"http://localhost:{DEFAULT_PORT}").rstrip("/")
+
+
+def cmr_url() -> str:
+    return f"{base_url()}/search/"
+
+
+def edl_url() -> str:
+    return f"{base_url()}/edl"
+
+
+def graphql_url() -> str:
+    return f"{base_url()}/graphql/api"
+
+
+@dataclass
+class MockConfig:
+    collections: int = 20
+    latency: float = 0.0
+    failure_rate: float = 0.0
+    job_seconds: float = 1.0
+    job_failure_rate: float = 0.0
+    seed: int = 0
+    fixtures_dir: Optional[str] = None
+    # rows x columns of the generated granules and Harmony outputs
+    granule_shape: str = "60x40"
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        rows, cols = self.granule_shape.lower().split("x")
+        return int(rows), int(cols)
+
+    @classmethod
+    def from_env(cls) -> "MockConfig":
+        """Read overrides from L2SS_MOCK_<FIELD> environment variables."""
+        values = {}
+        for field in fields(cls):
+            raw = os.environ.get(f"L2SS_MOCK_{field.name.upper()}")
+            if raw is None:
+                continue
+            values[field.name] = raw if field.default is None else type(field.default)(raw)
+        return cls(**values)
+
+
+def collection_ids(count: int) -> List[str]:
+    return [f"C{1200000000 + i}-{MOCK_PROVIDER}" for i in range(count)]
+
+
+def _index(concept_id: str) -> int:
+    return int(re.match(r"[A-Z]+(\d+)-", concept_id).group(1)) % 100000000
+
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def synthetic_netcdf(bbox: Tuple[float, float, float, float], seed: int, shape=(60, 40)) -> bytes:
+    """A small swath-like granule whose lat/lon fall inside bbox (west, south, east, north)."""
+    west, south, east, north = bbox
+    rng = np.random.default_rng(seed)
+    rows, cols = shape
+    lat = np.linspace(south, north, rows)[:, None].repeat(cols, axis=1)
+    if east < west:
+        east += 360
+    lon = np.linspace(west, east, cols)[None, :].repeat(rows, axis=0)
+    lon = (lon + 180) % 360 - 180
+    sst = rng.normal(290, 2, shape)
+    sst[rng.random(shape) < 0.1] = np.nan
+
+    fd, path = tempfile.mkstemp(suffix=".nc")
+    os.close(fd)
+    try:
+        with netCDF4.Dataset(path, "w") as nc:
+            nc.createDimension("time", 1)
+            nc.createDimension("along_track", rows)
+            nc.createDimension("across_track", cols)
+            time_var = nc.createVariable("time", "f8", ("time",))
+            time_var.standard_name = "time"
+            time_var.units = "seconds since 2024-01-01 00:00:00"
+            time_var[:] = [1800.0]
+            for name, data, units in (("lat", lat, "degrees_north"), ("lon", lon, "degrees_east")):
+                var = nc.createVariable(name, "f4", ("along_track", "across_track"), fill_value=-999.0)
+                var.units = units
+                var.standard_name = "latitude" if name == "lat" else "longitude"
+                var[:] = data
+            sst_var = nc.createVariable("sea_surface_temperature", "f4", ("time", "along_track", "across_track"),
+                                        fill_value=-32767.0)
+            sst_var.units = "kelvin"
+            sst_var.coordinates = "lat lon"
+            sst_var[:] = np.ma.masked_invalid(sst)[None, ...]
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+class MockState:
+    """Generated CMR metadata, Harmony jobs and file contents shared by all request threads."""
+
+    def __init__(self, config: MockConfig, root_url: str):
+        self.config = config
+        self.root_url = root_url
+        self.collection_ids = collection_ids(config.collections)
+        self._jobs = {}
+        self._files = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(config.seed)
+
+    def _fixture(self, kind: str, concept_id: str) -> Optional[dict]:
+        if not self.config.fixtures_dir:
+            return None
+        path = os.path.join(self.config.fixtures_dir, kind, f"{concept_id}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def chance(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self._random.random() < rate
+
+    # CMR
+    def collection_bbox(self, collection_concept_id: str) -> Tuple[float, float, float, float]:
+        rng = random.Random(f"{self.config.seed}-{collection_concept_id}")
+        south = rng.uniform(-60, 40)
+        west = rng.uniform(-170, 150)
+        return west, south, west + 20, south + 20
+
+    def collection(self, collection_concept_id: str) -> dict:
+        i = _index(collection_concept_id)
+        return {
+            "id": collection_concept_id,
+            "short_name": f"MOCK_L2_COLLECTION_{i}",
+            "title": f"Mock Level 2 collection {i}",
+            "revision_id": 1,
+            "data_center": MOCK_PROVIDER,
+            "associations": {
+                "variables": [var["meta"]["concept-id"] for var in self.variables(collection_concept_id)],
+                "services": [SERVICE_CONCEPT_ID],
+                "tools": [TOOL_CONCEPT_ID],
+            },
+        }
+
+    def granule_id(self, collection_concept_id: str) -> str:
+        return f"G{1200000000 + _index(collection_concept_id)}-{MOCK_PROVIDER}"
+
+    def granule(self, collection_concept_id: str) -> dict:
+        recorded = self._fixture("granules", collection_concept_id)
+        if recorded is not None:
+            return recorded
+        granule_id = self.granule_id(collection_concept_id)
+        west, south, east, north = self.collection_bbox(collection_concept_id)
+        name = f"{granule_id}.nc"
+        content = self.file_content(f"/data/{name}")
+        return {
+            "meta": {"concept-id": granule_id, "revision-id": 1, "provider-id": MOCK_PROVIDER,
+                     "collection-concept-id": collection_concept_id, "native-id": name},
+            "umm": {
+                "GranuleUR": name,
+                "TemporalExtent": {"RangeDateTime": {
+                    "BeginningDateTime": _iso(GRANULE_START),
+                    "EndingDateTime": _iso(GRANULE_START + timedelta(hours=1)),
+                }},
+                "SpatialExtent": {"HorizontalSpatialDomain": {"Geometry": {"BoundingRectangles": [{
+                    "WestBoundingCoordinate": west, "SouthBoundingCoordinate": south,
+                    "EastBoundingCoordinate": east, "NorthBoundingCoordinate": north,
+                }]}}},
+                "RelatedUrls": [{"URL": f"{self.root_url}/data/{name}", "Type": "GET DATA"}],
+                "DataGranule": {"ArchiveAndDistributionInformation": [{
+                    "Name": name,
+                    "SizeInBytes": len(content),
+                    "Checksum": {"Value": hashlib.md5(content).hexdigest(), "Algorithm": "MD5"},
+                }]},
+            },
+        }
+
+    def variables(self, collection_concept_id: str) -> List[dict]:
+        recorded = self._fixture("variables", collection_concept_id)
+        if recorded is not None:
+            return recorded
+        i = _index(collection_concept_id)
+        definitions = (
+            ("lat", "COORDINATE", "LATITUDE"),
+            ("lon", "COORDINATE", "LONGITUDE"),
+            ("time", "COORDINATE", "TIME"),
+            ("sea_surface_temperature", "SCIENCE_VARIABLE", None),
+        )
+        variables = []
+        for j, (name, var_type, sub_type) in enumerate(definitions):
+            umm = {"Name": name, "LongName": name, "VariableType": var_type, "DataType": "float32"}
+            if sub_type:
+                umm["VariableSubType"] = sub_type
+            variables.append({
+                "meta": {"concept-id": f"V{1200000000 + i * 10 + j}-{MOCK_PROVIDER}", "revision-id": 1,
+                         "provider-id": MOCK_PROVIDER},
+                "umm": umm,
+            })
+        return variables
+
+    def variable(self, variable_concept_id: str) -> Optional[dict]:
+        collection_concept_id = f"C{1200000000 + _index(variable_concept_id) // 10}-{MOCK_PROVIDER}"
+        for var in self.variables(collection_concept_id):
+            if var["meta"]["concept-id"] == variable_concept_id:
+                return var
+        return None
+
+    # Harmony
+    def create_job(self, collection_concept_id: str, params: Dict[str, List[str]]) -> dict:
+        job_id = str(uuid.uuid4())
+        bbox = self.collection_bbox(collection_concept_id)
+        for subset in params.get("subset", []):
+            match = re.match(r"(lat|lon)\(([-\d.eE]+):([-\d.eE]+)\)", subset)
+            if match:
+                low, high = float(match.group(2)), float(match.group(3))
+                west, south, east, north = bbox
+                bbox = (low, south, high, north) if match.group(1) == "lon" else (west, low, east, high)
+        job = {
+            "jobID": job_id,
+            "collection": collection_concept_id,
+            "bbox": bbox,
+            "created": time.time(),
+            "fail": self.chance(self.config.job_failure_rate),
+            "request": f"{self.root_url}/{collection_concept_id}/ogc-api-coverages/1.0.0/collections/"
+                       f"parameter_vars/coverage/rangeset",
+            "granules": params.get("granuleId", [self.granule_id(collection_concept_id)]),
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        # Harmony answers an asynchronous submission with the accepted job, however fast it runs
+        return {**self.job_status(job_id), "status": "accepted", "progress": 0,
+                "message": "The job has been accepted"}
+
+    def job_status(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        elapsed = time.time() - job["created"]
+        progress = min(100, int(100 * elapsed / self.config.job_seconds)) if self.config.job_seconds > 0 else 100
+        if progress < 100:
+            status, message = ("accepted", "The job has been accepted") if progress == 0 else \
+                ("running", "The job is being processed")
+        elif job["fail"]:
+            status, message = "failed", "WorkItem failed: injected failure from the mock Harmony service"
+        else:
+            status, message = "successful", "The job has completed successfully"
+        created = datetime.fromtimestamp(job["created"], tz=timezone.utc)
+        links = [{"href": f"{self.root_url}/jobs/{job_id}", "rel": "self", "title": "The current page"}]
+        if status == "successful":
+            for granule_id in job["granules"]:
+                links.append({
+                    "href": f"{self.root_url}/outputs/{job_id}/{granule_id}_subsetted.nc4",
+                    "rel": "data", "type": "application/x-netcdf4", "title": f"{granule_id}_subsetted.nc4",
+                })
+        return {
+            "jobID": job_id,
+            "username": "mock",
+            "status": status,
+            "message": message,
+            "progress": progress,
+            "createdAt": _iso(created),
+            "updatedAt": _iso(datetime.now(tz=timezone.utc)),
+            "dataExpiration": _iso(created + timedelta(days=30)),
+            "request": job["request"],
+            "numInputGranules": len(job["granules"]),
+            "links": links,
+        }
+
+    def file_content(self, path: str) -> Optional[bytes]:
+        with self._lock:
+            content = self._files.get(path)
+        if content is not None:
+            return content
+
+        match = re.match(r"/outputs/([^/]+)/", path)
+        if match:
+            with self._lock:
+                job = self._jobs.get(match.group(1))
+            if job is None:
+                return None
+            content = synthetic_netcdf(job["bbox"], _index(job["collection"]), self.config.shape)
+        else:
+            match = re.match(r"/data/G(\d+)-[^/]+\.nc$", path)
+            if not match:
+                return None
+            collection_concept_id = f"C{match.group(1)}-{MOCK_PROVIDER}"
+            content = synthetic_netcdf(self.collection_bbox(collection_concept_id), _index(collection_concept_id),
+                                       self.config.shape)
+
+        with self._lock:
+            self._files[path] = content
+        return content
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server_version = "l2ss-mock/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self) -> MockState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        logging.debug("mock %s - %s", self.address_string(), format % args)
+
+    def _send_json(self, body, status: int = 200, headers: Optional[dict] = None) -> None:
+        self._send_bytes(json.dumps(body).encode("utf-8"), "application/json", status, headers)
+
+    def _send_bytes(self, payload: bytes, content_type: str, status: int = 200,
+                    headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, status: int, description: str) -> None:
+        self._send_json({"code": str(status), "description": description}, status)
+
+    def _authorized(self) -> bool:
+        if self.headers.get("Authorization", "").startswith(("Bearer", "Basic")):
+            return True
+        self._send_error(401, "Unauthorized: a bearer token is required")
+        return False
+
+    def _params(self) -> Dict[str, List[str]]:
+        parsed = urlparse(self.path)
+        params = parse_qs(parsed.query)
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return params
+        body = self.rfile.read(length)
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("multipart/form-data"):
+            message = email.message_from_bytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body, policy=email.policy.HTTP)
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                if name:
+                    params.setdefault(name, []).append(part.get_payload(decode=True).decode("utf-8").strip())
+        elif content_type.startswith("application/json"):
+            params["_json"] = [body.decode("utf-8")]
+        else:
+            for key, values in parse_qs(body.decode("utf-8")).items():
+                params.setdefault(key, []).extend(values)
+        return params
+
+    def _inject(self) -> bool:
+        """Apply configured latency and failures. Returns True if the request was failed."""
+        if self.state.config.latency > 0:
+            time.sleep(self.state.config.latency)
+        if self.state.chance(self.state.config.failure_rate):
+            self._send_error(503, "Service Unavailable: injected failure from the mock service")
+            return True
+        return False
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        params = self._params()
+        if self._inject():
+            return
+        path = urlparse(self.path).path
+        try:
+            if path.startswith("/search/"):
+                self._cmr(path[len("/search/"):], params)
+            elif path.startswith("/edl/"):
+                self._edl(path, method)
+            elif path == "/graphql/api":
+                self._graphql(params)
+            elif path.startswith(("/outputs/", "/data/")):
+                self._file(path)
+            elif path == "/jobs":
+                if self._authorized():
+                    self._send_json({"count": 0, "jobs": []})
+            elif path == "/jobs/status":
+                self._job_statuses(params)
+            elif path.startswith("/jobs/"):
+                self._job(path[len("/jobs/"):])
+            elif "/ogc-api-coverages/" in path:
+                self._submit(path, params)
+            else:
+                self._send_error(404, f"No mock route for {path}")
+        except Exception as e:
+            logging.exception("Mock service error for %s", self.path)
+            self._send_error(500, str(e))
+
+    # Routes
+    def _cmr(self, route: str, params: Dict[str, List[str]]) -> None:
+        concept_ids = params.get("concept_id[]", []) + params.get("concept_id", [])
+        page_size = int(params.get("page_size", ["10"])[0])
+        search_after = self.headers.get("CMR-Search-After")
+        offset = int(search_after) if search_after else 0
+
+        if route.startswith("collections"):
+            ids = self.state.collection_ids
+            if concept_ids:
+                ids = [c for c in concept_ids if c in ids]
+            if "service_concept_id" in params or "tool_concept_id" in params:
+                requested = (params.get("service_concept_id") or params.get("tool_concept_id"))[0]
+                if requested not in (SERVICE_CONCEPT_ID, TOOL_CONCEPT_ID):
+                    ids = []
+            if "updated_since" in params:
+                # Generated collections never change
+                ids = []
+            page = ids[offset:offset + page_size]
+            headers = {"CMR-Hits": str(len(ids))}
+            if offset + page_size < len(ids) and page_size:
+                headers["CMR-Search-After"] = str(offset + page_size)
+            if route.endswith("umm_json"):
+                items = [{"meta": {"concept-id": c, "revision-id": 1}, "umm": {
+                    "ShortName": self.state.collection(c)["short_name"]}} for c in page]
+                self._send_json({"hits": len(ids), "items": items}, headers=headers)
+            elif route.endswith("xml"):
+                # Reference format: only the id, name and revision of each collection
+                references = "".join(
+                    f"<reference><name>{self.state.collection(c)['short_name']}</name><id>{c}</id>"
+                    f"<revision-id>1</revision-id></reference>" for c in page)
+                payload = f"<results><hits>{len(ids)}</hits><references>{references}</references></results>"
+                self._send_bytes(payload.encode("utf-8"), "application/xml", headers=headers)
+            else:
+                self._send_json({"feed": {"entry": [self.state.collection(c) for c in page]}}, headers=headers)
+        elif route.startswith("granules"):
+            if not self._authorized():
+                return
+            collection_concept_id = params.get("collection_concept_id", [None])[0]
+            if concept_ids:
+                collection_concept_id = f"C{1200000000 + _index(concept_ids[0])}-{MOCK_PROVIDER}"
+            if collection_concept_id not in self.state.collection_ids:
+                self._send_json({"hits": 0, "items": []}, headers={"CMR-Hits": "0"})
+                return
+            self._send_json({"hits": 1, "items": [self.state.granule(collection_concept_id)]},
+                            headers={"CMR-Hits": "1"})
+        elif route.startswith("variables"):
+            if not self._authorized():
+                return
+            records = [r for r in (self.state.variable(c) for c in concept_ids) if r is not None]
+            if route.endswith("umm_json"):
+                items = records
+            else:
+                items = [{"concept_id": r["meta"]["concept-id"], "revision_id": r["meta"]["revision-id"],
+                          "name": r["umm"]["Name"]} for r in records]
+            self._send_json({"hits": len(items), "items": items}, headers={"CMR-Hits": str(len(items))})
+        elif route.startswith(("services", "tools")):
+            concept_id = SERVICE_CONCEPT_ID if route.startswith("services") else TOOL_CONCEPT_ID
+            if route.endswith("umm_json"):
+                item = {"meta": {"concept-id": concept_id, "provider-id": MOCK_PROVIDER},
+                        "umm": {"Name": SERVICE_NAME, "Version": SERVICE_VERSION}}
+                self._send_json({"hits": 1, "items": [item]}, headers={"CMR-Hits": "1"})
+                return
+            # CMR answers service and tool searches with "items" rather than an Atom feed
+            item = {"concept_id": concept_id, "name": SERVICE_NAME, "provider_id": MOCK_PROVIDER}
+            items = [item] if params.get("page_num", ["1"])[0] == "1" else []
+            self._send_json({"hits": 1, "items": items}, headers={"CMR-Hits": "1"})
+        else:
+            self._send_error(404, f"Unsupported CMR route {route}")
+
+    def _edl(self, path: str, method: str) -> None:
+        if not self._authorized():
+            return
+        token = {"access_token": MOCK_TOKEN, "token_type": "Bearer", "expiration_date": "12/31/2099"}
+        if path.endswith("/tokens"):
+            self._send_json([token])
+        else:
+            self._send_json(token)
+
+    def _graphql(self, params: Dict[str, List[str]]) -> None:
+        query = json.loads(params.get("_json", ["{}"])[0]).get("query", "")
+        match = re.search(r'conceptId:\s*\[([^\]]*)\]', query)
+        if match:
+            ids = re.findall(r'"([^"]+)"', match.group(1))
+        else:
+            provider = re.search(r'provider:\s*"([^"]+)"', query)
+            ids = self.state.collection_ids if provider and provider.group(1) == MOCK_PROVIDER else []
+            offset = re.search(r'offset:\s*(\d+)', query)
+            limit = re.search(r'limit:\s*(\d+)', query)
+            start = int(offset.group(1)) if offset else 0
+            ids = ids[start:start + (int(limit.group(1)) if limit else 2000)]
+        if re.search(r'updatedSince:', query):
+            # Generated collections never change
+            ids = []
+        items = [{"conceptId": c, "shortName": self.state.collection(c)["short_name"], "version": "1",
+                  "provider": MOCK_PROVIDER, "revisionDate": "2024-01-01T00:00:00.000Z"}
+                 for c in ids if c in self.state.collection_ids]
+        self._send_json({"data": {"collections": {"count": len(items), "items": items}}})
+
+    def _submit(self, path: str, params: Dict[str, List[str]]) -> None:
+        if not self._authorized():
+            return
+        collection_concept_id = path.strip("/").split("/")[0]
+        if collection_concept_id not in self.state.collection_ids:
+            self._send_error(404, f"Collection {collection_concept_id} not found")
+            return
+        self._send_json(self.state.create_job(collection_concept_id, params))
+
+    def _job(self, job_id: str) -> None:
+        if not self._authorized():
+            return
+        status = self.state.job_status(job_id)
+        if status is None:
+            self._send_error(404, f"Job {job_id} not found")
+        else:
+            self._send_json(status)
+
+    def _job_statuses(self, params: Dict[str, List[str]]) -> None:
+        # Batch status endpoint polled by newer harmony-py releases
+        if not self._authorized():
+            return
+        job_ids = json.loads(params.get("_json", ["{}"])[0]).get("jobIDs", [])
+        statuses = {job_id: self.state.job_status(job_id) for job_id in job_ids}
+        self._send_json({
+            "jobStatuses": [{"jobID": job_id, "status": status["status"], "progress": status["progress"]}
+                            for job_id, status in statuses.items() if status is not None],
+            "notFoundJobIDs": [job_id for job_id, status in statuses.items() if status is None],
+        })
+
+    def _file(self, path: str) -> None:
+        if not self._authorized():
+            return
+        content = self.state.file_content(path)
+        if content is None:
+            self._send_error(404, f"{path} not found")
+            return
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header:
+            match = re.match(r"bytes=(\d+)-", range_header)
+            start = int(match.group(1)) if match else 0
+            if start >= len(content):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(content)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        body = content[start:]
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", "application/x-netcdf4")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Accept-Ranges", "bytes")
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(content) - 1}/{len(content)}")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = DEFAULT_PORT, config: Optional[MockConfig] = None, host: str = "127.0.0.1"):
+        super().__init__((host, port), MockHandler)
+        root_url = f"http://localhost:{self.server_address[1]}"
+        self.state = MockState(config or MockConfig(), root_url)
+
+    @property
+    def url(self) -> str:
+        return self.state.root_url
+
+    def start(self) -> "MockServer":
+        threading.Thread(target=self.serve_forever, name="mock-services", daemon=True).start()
+        return self
+
+
+def is_running(url: Optional[str] = None, timeout: float = 0.5) -> bool:
+    parsed = urlparse(url or base_url())
+    try:
+        with socket.create_connection((parsed.hostname, parsed.port or 80), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def list_collection_ids(url: Optional[str] = None, page_size: int = 2000) -> List[str]:
+    """Collections the mock associates to the subsetter, paged the same way as real CMR."""
+    import requests
+
+    ids = []
+    headers = {}
+    while True:
+        response = requests.get(f"{(url or base_url()).rstrip('/')}/search/collections.json",
+                                params={"service_concept_id": SERVICE_CONCEPT_ID, "page_size": page_size},
+                                headers=headers, timeout=30)
+        response.raise_for_status()
+        ids.extend(entry["id"] for entry in response.json()["feed"]["entry"])
+        search_after = response.headers.get("CMR-Search-After")
+        if not search_after:
+            return ids
+        headers = {"CMR-Search-After": search_after}
+
+
+def start_subprocess(port: int = DEFAULT_PORT, startup_timeout: float = 10,
+                     env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    """
+    Start the mock in a separate process so every pytest-xdist worker talks to the same
+    job and file state. Configuration is passed through the L2SS_MOCK_* environment variables,
+    taken from os.environ updated with env.
+    """
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--port", str(port)],
+                               env={**os.environ, **(env or {})})
+    url = f"http://localhost:{port}"
+    deadline = time.monotonic() + startup_timeout
+    while not is_running(url):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"Mock services did not start on port {port}")
+        time.sleep(0.1)
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for CMR, Harmony and EDL")
+    defaults = MockConfig.from_env()
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--collections", type=int, default=defaults.collections,
+                        help="Number of generated collections associated to the subsetter")
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="Seconds added to every response")
+    parser.add_argument("--failure-rate", type=float, default=defaults.failure_rate,
+                        help="Fraction of requests answered with HTTP 503")
+    parser.add_argument("--job-seconds", type=float, default=defaults.job_seconds,
+                        help="Seconds a Harmony job takes to finish")
+    parser.add_argument("--job-failure-rate", type=float, default=defaults.job_failure_rate,
+                        help="Fraction of Harmony jobs that finish as failed")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--granule-shape", default=defaults.granule_shape,
+                        help="Rows x columns of the generated granules, e.g. 2000x1500")
+    parser.add_argument("--fixtures-dir", default=defaults.fixtures_dir,
+                        help="Directory with recorded granules/<collection>.json and variables/<collection>.json")
+    args = parser.parse_args()
+
+    config = MockConfig(collections=args.collections, latency=args.latency, failure_rate=args.failure_rate,
+                        job_seconds=args.job_seconds, job_failure_rate=args.job_failure_rate, seed=args.seed,
+                        fixtures_dir=args.fixtures_dir, granule_shape=args.granule_shape)
+    server = MockServer(args.port, config)
+    print(f"Mock CMR/Harmony/EDL listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
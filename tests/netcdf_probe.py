@@ -0,0 +1,267 @@
+import logging
+import posixpath
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import netCDF4
+import xarray as xr
+
+LATITUDE_UNITS = ('degrees_north', 'degree_north', 'degrees_N', 'degree_N')
+LONGITUDE_UNITS = ('degrees_east', 'degree_east', 'degrees_E', 'degree_E')
+
+
+@dataclass
+class HeaderVariable:
+    path: str
+    dims: Tuple[str, ...]
+    shape: Tuple[int, ...]
+    dtype: str
+    attrs: Dict[str, object]
+
+    @property
+    def group(self) -> str:
+        return posixpath.dirname(self.path)
+
+    @property
+    def name(self) -> str:
+        return posixpath.basename(self.path)
+
+    @property
+    def size(self) -> int:
+        size = 1
+        for n in self.shape:
+            size *= n
+        return size
+
+
+@dataclass
+class FileHeader:
+    """Groups, dimensions, variables and attributes of a netCDF/HDF5 file, without any data."""
+    path: str
+    groups: List[str] = field(default_factory=list)
+    dimensions: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    variables: Dict[str, HeaderVariable] = field(default_factory=dict)
+
+    def find(self, name: str) -> Optional[HeaderVariable]:
+        """Look up a variable by path ("/group/lat" or "group/lat") or, failing that, by a unique basename."""
+        if not name:
+            return None
+        path = name if name.startswith('/') else f'/{name}'
+        if path in self.variables:
+            return self.variables[path]
+        matches = [v for v in self.variables.values() if v.name == name]
+        return matches[0] if len(matches) == 1 else None
+
+    def find_by_units(self, units: Iterable[str]) -> List[HeaderVariable]:
+        return [v for v in self.variables.values() if v.attrs.get('units') in units]
+
+
+def probe_header(path) -> Optional[FileHeader]:
+    """Read only the header of path. Returns None if netCDF4 cannot open the file."""
+    try:
+        dataset = netCDF4.Dataset(path, 'r')
+    except (OSError, RuntimeError) as e:
+        logging.warning("Unable to read header of %s: %s", path, e)
+        return None
+
+    header = FileHeader(path=str(path))
+    try:
+        pending = [dataset]
+        while pending:
+            group = pending.pop(0)
+            group_path = group.path
+            header.groups.append(group_path)
+            header.dimensions[group_path] = {name: len(dim) for name, dim in group.dimensions.items()}
+            for name, var in group.variables.items():
+                var_path = posixpath.join(group_path, name)
+                header.variables[var_path] = HeaderVariable(
+                    path=var_path,
+                    dims=tuple(var.dimensions),
+                    shape=tuple(var.shape),
+                    dtype=str(var.dtype),
+                    attrs={attr: var.getncattr(attr) for attr in var.ncattrs()},
+                )
+            pending.extend(group.groups.values())
+    finally:
+        dataset.close()
+    return header
+
+
+def bounds_variables(header: FileHeader) -> set:
+    """Paths of the variables named by another variable's CF "bounds" attribute, e.g. lat_bnds."""
+    bounds = set()
+    for var in header.variables.values():
+        name = var.attrs.get('bounds')
+        if name:
+            bounds.add(posixpath.join(var.group, str(name)))
+    return bounds
+
+
+def _paired_dims(lat: HeaderVariable, lon: HeaderVariable) -> bool:
+    # Swath coordinates share their dimensions; grid coordinates are each 1-D over their own
+    return lat.dims == lon.dims or (len(lat.dims) == 1 and len(lon.dims) == 1)
+
+
+def _pair(lat_candidates: List[HeaderVariable],
+          lon_candidates: List[HeaderVariable]) -> Optional[Tuple[HeaderVariable, HeaderVariable]]:
+    """The first lat/lon candidates with paired dimensions, preferring a pair in the same group."""
+    pairs = [(lat, lon) for lat in lat_candidates for lon in lon_candidates if _paired_dims(lat, lon)]
+    same_group = [(lat, lon) for lat, lon in pairs if lat.group == lon.group]
+    return (same_group or pairs or [None])[0]
+
+
+def resolve_lat_lon(header: FileHeader, umm_names: Tuple[str, str],
+                    lat_names: Iterable[str], lon_names: Iterable[str]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Resolve lat/lon variable paths from the header: the UMM-Var names when they exist in the
+    file, then CF units or standard_name, then the conventional variable names. Cell bounds
+    variables, which carry the same units, are never candidates, and the lat and lon found
+    must have paired dimensions.
+    Returns (lat, lon, method), or (None, None, None).
+    """
+    lat, lon = (header.find(name) for name in umm_names)
+    if lat and lon:
+        return lat.path, lon.path, "umm_var"
+
+    bounds = bounds_variables(header)
+    variables = [v for v in header.variables.values() if v.path not in bounds]
+    lat_candidates = [v for v in header.find_by_units(LATITUDE_UNITS) if v.path not in bounds] or \
+        [v for v in variables if v.attrs.get('standard_name') == 'latitude']
+    lon_candidates = [v for v in header.find_by_units(LONGITUDE_UNITS) if v.path not in bounds] or \
+        [v for v in variables if v.attrs.get('standard_name') == 'longitude']
+    if len(lat_candidates) > 1:
+        lat_candidates = [v for v in lat_candidates if v.name.lower() in lat_names] or lat_candidates
+    if len(lon_candidates) > 1:
+        lon_candidates = [v for v in lon_candidates if v.name.lower() in lon_names] or lon_candidates
+    pair = _pair(lat_candidates, lon_candidates)
+    if pair:
+        return pair[0].path, pair[1].path, "header_attributes"
+
+    pair = _pair([v for v in variables if v.name.lower() in lat_names],
+                 [v for v in variables if v.name.lower() in lon_names])
+    if pair:
+        return pair[0].path, pair[1].path, "header_names"
+    return None, None, None
+
+
+def resolve_time(header: FileHeader, umm_name: str) -> Optional[str]:
+    """Resolve the time variable path from the UMM-Var name, CF attributes or the variable name."""
+    var = header.find(umm_name)
+    if var is not None:
+        return var.path
+    for var in header.variables.values():
+        if var.attrs.get('standard_name') == 'time' or var.attrs.get('axis') == 'T':
+            return var.path
+    for var in header.variables.values():
+        if var.name.lower() == 'time':
+            return var.path
+    return None
+
+
+def required_variables(header: FileHeader, paths: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Expand variable paths with the coordinate variables they depend on (dimension coordinates
+    and the "coordinates" attribute). Returns the variable names to keep for each group.
+    """
+    keep = {}
+    pending = [p for p in paths if p in header.variables]
+    seen = set()
+    while pending:
+        var = header.variables[pending.pop()]
+        if var.path in seen:
+            continue
+        seen.add(var.path)
+        keep.setdefault(var.group, []).append(var.name)
+
+        references = list(var.dims) + str(var.attrs.get('coordinates', '')).split()
+        for ref in references:
+            # Resolve references the way netCDF does: relative to the group, then its ancestors
+            group = var.group
+            while True:
+                candidate = posixpath.join(group, ref)
+                if candidate in header.variables:
+                    pending.append(candidate)
+                    break
+                if group == '/':
+                    break
+                group = posixpath.dirname(group)
+    return keep
+
+
+def open_variables(path, header: FileHeader, paths: Iterable[str],
+                   chunks: Union[None, str, int] = None) -> xr.DataTree:
+    """
+    Open only the groups holding paths, and only the variables they need. Other groups are
+    never opened, which is what makes this fast for files with hundreds of groups.
+    """
+    keep = required_variables(header, paths)
+    datasets = {}
+    for group, names in keep.items():
+        drop = [v.name for v in header.variables.values() if v.group == group and v.name not in names]
+        kwargs = {"chunks": chunks} if chunks is not None else {}
+        datasets[group] = xr.open_dataset(path, group=group, decode_times=False, drop_variables=drop, **kwargs)
+    return xr.DataTree.from_dict(datasets)
+
+
+def describe_tree(tree: xr.DataTree) -> Dict[str, HeaderVariable]:
+    """Describe the variables of an opened tree the same way probe_header describes a file."""
+    variables = {}
+    for node in tree.subtree:
+        for name, var in node.variables.items():
+            path = posixpath.join(node.path, str(name))
+            variables[path] = HeaderVariable(path=path, dims=tuple(var.dims), shape=tuple(var.shape),
+                                             dtype=str(var.dtype), attrs={**var.encoding, **var.attrs})
+    return variables
+
+
+def _squeezed(var: HeaderVariable) -> Dict[str, int]:
+    return {dim: size for dim, size in zip(var.dims, var.shape) if size != 1}
+
+
+def _maskable(var: HeaderVariable) -> bool:
+    # Integer variables are decoded to float when they carry a fill value or scale factor
+    return var.dtype.startswith('float') or \
+        (var.dtype.startswith(('int', 'uint')) and ('_FillValue' in var.attrs or 'scale_factor' in var.attrs))
+
+
+def dimension_compatibility(var: HeaderVariable, lat: HeaderVariable, lon: HeaderVariable) -> int:
+    """
+    How well var can mask lat/lon: 3 if it spans exactly the lat/lon dimensions, 2 if it spans
+    a subset of them, 1 if only its shape matches, 0 if it cannot be broadcast against them.
+    """
+    dims = _squeezed(var)
+    coordinate_dims = {**_squeezed(lat), **_squeezed(lon)}
+    if not dims:
+        return 0
+    if all(coordinate_dims.get(dim) == size for dim, size in dims.items()):
+        return 3 if len(dims) == len(coordinate_dims) else 2
+    if sorted(dims.values()) == sorted(coordinate_dims.values()) and len(_squeezed(lat)) == len(dims):
+        return 1
+    return 0
+
+
+def rank_science_variables(variables: Dict[str, HeaderVariable], lat_path: str, lon_path: str,
+                           umm_science_names: Iterable[str] = ()) -> List[str]:
+    """
+    Rank the variables that can mask lat/lon, best first: by dimension compatibility, then
+    UMM-Var science variables before others, then float dtypes, then smallest size.
+    Incompatible, non-numeric, coordinate and time variables are left out.
+    """
+    lat, lon = variables.get(lat_path), variables.get(lon_path)
+    if lat is None or lon is None:
+        return []
+    umm_names = {name.strip('/') for name in umm_science_names if name}
+
+    ranked = []
+    for var in variables.values():
+        if var.path in (lat_path, lon_path) or 'time' in var.name.lower():
+            continue
+        if var.dims == (var.name,) or not _maskable(var):
+            continue
+        compatibility = dimension_compatibility(var, lat, lon)
+        if not compatibility:
+            continue
+        is_umm = var.path.strip('/') in umm_names or var.name in umm_names
+        ranked.append(((-compatibility, not is_umm, not var.dtype.startswith('float'), var.size), var.path))
+    ranked.sort()
+    return [path for _, path in ranked]
@@ -2,26 +2,22 @@ import json
 from github import Github
 import os
 
+import collection_lookup
+
 if __name__ == "__main__":
 
-    uat_file_path = "uat_new_collections.json"
-    ops_file_path = "ops_new_collections.json"
     new_collection_titles = []
 
-    with open(uat_file_path, "r") as json_file:
-        data = json.load(json_file)
-        for collection in data:
-            concept_id = collection.get('concept_id')
-            short_name = collection.get('short_name')
-            title = f"UAT {concept_id} ({short_name})"
-            new_collection_titles.append(title)
-
-    with open(ops_file_path, "r") as json_file:
-        data = json.load(json_file)
+    for env in ("uat", "ops"):
+        with open(f"{env}_new_collections.json", "r") as json_file:
+            data = json.load(json_file)
+        # Short names missing from the file are taken from the shared cache
+        cached_names = collection_lookup.lookup_short_names(
+            env, [collection.get('concept_id') for collection in data if not collection.get('short_name')])
         for collection in data:
             concept_id = collection.get('concept_id')
-            short_name = collection.get('short_name')
-            title = f"OPS {concept_id} ({short_name})"
+            short_name = collection.get('short_name') or cached_names.get(concept_id)
+            title = f"{env.upper()} {concept_id} ({short_name})"
             new_collection_titles.append(title)
 
     # Replace these variables with your own values
@@ -0,0 +1,234 @@
+"""
+Append-only history of regression results in SQLite.
+
+Every test outcome of every run is a row, indexed by env, collection, test and run, so flakiness,
+runtime trends and "first failed on" questions do not need the old job_status.json artifacts or
+the GitHub issues. pytest appends its run with --results-db, and aggregate_results.py appends the
+job_status.json artifacts of a regression run.
+
+    python results_store.py --db results.sqlite failing --env ops
+    python results_store.py --db results.sqlite flaky --env ops --days 30
+    python results_store.py --db results.sqlite trend --env ops --concept-id C1234-POCLOUD
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import uuid
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+from scheduler import results_from_file
+
+RESULTS_DB_ENV_VAR = "L2SS_RESULTS_DB"
+FAILED_OUTCOMES = ("failed", "error")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT NOT NULL,
+    env TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    source TEXT,
+    PRIMARY KEY (run_id, env)
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    env TEXT NOT NULL,
+    concept_id TEXT NOT NULL,
+    test TEXT NOT NULL,
+    test_type TEXT,
+    outcome TEXT NOT NULL,
+    duration REAL,
+    message TEXT,
+    job_url TEXT,
+    recorded_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, env, concept_id, test)
+);
+CREATE INDEX IF NOT EXISTS results_by_collection ON results (env, concept_id, test, recorded_at);
+CREATE INDEX IF NOT EXISTS results_by_outcome ON results (env, outcome, recorded_at);
+"""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def default_run_id() -> str:
+    """The GitHub Actions run and attempt when there is one, else a new id."""
+    if os.environ.get("GITHUB_RUN_ID"):
+        return f"{os.environ['GITHUB_RUN_ID']}.{os.environ.get('GITHUB_RUN_ATTEMPT', '1')}"
+    return uuid.uuid4().hex
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _test_name(nodeid: str) -> str:
+    """verify_collection.py::test_spatial_subset[C1234-POCLOUD] -> test_spatial_subset"""
+    return re.sub(r"\[.*\]$", "", nodeid.split("::")[-1])
+
+
+def rows_from_results(results: dict) -> List[dict]:
+    """
+    One row per test in a results JSON written by conftest.py. Results files from before "tests" was
+    added only list the failures and the timed tests.
+    """
+    messages = {(fail.get("concept_id"), fail.get("test_type")): fail.get("message")
+                for fail in results.get("failed", [])}
+    rows = {}
+    for entry in results.get("tests") or results.get("timings", []):
+        if not entry.get("concept_id") or not entry.get("outcome"):
+            continue
+        row = {
+            "concept_id": entry["concept_id"],
+            "test": _test_name(entry["test"]),
+            "test_type": entry.get("test_type"),
+            "outcome": entry["outcome"],
+            "duration": entry.get("duration"),
+            "message": None,
+        }
+        if row["outcome"] in FAILED_OUTCOMES:
+            row["message"] = messages.get((row["concept_id"], row["test_type"]))
+        rows[(row["concept_id"], row["test"])] = row
+    for (concept_id, test_type), message in messages.items():
+        if concept_id and not any(key[0] == concept_id and row["test_type"] == test_type
+                                  for key, row in rows.items()):
+            test = f"test_{test_type}_subset" if test_type else "unknown"
+            rows[(concept_id, test)] = {"concept_id": concept_id, "test": test, "test_type": test_type,
+                                        "outcome": "failed", "duration": None, "message": message}
+    return list(rows.values())
+
+
+def append_run(conn: sqlite3.Connection, run_id: str, env: str, rows: Iterable[dict], source: Optional[str] = None,
+               job_url: Optional[str] = None, recorded_at: Optional[str] = None) -> int:
+    """Append the rows of one run. Rows already stored for the run are kept, so ingesting twice is harmless."""
+    env = env.lower()
+    recorded_at = recorded_at or _now()
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO runs (run_id, env, recorded_at, source) VALUES (?, ?, ?, ?)",
+                     (run_id, env, recorded_at, source))
+        cursor = conn.executemany(
+            "INSERT OR IGNORE INTO results (run_id, env, concept_id, test, test_type, outcome, duration, message, "
+            "job_url, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(run_id, env, row["concept_id"], row["test"], row.get("test_type"), row["outcome"], row.get("duration"),
+              row.get("message"), job_url, recorded_at) for row in rows])
+    return cursor.rowcount
+
+
+def ingest_job_status(conn: sqlite3.Connection, run_id: str, env: str, path: str) -> int:
+    """Append the results carried by one job_status.json artifact of process_chunk.yml."""
+    with open(path) as f:
+        status = json.load(f)
+    results = results_from_file(path)
+    if results is not None:
+        rows = rows_from_results(results)
+    elif status.get("file"):
+        # The job did not get as far as writing results
+        rows = [{"concept_id": status["file"], "test": "job",
+                 "outcome": "passed" if status.get("status") == "success" else "error", "message": None}]
+    else:
+        rows = []
+    return append_run(conn, run_id, env, rows, source="job_status", job_url=status.get("url"))
+
+
+def currently_failing(conn: sqlite3.Connection, env: str) -> List[sqlite3.Row]:
+    """Tests whose latest outcome is a failure, with the first failure since they last passed."""
+    return conn.execute("""
+        WITH last_pass AS (
+            SELECT concept_id, test, MAX(recorded_at) AS passed_at FROM results
+            WHERE env = :env AND outcome = 'passed' GROUP BY concept_id, test
+        )
+        SELECT r.concept_id, r.test, MIN(r.recorded_at) AS first_failed, MAX(r.recorded_at) AS last_failed,
+               COUNT(*) AS failures, p.passed_at AS last_passed
+        FROM results r LEFT JOIN last_pass p ON p.concept_id = r.concept_id AND p.test = r.test
+        WHERE r.env = :env AND r.outcome IN ('failed', 'error')
+          AND (p.passed_at IS NULL OR r.recorded_at > p.passed_at)
+        GROUP BY r.concept_id, r.test
+        ORDER BY first_failed
+    """, {"env": env.lower()}).fetchall()
+
+
+def flaky(conn: sqlite3.Connection, env: str, since: str, min_flips: int = 2) -> List[sqlite3.Row]:
+    """Tests that switched between passing and failing at least min_flips times since the given time."""
+    return conn.execute("""
+        SELECT concept_id, test, COUNT(*) AS runs,
+               SUM(outcome IN ('failed', 'error')) AS failures,
+               SUM(previous IS NOT NULL AND (previous = 'passed') != (outcome = 'passed')) AS flips
+        FROM (
+            SELECT concept_id, test, outcome,
+                   LAG(outcome) OVER (PARTITION BY concept_id, test ORDER BY recorded_at) AS previous
+            FROM results
+            WHERE env = :env AND recorded_at >= :since AND outcome IN ('passed', 'failed', 'error')
+        )
+        GROUP BY concept_id, test
+        HAVING flips >= :min_flips
+        ORDER BY flips DESC, failures DESC
+    """, {"env": env.lower(), "since": since, "min_flips": min_flips}).fetchall()
+
+
+def trend(conn: sqlite3.Connection, env: str, concept_id: str, test: Optional[str] = None) -> List[sqlite3.Row]:
+    """Outcome and duration of a collection's tests in every run, oldest first."""
+    query = "SELECT recorded_at, run_id, test, outcome, duration FROM results WHERE env = ? AND concept_id = ?"
+    params = [env.lower(), concept_id]
+    if test:
+        query += " AND test = ?"
+        params.append(test)
+    return conn.execute(query + " ORDER BY recorded_at, test", params).fetchall()
+
+
+def _print_rows(rows: List[sqlite3.Row]) -> None:
+    for row in rows:
+        print(json.dumps(dict(row)))
+    print(f"{len(rows)} rows", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the regression results history")
+    parser.add_argument("--db", default=os.environ.get(RESULTS_DB_ENV_VAR), required=not os.environ.get(
+        RESULTS_DB_ENV_VAR), help="SQLite results history")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    failing = commands.add_parser("failing", help="Tests failing now, and when they first failed")
+    failing.add_argument("--env", required=True)
+
+    flaky_parser = commands.add_parser("flaky", help="Tests that keep switching between passing and failing")
+    flaky_parser.add_argument("--env", required=True)
+    flaky_parser.add_argument("--days", type=float, default=30, help="Only look at the last days of runs")
+    flaky_parser.add_argument("--min-flips", type=int, default=2)
+
+    trend_parser = commands.add_parser("trend", help="Outcomes and durations of one collection across runs")
+    trend_parser.add_argument("--env", required=True)
+    trend_parser.add_argument("--concept-id", required=True)
+    trend_parser.add_argument("--test", help="e.g. test_spatial_subset")
+
+    ingest = commands.add_parser("ingest", help="Append job_status.json artifacts of a regression run")
+    ingest.add_argument("--env", required=True)
+    ingest.add_argument("--run-id", default=default_run_id())
+    ingest.add_argument("files", nargs="+")
+
+    args = parser.parse_args()
+    with closing(connect(args.db)) as conn:
+        if args.command == "failing":
+            _print_rows(currently_failing(conn, args.env))
+        elif args.command == "flaky":
+            since = (datetime.now(timezone.utc) - timedelta(days=args.days)).isoformat(timespec="seconds")
+            _print_rows(flaky(conn, args.env, since, args.min_flips))
+        elif args.command == "trend":
+            _print_rows(trend(conn, args.env, args.concept_id, args.test))
+        else:
+            added = sum(ingest_job_status(conn, args.run_id, args.env, path) for path in args.files)
+            print(f"Appended {added} results of run {args.run_id} to {args.db}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""
+Order and chunk regression collections by their historical runtime.
+
+Runtimes are kept in a JSON history file per environment, updated from the results of each run
+(`{env}_regression_results.json` files or the `job_status.json` artifacts of new_regression.yml).
+Collections are ordered longest first, and chunks are filled with the longest-processing-time-first
+heuristic so one slow collection does not hold up a whole chunk.
+
+    python scheduler.py chunks --env ops --history runtime_history/ops.json
+    python scheduler.py update --history runtime_history/ops.json job-status/*/job_status.json
+"""
+import argparse
+import heapq
+import json
+import os
+import pathlib
+import statistics
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from metadata_cache import read_json, write_json_atomic
+
+RUNTIME_HISTORY_ENV_VAR = "L2SS_RUNTIME_HISTORY"
+# Seconds assumed for a collection with no history when nothing else is known
+DEFAULT_RUNTIME = 300.0
+# Weight of the latest run in the smoothed runtime
+HISTORY_ALPHA = 0.5
+MAX_CHUNK_SIZE = 250
+NUM_CHUNKS = 10
+
+
+def load_history(path) -> Dict[str, dict]:
+    """Read a runtime history file. A missing or unreadable file is an empty history."""
+    if not path:
+        return {}
+    return read_json(pathlib.Path(path)) or {}
+
+
+def runtimes_from_history(history: Dict[str, dict]) -> Dict[str, float]:
+    return {concept_id: entry["seconds"] for concept_id, entry in history.items() if entry.get("seconds")}
+
+
+def results_from_file(path) -> Optional[dict]:
+    data = read_json(pathlib.Path(path))
+    if isinstance(data, dict) and isinstance(data.get("reason"), str):
+        # job_status.json artifacts carry the results JSON as a string
+        try:
+            data = json.loads(data["reason"]) if data["reason"] else None
+        except json.JSONDecodeError:
+            return None
+    return data if isinstance(data, dict) else None
+
+
+def observed_runtimes(paths: Iterable) -> Dict[str, float]:
+    """Total test seconds per collection in the "timings" of the given results files."""
+    runtimes = {}
+    for path in paths:
+        results = results_from_file(path)
+        if results is None:
+            continue
+        for entry in results.get("timings", []):
+            concept_id = entry.get("concept_id")
+            if concept_id and entry.get("duration") is not None:
+                runtimes[concept_id] = runtimes.get(concept_id, 0.0) + entry["duration"]
+    return runtimes
+
+
+def update_history(history: Dict[str, dict], observed: Dict[str, float], alpha: float = HISTORY_ALPHA) -> Dict[str, dict]:
+    """Blend the observed runtimes into history with an exponentially weighted moving average."""
+    now = datetime.now(timezone.utc).isoformat()
+    for concept_id, seconds in observed.items():
+        entry = history.get(concept_id)
+        if entry and entry.get("seconds"):
+            seconds = alpha * seconds + (1 - alpha) * entry["seconds"]
+        history[concept_id] = {
+            "seconds": seconds,
+            "runs": (entry or {}).get("runs", 0) + 1,
+            "updated": now,
+        }
+    return history
+
+
+def estimate(concept_id: str, runtimes: Dict[str, float], default: float) -> float:
+    return runtimes.get(concept_id, default)
+
+
+def default_runtime(runtimes: Dict[str, float]) -> float:
+    """Collections with no history are assumed to take the median known runtime."""
+    return statistics.median(runtimes.values()) if runtimes else DEFAULT_RUNTIME
+
+
+def order_longest_first(concept_ids: Iterable[str], runtimes: Dict[str, float]) -> List[str]:
+    """Order concept_ids by estimated runtime, longest first. Ties keep a stable, sorted order."""
+    default = default_runtime(runtimes)
+    return sorted(concept_ids, key=lambda concept_id: (-estimate(concept_id, runtimes, default), concept_id))
+
+
+def chunk_count(total: int, max_chunk_size: int = MAX_CHUNK_SIZE, num_chunks: int = NUM_CHUNKS) -> int:
+    """Number of chunks: num_chunks, or more when that would exceed max_chunk_size collections per chunk."""
+    if total == 0:
+        return 0
+    if -(-total // num_chunks) > max_chunk_size:
+        return -(-total // max_chunk_size)
+    return min(num_chunks, total)
+
+
+def assign_chunks(concept_ids: Iterable[str], runtimes: Dict[str, float], num_chunks: int,
+                  max_chunk_size: Optional[int] = None) -> List[List[str]]:
+    """
+    Longest-processing-time-first bin packing: each collection, longest first, goes to the chunk
+    with the least estimated runtime so far (and room left under max_chunk_size). Every chunk is
+    itself ordered longest first.
+    """
+    ordered = order_longest_first(concept_ids, runtimes)
+    num_chunks = min(num_chunks, len(ordered))
+    if num_chunks <= 0:
+        return []
+    default = default_runtime(runtimes)
+    chunks = [[] for _ in range(num_chunks)]
+    heap = [(0.0, i) for i in range(num_chunks)]
+    for concept_id in ordered:
+        load, i = heapq.heappop(heap)
+        while max_chunk_size and len(chunks[i]) >= max_chunk_size:
+            # Full chunks are not pushed back
+            load, i = heapq.heappop(heap)
+        chunks[i].append(concept_id)
+        heapq.heappush(heap, (load + estimate(concept_id, runtimes, default), i))
+    return [chunk for chunk in chunks if chunk]
+
+
+def chunk_loads(chunks: List[List[str]], runtimes: Dict[str, float]) -> List[float]:
+    default = default_runtime(runtimes)
+    return [sum(estimate(concept_id, runtimes, default) for concept_id in chunk) for chunk in chunks]
+
+
+def matrix_chunks(env: str, chunks: List[List[str]]) -> list:
+    """The chunk matrix new_regression.yml passes to process_chunk.yml."""
+    return [{"id": i + 1, "include": [{"env": env, "file": concept_id} for concept_id in chunk]}
+            for i, chunk in enumerate(chunks)]
+
+
+def _chunks_command(args) -> None:
+    if args.concept_ids:
+        concept_ids = [c for c in (c.strip() for c in args.concept_ids.replace(",", "\n").splitlines()) if c]
+    else:
+        concept_ids = sorted(os.listdir(pathlib.Path(args.associations_dir).joinpath(args.env)))
+    runtimes = runtimes_from_history(load_history(args.history))
+    chunks = assign_chunks(concept_ids, runtimes, chunk_count(len(concept_ids), args.max_chunk_size,
+                                                              args.num_chunks), args.max_chunk_size)
+    loads = chunk_loads(chunks, runtimes)
+    known = sum(1 for concept_id in concept_ids if concept_id in runtimes)
+    print(f"Scheduled {len(concept_ids)} collections ({known} with history) into {len(chunks)} chunks; "
+          f"estimated chunk seconds min {min(loads, default=0):.0f}, max {max(loads, default=0):.0f}",
+          file=sys.stderr)
+    print(json.dumps(matrix_chunks(args.env, chunks), separators=(",", ":")))
+
+
+def _update_command(args) -> None:
+    observed = observed_runtimes(args.results)
+    history = update_history(load_history(args.history), observed, args.alpha)
+    write_json_atomic(pathlib.Path(args.history), history)
+    print(f"Updated runtimes of {len(observed)} collections in {args.history} ({len(history)} total)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schedule regression collections by historical runtime")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    chunks = commands.add_parser("chunks", help="Print the balanced chunk matrix as JSON")
+    chunks.add_argument("--env", required=True, help="Environment, e.g. ops or uat")
+    chunks.add_argument("--history", default=os.environ.get(RUNTIME_HISTORY_ENV_VAR), help="Runtime history file")
+    chunks.add_argument("--associations-dir", default=os.path.join(os.path.dirname(__file__), "cmr", "l2ss-py"),
+                        help="Directory with one file per associated collection under <env>/")
+    chunks.add_argument("--concept-ids", help="Comma or newline separated collections to schedule instead")
+    chunks.add_argument("--num-chunks", type=int, default=NUM_CHUNKS)
+    chunks.add_argument("--max-chunk-size", type=int, default=MAX_CHUNK_SIZE)
+    chunks.set_defaults(func=_chunks_command)
+
+    update = commands.add_parser("update", help="Blend the runtimes of finished runs into the history")
+    update.add_argument("--history", required=True, help="Runtime history file to update")
+    update.add_argument("--alpha", type=float, default=HISTORY_ALPHA, help="Weight of the latest run")
+    update.add_argument("results", nargs="+", help="Results JSON or job_status.json files")
+    update.set_defaults(func=_update_command)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
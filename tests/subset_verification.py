@@ -0,0 +1,217 @@
+"""
+Spatial subset verification that does not need the subsetted file in memory.
+
+open_subsetted_tree opens the file eagerly, or with dask chunks for --verify-chunks.
+verify_bounds then reduces lat/lon, masked by the science variable, to a BoundsResult: one
+_bounds_block pass for in-memory arrays, or one _bounds_block per chunk merged after a single
+dask.compute, so each chunk is read once.
+"""
+import logging
+from dataclasses import dataclass, fields
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+import xarray as xr
+
+try:
+    import dask
+    import dask.array as da
+except ImportError:  # pragma: no cover - dask is optional
+    dask = None
+    da = None
+
+# Tolerances match np.isclose, which the bounds checks used before
+BOUNDS_RTOL = 1e-5
+BOUNDS_ATOL = 1e-8
+# Elements processed per block by the numpy kernel; keeps temporaries in cache
+BOUNDS_BLOCK_SIZE = 1 << 20
+
+
+def parse_chunks(value: Optional[str]) -> Union[None, str, int]:
+    """
+    Parse the --verify-chunks option. None keeps the eager behaviour; "auto" lets dask size
+    the chunks from its array.chunk-size config; an integer is the chunk length per dimension.
+    """
+    if value is None or value == "":
+        return None
+    if value == "auto":
+        return value
+    return int(value)
+
+
+def open_subsetted_tree(path, chunks: Union[None, str, int] = None) -> xr.DataTree:
+    """
+    Open a subsetted file. When chunks is set every variable is backed by a dask array so
+    nothing is read until a reduction is computed.
+    """
+    if chunks is not None and dask is None:
+        logging.warning("dask is not installed; opening %s without chunks", path)
+        chunks = None
+    if chunks is None:
+        return xr.open_datatree(path, decode_times=False)
+    return xr.open_datatree(path, decode_times=False, chunks=chunks)
+
+
+def science_mask(science_var: xr.DataArray) -> xr.DataArray:
+    """
+    Mask of where science_var has data, i.e. is not NaN. Integer variables have no NaN, so their
+    mask is all true unless they were decoded to float from a fill value or scale factor. Raises
+    TypeError for non-numeric variables, e.g. strings.
+    """
+    return np.logical_not(np.isnan(science_var.squeeze()))
+
+
+@dataclass
+class BoundsResult:
+    lat_min: float = np.nan
+    lat_max: float = np.nan
+    lon_min: float = np.nan
+    lon_max: float = np.nan
+    lat_valid_count: int = 0
+    lon_valid_count: int = 0
+    valid_count: int = 0
+    lat_out_of_bounds: int = 0
+    lon_out_of_bounds: int = 0
+
+    @property
+    def lat_in_bounds(self) -> bool:
+        return self.lat_out_of_bounds == 0
+
+    @property
+    def lon_in_bounds(self) -> bool:
+        return self.lon_out_of_bounds == 0
+
+    @property
+    def in_bounds(self) -> bool:
+        return self.lat_in_bounds and self.lon_in_bounds
+
+    def merge(self, other: "BoundsResult") -> "BoundsResult":
+        """Combine the results of two disjoint blocks of the same arrays."""
+        merged = {}
+        for field in fields(self):
+            a, b = getattr(self, field.name), getattr(other, field.name)
+            if field.name.endswith("_min"):
+                merged[field.name] = float(np.fmin(a, b))
+            elif field.name.endswith("_max"):
+                merged[field.name] = float(np.fmax(a, b))
+            else:
+                merged[field.name] = a + b
+        return BoundsResult(**merged)
+
+
+def normalize_lon(lon):
+    return (lon + 180) % 360 - 180
+
+
+def _bounds_block(lat: np.ndarray, lon: np.ndarray, mask: Optional[np.ndarray],
+                  bbox: Tuple[float, float, float, float], lat_fill, lon_fill) -> BoundsResult:
+    west, south, east, north = bbox
+    # Longitudes are measured eastwards from west so a bbox crossing the antimeridian
+    # (west > east) is a single interval [0, width]
+    width = east - west if east >= west else east - west + 360
+    lat_tol = (BOUNDS_ATOL + BOUNDS_RTOL * abs(south), BOUNDS_ATOL + BOUNDS_RTOL * abs(north))
+    lon_tol = BOUNDS_ATOL + BOUNDS_RTOL * max(abs(west), abs(east))
+
+    result = BoundsResult()
+    lat, lon = np.ravel(lat), np.ravel(lon)
+    mask = None if mask is None else np.ravel(mask)
+    for start in range(0, lat.size, BOUNDS_BLOCK_SIZE):
+        block = slice(start, start + BOUNDS_BLOCK_SIZE)
+        la, lo = lat[block], lon[block]
+
+        lat_ok = np.isfinite(la)
+        lon_ok = np.isfinite(lo)
+        if lat_fill is not None:
+            lat_ok &= la != lat_fill
+        if lon_fill is not None:
+            lon_ok &= lo != lon_fill
+        if mask is not None:
+            lat_ok &= mask[block]
+            lon_ok &= mask[block]
+
+        la, lo = la[lat_ok], normalize_lon(lo[lon_ok])
+        part = BoundsResult(
+            lat_valid_count=int(la.size),
+            lon_valid_count=int(lo.size),
+            valid_count=int(np.count_nonzero(lat_ok & lon_ok)),
+        )
+        if la.size:
+            part.lat_min, part.lat_max = float(la.min()), float(la.max())
+            part.lat_out_of_bounds = int(np.count_nonzero((la < south - lat_tol[0]) | (la > north + lat_tol[1])))
+        if lo.size:
+            part.lon_min, part.lon_max = float(lo.min()), float(lo.max())
+            offset = (lo - west) % 360
+            part.lon_out_of_bounds = int(np.count_nonzero((offset > width + lon_tol) & (offset < 360 - lon_tol)))
+        result = result.merge(part)
+    return result
+
+
+def _align(lat: xr.DataArray, lon: xr.DataArray, mask):
+    """
+    Broadcast lat, lon and mask to a common shape, dropping a mask that does not fit. A mask
+    without dims (a numpy array) is taken to be laid out like the broadcast lat/lon.
+    """
+    lat, lon = xr.broadcast(lat, lon)
+    lon = lon.transpose(*lat.dims)
+    if mask is not None and not isinstance(mask, xr.DataArray):
+        try:
+            mask = xr.DataArray(np.broadcast_to(np.asarray(mask, dtype=bool), lat.shape), dims=lat.dims)
+        except ValueError:
+            logging.warning("Mask shape %s does not match lat/lon shape %s; checking unmasked bounds",
+                            np.shape(mask), lat.shape)
+            return lat, lon, None
+    if mask is not None:
+        if set(mask.dims) <= set(lat.dims):
+            mask = mask.broadcast_like(lat).transpose(*lat.dims)
+        elif mask.shape == lat.shape:
+            mask = lat.copy(data=mask.data)
+        else:
+            logging.warning("Science variable dims %s do not match lat/lon dims %s; checking unmasked bounds",
+                            mask.dims, lat.dims)
+            mask = None
+    return lat, lon, mask
+
+
+def verify_bounds(lat, lon, mask, bbox: Sequence[float], fill_values: Sequence = (None, None)) -> BoundsResult:
+    """
+    Check lat/lon against bbox (west, south, east, north) where mask is true.
+
+    Min/max, valid counts and out-of-bounds counts are gathered together for each block
+    of the inputs. Values that are non-finite or equal to the fill value are ignored and
+    longitudes are normalized to [-180, 180) so bboxes crossing the antimeridian work.
+    lat, lon and mask may be numpy arrays or DataArrays; dask-backed DataArrays are
+    reduced chunk by chunk in a single dask.compute.
+    """
+    lat_fill, lon_fill = fill_values
+    bbox = tuple(float(v) for v in bbox)
+
+    if isinstance(lat, xr.DataArray) and isinstance(lon, xr.DataArray):
+        lat, lon, mask = _align(lat, lon, mask)
+        lat, lon = lat.data, lon.data
+        mask = None if mask is None else mask.data
+
+    if da is not None and any(isinstance(a, da.Array) for a in (lat, lon, mask)):
+        lat = da.asarray(lat)
+        lon = da.asarray(lon).rechunk(lat.chunks)
+        mask_blocks = [None] * lat.npartitions
+        if mask is not None:
+            mask_blocks = da.asarray(mask).rechunk(lat.chunks).to_delayed().ravel()
+        block_bounds = dask.delayed(_bounds_block)
+        parts = dask.compute(*[block_bounds(la, lo, mk, bbox, lat_fill, lon_fill)
+                               for la, lo, mk in zip(lat.to_delayed().ravel(), lon.to_delayed().ravel(),
+                                                     mask_blocks)])
+        result = BoundsResult()
+        for part in parts:
+            result = result.merge(part)
+        return result
+
+    lat = np.asarray(lat)
+    lon = np.broadcast_to(np.asarray(lon), lat.shape)
+    if mask is not None:
+        try:
+            mask = np.broadcast_to(np.asarray(mask, dtype=bool), lat.shape)
+        except ValueError:
+            logging.warning("Mask shape %s does not match lat/lon shape %s; checking unmasked bounds",
+                            np.shape(mask), lat.shape)
+            mask = None
+    return _bounds_block(lat, lon, mask, bbox, lat_fill, lon_fill)
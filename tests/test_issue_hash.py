@@ -0,0 +1,44 @@
+"""
+The content hash of regression issues ignores what changes between runs of the same failure.
+
+    cd tests
+    pytest test_issue_hash.py --env uat
+
+conftest.py requires --env and CMR_USER/CMR_PASS, although these tests do not use CMR.
+"""
+import uuid
+
+import failure_summaries
+import github_sync
+
+TITLE = "Regression Failure: OPS | C1234567890-POCLOUD | SHORT_NAME"
+
+
+def failure_message(job_id: str, work_item: int, tmp_dir: str, seconds: float) -> str:
+    """A spatial test failure as it appears in job_status.json, with the run-specific parts given."""
+    url = (f"https://harmony.earthdata.nasa.gov/service-results/harmony-prod-staging/public/{job_id}/{work_item}/"
+           f"granule_subsetted.nc4?A-userid=l2ss&X-Amz-Signature={uuid.uuid4().hex}")
+    return (f"harmony_jobs.HarmonyJobError: Harmony job {job_id} failed: subsetter error\\n"
+            f"download_utils.DownloadError: Unable to download {url} after 4 attempts\\n"
+            f"destination {tmp_dir}/test_spatial_subset_C1234567890_0/granule_subsetted.nc4\\n"
+            f"Failed: Timeout (>{seconds}s) from pytest-timeout at 2026-10-17T02:44:21.015100+00:00")
+
+
+def issue_hash(message: str) -> str:
+    plan = github_sync.IssuePlan()
+    plan.upsert(TITLE, f"Job URL: run\n\n{message}", labels=["regression"],
+                content=["spatial", failure_summaries.normalize_traceback(message)])
+    return plan.upserts[TITLE]["hash"]
+
+
+def test_same_failure_in_two_runs_has_the_same_hash():
+    first = failure_message(str(uuid.uuid4()), 3918211, "/tmp/pytest-of-runner/pytest-12", 1200.0)
+    second = failure_message(str(uuid.uuid4()), 4021577, "/tmp/pytest-of-runner/pytest-31", 1201.5)
+    assert first != second
+    assert issue_hash(first) == issue_hash(second)
+
+
+def test_different_failure_has_a_different_hash():
+    job_id = str(uuid.uuid4())
+    message = failure_message(job_id, 3918211, "/tmp/pytest-of-runner/pytest-12", 1200.0)
+    assert issue_hash(message) != issue_hash(message.replace("subsetter error", "no matching granules"))
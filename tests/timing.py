@@ -0,0 +1,62 @@
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """High-water mark of this process's resident set size, or None where it cannot be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PhaseTimer:
+    """
+    Wall-clock seconds of the named phases of one verification. A phase entered more than
+    once accumulates its time. Extra measurements (bytes downloaded, Harmony queue time...)
+    can be attached to a phase with add().
+
+    While tracemalloc is tracing (e.g. PYTHONTRACEMALLOC=1, or benchmark.py --trace-memory), each
+    phase also records in peak_traced_bytes the most memory it allocated on top of what was
+    allocated when it started. The process peak RSS only ever rises, so it cannot be split by phase.
+    Allocations of other threads during the phase are counted too, and phases must not nest.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, dict] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[dict]:
+        record = self.phases.setdefault(name, {"seconds": 0.0})
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            start_traced, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] += time.perf_counter() - start
+            if tracing and tracemalloc.is_tracing():
+                _, peak = tracemalloc.get_traced_memory()
+                record["peak_traced_bytes"] = max(record.get("peak_traced_bytes", 0), peak - start_traced)
+
+    def add(self, name: str, **values) -> None:
+        values = {key: value for key, value in values.items() if value is not None}
+        if not values:
+            return
+        record = self.phases.setdefault(name, {"seconds": 0.0})
+        for key, value in values.items():
+            record[key] = record[key] + value if key == "seconds" else value
+
+    def as_dict(self) -> Dict[str, dict]:
+        return {name: dict(record) for name, record in self.phases.items()}
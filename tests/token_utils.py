@@ -6,6 +6,11 @@ import requests
 from requests.auth import HTTPBasicAuth
 
 
+def is_auth_error(exception):
+    msg = str(exception).lower()
+    return any(keyword in msg for keyword in ["401", "403", "unauthorized", "forbidden", "token", "expired"])
+
+
 def get_bearer_token_via_lambda(
     lambda_function_name,
     edl_user,
@@ -39,13 +44,21 @@ def get_bearer_token_via_lambda(
     return result_json["access_token"]
 
 
+def edl_url(env):
+    env = env.lower()
+    if env == "local":
+        from mock_services import edl_url as mock_edl_url
+        return mock_edl_url()
+    return f"https://{'uat.' if env == 'uat' else ''}urs.earthdata.nasa.gov"
+
+
 def fetch_bearer_token(env, request_session=None, cmr_user=None, cmr_pass=None):
     token = os.environ.get("CMR_BEARER_TOKEN")
     if token:
         return token
 
     env = env.lower()
-    url = f"https://{'uat.' if env == 'uat' else ''}urs.earthdata.nasa.gov/api/users/find_or_create_token"
+    url = f"{edl_url(env)}/api/users/find_or_create_token"
 
     user = cmr_user or os.environ.get("CMR_USER")
     pwd = cmr_pass or os.environ.get("CMR_PASS")
@@ -65,7 +78,7 @@ def fetch_bearer_token(env, request_session=None, cmr_user=None, cmr_pass=None):
 
 def fetch_bearer_token_by_provider(env, token_provider, request_session=None):
     env = env.lower()
-    if token_provider == "lambda":
+    if token_provider == "lambda" and env != "local":
         lambda_function_name = os.environ.get(
             "CMR_TOKEN_LAMBDA_FUNCTION_NAME", "uat-launchpad_token_dispenser"
         )
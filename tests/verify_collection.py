@@ -2,13 +2,13 @@ import json
 import logging
 import os
 import pathlib
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlparse
 from datetime import datetime, timedelta
 
 import cf_xarray as cfxr
 import harmony
-import numpy as np
 from podaac.subsetter.utils import coordinate_utils
 import pytest
 import requests
@@ -16,19 +16,31 @@ import xarray as xr
 import csv
 
 import cmr
+import download_utils
+import incremental
+import netcdf_probe
+import subset_verification
 import token_utils
+from token_utils import is_auth_error
+from harmony_jobs import HarmonyJob, HarmonyJobEngine
+from metadata_cache import CoordinateCache, JsonCache, UmmVarCache
+from timing import PhaseTimer
 
 import importlib.util
 import inspect
 
 VALID_LATITUDE_VARIABLE_NAMES = ['lat', 'latitude']
 VALID_LONGITUDE_VARIABLE_NAMES = ['lon', 'longitude']
+PROBE_SCIENCE_VARIABLE_LIMIT = 3
 
 assert cfxr, "cf_xarray adds extensions to xarray on import"
 DEFAULT_SPATIAL_BBOX_SCALE = 0.95
 DEFAULT_TEMPORAL_FRACTION = 0.5
 CUSTOM_TESTS_DIRNAME = "custom"
 CUSTOM_GROUPS_DIRNAME = "groups"
+SUBSETTER_SERVICE_NAME = "PODAAC L2 Cloud Subsetter"
+VARIABLE_BATCH_SIZE = 40
+VARIABLE_FETCH_WORKERS = int(os.environ.get("L2SS_VARIABLE_FETCH_WORKERS", 4))
 
 
 def fetch_bearer_token_by_provider(env: str, request_session: requests.Session, token_provider: str) -> str:
@@ -43,10 +55,6 @@ def fetch_bearer_token_by_provider(env: str, request_session: requests.Session,
     pytest.fail("Unable to get bearer token from EDL or environment variable")
 
 
-def is_auth_error(exception: Exception) -> bool:
-    msg = str(exception).lower()
-    return any(keyword in msg for keyword in ["401", "403", "unauthorized", "forbidden", "token", "expired"])
-
 @pytest.fixture(scope="session")
 def env(pytestconfig):
     return pytestconfig.getoption("env")
@@ -61,6 +69,9 @@ def token_provider(pytestconfig):
 def cmr_mode(env):
     if env == 'uat':
         return cmr.CMR_UAT
+    elif env == 'local':
+        import mock_services
+        return mock_services.cmr_url()
     else:
         return cmr.CMR_OPS
 
@@ -69,10 +80,20 @@ def cmr_mode(env):
 def harmony_env(env):
     if env == 'uat':
         return harmony.config.Environment.UAT
+    elif env == 'local':
+        return harmony.config.Environment.LOCAL
     else:
         return harmony.config.Environment.PROD
 
 
+def make_harmony_client(harmony_env, token: str) -> harmony.Client:
+    client = harmony.Client(env=harmony_env, token=token)
+    if harmony_env == harmony.config.Environment.LOCAL:
+        import mock_services
+        client.config.localhost_port = urlparse(mock_services.base_url()).port or mock_services.DEFAULT_PORT
+    return client
+
+
 @pytest.fixture(scope="session")
 def request_session():
     with requests.Session() as s:
@@ -81,7 +102,10 @@ def request_session():
 
 
 # Helper function to read a single CSV file and return a set of skip entries
-def read_skip_list(csv_file):
+def read_skip_list(csv_file, missing_ok=False):
+    # The mock collections of --env local have no skip lists
+    if missing_ok and not os.path.exists(csv_file):
+        return set()
     with open(csv_file, newline='') as f:
         reader = csv.reader(f)
         return {row[0].strip() for row in reader}
@@ -206,9 +230,7 @@ def resolve_spatial_bbox(pytestconfig, collection_overrides: dict) -> Tuple[floa
     return None
 
 
-@pytest.fixture(scope="function")
-def granule_concept_id(pytestconfig, overrides, collection_concept_id):
-    collection_overrides = resolve_overrides(overrides, collection_concept_id)
+def resolve_granule_concept_id(pytestconfig, collection_overrides: dict) -> Optional[str]:
     configured = pytestconfig.getoption("granule_concept_id")
     if configured:
         return configured
@@ -218,6 +240,12 @@ def granule_concept_id(pytestconfig, overrides, collection_concept_id):
     return None
 
 
+@pytest.fixture(scope="function")
+def granule_concept_id(pytestconfig, overrides, collection_concept_id):
+    collection_overrides = resolve_overrides(overrides, collection_concept_id)
+    return resolve_granule_concept_id(pytestconfig, collection_overrides)
+
+
 @pytest.fixture(scope="function")
 def spatial_bbox(pytestconfig, overrides, collection_concept_id):
     collection_overrides = resolve_overrides(overrides, collection_concept_id)
@@ -354,6 +382,22 @@ def find_custom_tests(collection_concept_id: str, env: str) -> dict:
     }
 
 
+def custom_test_files(collection_concept_id: str, env: str) -> List[pathlib.Path]:
+    """Every custom test file that can apply to a collection."""
+    paths = []
+    provider = parse_provider_from_concept_id(collection_concept_id)
+    if provider:
+        paths.append(_provider_custom_file(provider))
+    paths.extend(_collection_custom_file_candidates(collection_concept_id, env))
+    for collection_dir in _collection_custom_dir_candidates(collection_concept_id, env):
+        if collection_dir.is_dir():
+            paths.extend(collection_dir.rglob("*.py"))
+    for group_dir in _matching_group_dirs(collection_concept_id, env):
+        paths.extend(group_dir.rglob("*.py"))
+        paths.append(_group_concept_ids_file(group_dir))
+    return [path for path in paths if path.is_file()]
+
+
 def _load_custom_test_functions(path: pathlib.Path):
     if not path or not path.exists():
         return []
@@ -464,12 +508,34 @@ def should_run_generic(test_kind: str, overrides: dict) -> bool:
         return test_kind == "temporal"
     return True
 
+
+def generic_skip_reason(test_kind: str, collection_concept_id: str, env: str, collection_overrides: dict,
+                        skip_list: set) -> Optional[str]:
+    """
+    Return the reason the generic spatial or temporal test should be skipped for a
+    collection, or None if it should run.
+    """
+    if not should_run_generic(test_kind, collection_overrides):
+        return f"Generic {test_kind} disabled for {collection_concept_id}"
+
+    custom_tests = find_custom_tests(collection_concept_id, env)
+    if (custom_tests.get("collection") or custom_tests.get("group")) and not collection_overrides.get("also_run_generic", False):
+        return f"Custom collection/group tests present; skipping generic {test_kind} for {collection_concept_id}"
+    if custom_tests.get("provider") and collection_overrides.get("replace_generic", False):
+        return f"Custom provider tests present; skipping generic {test_kind} for {collection_concept_id}"
+
+    if collection_overrides.get(f"skip_{test_kind}"):
+        return f"{test_kind.capitalize()} override skip for {collection_concept_id}"
+    if collection_concept_id in skip_list and not collection_overrides.get(f"force_{test_kind}"):
+        return f"Known collection to skip for {test_kind} testing {collection_concept_id}"
+    return None
+
 # Fixture for the first skip list (skip_collections1.csv)
 @pytest.fixture(scope="session")
 def skip_temporal(env):
     current_dir = os.path.dirname(__file__)
     path = os.path.join(current_dir, f"skip/skip_temporal_{env}.csv")
-    return read_skip_list(path)
+    return read_skip_list(path, missing_ok=env == "local")
 
 
 # Fixture for the second skip list (skip_collections2.csv)
@@ -477,7 +543,7 @@ def skip_temporal(env):
 def skip_spatial(env):
     current_dir = os.path.dirname(__file__)
     path = os.path.join(current_dir, f"skip/skip_spatial_{env}.csv")
-    return read_skip_list(path)
+    return read_skip_list(path, missing_ok=env == "local")
 
 @pytest.fixture(scope="session")
 def overrides_file(pytestconfig):
@@ -533,7 +599,73 @@ def authed_request(request_session: requests.Session, bearer_token_manager):
 
 
 @pytest.fixture(scope="function")
-def granule_json(collection_concept_id: str, cmr_mode: str, authed_request, spatial_bbox, granule_concept_id) -> dict:
+def phase_timer(request):
+    """
+    Per-phase timings of the current test, added to its user_properties as "timings" once it
+    finishes. conftest.py reads them from the test reports; the record_property fixture is not
+    used, as it warns under the default xunit2 JUnit family.
+    """
+    timer = PhaseTimer()
+    yield timer
+    request.node.user_properties.append(("timings", json.dumps(timer.as_dict())))
+
+
+@pytest.fixture(scope="session")
+def verify_chunks(pytestconfig):
+    return subset_verification.parse_chunks(pytestconfig.getoption("verify_chunks"))
+
+
+@pytest.fixture(scope="session")
+def metadata_cache_dir(pytestconfig):
+    return pytestconfig.getoption("metadata_cache_dir")
+
+
+@pytest.fixture(scope="session")
+def granule_cache(pytestconfig, metadata_cache_dir):
+    return JsonCache("granules", metadata_cache_dir, ttl=pytestconfig.getoption("granule_cache_ttl"))
+
+
+def granule_search_url(cmr_mode: str, collection_concept_id: str, spatial_bbox, granule_concept_id) -> str:
+    if granule_concept_id:
+        return f"{cmr_mode}granules.umm_json?concept_id={granule_concept_id}&page_size=1"
+
+    cmr_url = f"{cmr_mode}granules.umm_json?collection_concept_id={collection_concept_id}&sort_key=-start_date&page_size=1"
+    if spatial_bbox:
+        west, south, east, north = spatial_bbox
+        cmr_url += f"&bounding_box={west},{south},{east},{north}"
+    return cmr_url
+
+
+def select_granule(env: str, cmr_mode: str, collection_concept_id: str, authed_request, spatial_bbox,
+                   granule_concept_id, cache: JsonCache) -> Tuple[Optional[dict], str]:
+    '''
+    Search CMR for the granule to test with, reusing a previous selection for the same
+    (env, collection, granule override, bbox) from cache when one is available.
+
+    Returns
+    -------
+    (umm_json for selected granule or None, CMR search url)
+    '''
+    cmr_url = granule_search_url(cmr_mode, collection_concept_id, spatial_bbox, granule_concept_id)
+    cache_key = [env, collection_concept_id, granule_concept_id, spatial_bbox]
+
+    cached = cache.get(cache_key)
+    if cached is not None:
+        logging.info("Using cached granule selection %s for %s", cached['meta']['concept-id'], collection_concept_id)
+        return cached, cmr_url
+
+    response_json = authed_request("GET", cmr_url).json()
+
+    if 'items' in response_json and len(response_json['items']) > 0:
+        granule = response_json['items'][0]
+        cache.set(cache_key, granule)
+        return granule, cmr_url
+    return None, cmr_url
+
+
+@pytest.fixture(scope="function")
+def granule_json(collection_concept_id: str, env: str, cmr_mode: str, authed_request, spatial_bbox, granule_concept_id,
+                 granule_cache, phase_timer) -> dict:
     '''
     This fixture defines the strategy used for picking a granule from a collection for testing
 
@@ -542,27 +674,26 @@ def granule_json(collection_concept_id: str, cmr_mode: str, authed_request, spat
     collection_concept_id
     cmr_mode
     authed_request
+    granule_cache
+    phase_timer
 
     Returns
     -------
     umm_json for selected granule
     '''
-    if granule_concept_id:
-        cmr_url = f"{cmr_mode}granules.umm_json?concept_id={granule_concept_id}&page_size=1"
-    else:
-        cmr_url = f"{cmr_mode}granules.umm_json?collection_concept_id={collection_concept_id}&sort_key=-start_date&page_size=1"
-        if spatial_bbox:
-            west, south, east, north = spatial_bbox
-            cmr_url += f"&bounding_box={west},{south},{east},{north}"
-
-    response_json = authed_request("GET", cmr_url).json()
+    with phase_timer.phase("cmr_search"):
+        granule, cmr_url = select_granule(env, cmr_mode, collection_concept_id, authed_request, spatial_bbox,
+                                          granule_concept_id, granule_cache)
 
-    if 'items' in response_json and len(response_json['items']) > 0:
-        return response_json['items'][0]
+    if granule is not None:
+        return granule
     elif cmr_mode == cmr.CMR_UAT:
         pytest.fail(f"No granules found for UAT collection {collection_concept_id}. CMR search used was {cmr_url}")
     elif cmr_mode == cmr.CMR_OPS:
         pytest.fail(f"No granules found for OPS collection {collection_concept_id}. CMR search used was {cmr_url}")
+    else:
+        pytest.fail(f"No granules found for {env.upper()} collection {collection_concept_id}. "
+                    f"CMR search used was {cmr_url}")
 
 
 @pytest.fixture(scope="function")
@@ -571,10 +702,10 @@ def original_granule_localpath(granule_json: dict, tmp_path, authed_request) ->
 
     def download_file(url):
         local_filename = tmp_path.joinpath(f"{granule_json['meta']['concept-id']}_original_granule.nc")
-        response = authed_request("GET", url, stream=True)
-        with open(local_filename, 'wb') as f:
-            shutil.copyfileobj(response.raw, f)
-        return local_filename
+        result = download_utils.download_file(authed_request, url, local_filename,
+                                              **download_utils.granule_file_info(granule_json, url))
+        download_utils.summarize_downloads(granule_json['meta']['concept-id'], [result])
+        return result.path
 
     granule_url = None
     for x in urls:
@@ -587,30 +718,222 @@ def original_granule_localpath(granule_json: dict, tmp_path, authed_request) ->
         pytest.fail(f"Unable to find download URL for {granule_json['meta']['concept-id']}")
 
 
+@pytest.fixture(scope="session")
+def umm_var_cache(pytestconfig, metadata_cache_dir):
+    return UmmVarCache(metadata_cache_dir, ttl=pytestconfig.getoption("variable_cache_ttl"))
+
+
+@pytest.fixture(scope="session")
+def coordinate_cache(metadata_cache_dir):
+    return CoordinateCache(metadata_cache_dir)
+
+
+@pytest.fixture(scope="session")
+def incremental_state(pytestconfig, metadata_cache_dir):
+    if not pytestconfig.getoption("incremental"):
+        return None
+    state_dir = pytestconfig.getoption("incremental_dir") or metadata_cache_dir or \
+        os.path.join(os.path.dirname(__file__), ".incremental")
+    return incremental.IncrementalState(state_dir, pytestconfig.getoption("incremental_max_age") * 60 * 60)
+
+
+def fetch_service_version(request_session: requests.Session, cmr_mode: str, token: str) -> Optional[str]:
+    """Version of the l2ss-py service from its UMM-S record."""
+    response = request_session.get(f"{cmr_mode}services.umm_json", params={"name": SUBSETTER_SERVICE_NAME},
+                                   headers={'Authorization': f'Bearer {token}'})
+    response.raise_for_status()
+    versions = sorted({item['umm'].get('Version') for item in response.json().get('items', [])
+                       if item.get('umm', {}).get('Version')})
+    return ",".join(versions) or None
+
+
+def collection_inputs(env: str, cmr_mode: str, collection_concept_id: str, granule_json: dict,
+                      collection_overrides: dict, service_version: Optional[str], token: str,
+                      request_session: requests.Session) -> dict:
+    """Everything a generic test result depends on, for the --incremental fingerprint."""
+    collection_res = cmr.queries.CollectionQuery(mode=cmr_mode).concept_id(collection_concept_id).token(token).get()[0]
+    variable_concept_ids = (collection_res.get("associations") or {}).get("variables") or []
+    revisions = list_variable_revisions(request_session, cmr_mode, variable_concept_ids, token) \
+        if variable_concept_ids else {}
+    return {
+        "collection_revision": get_collection_revision(collection_res),
+        "variable_revisions": dict(sorted(revisions.items())),
+        "granule": [granule_json['meta']['concept-id'], granule_json['meta'].get('revision-id')],
+        "service_version": service_version,
+        "overrides": collection_overrides,
+        "custom_tests": incremental.file_digest(custom_test_files(collection_concept_id, env)),
+    }
+
+
+@pytest.fixture(scope="session")
+def incremental_fingerprint(incremental_state, env, cmr_mode, bearer_token_manager, request_session):
+    """
+    Returns fingerprint(collection_concept_id, granule_json, collection_overrides) -> (fingerprint, inputs),
+    computed once per collection and granule.
+    """
+    computed = {}
+    service_version = {}
+
+    def fingerprint(collection_concept_id: str, granule_json: dict, collection_overrides: dict):
+        key = (collection_concept_id, granule_json['meta']['concept-id'])
+        if key in computed:
+            return computed[key]
+        for attempt in range(2):
+            token = bearer_token_manager(refresh=(attempt == 1))
+            try:
+                if "version" not in service_version:
+                    service_version["version"] = fetch_service_version(request_session, cmr_mode, token)
+                inputs = collection_inputs(env, cmr_mode, collection_concept_id, granule_json, collection_overrides,
+                                           service_version["version"], token, request_session)
+                break
+            except Exception as e:
+                if attempt == 0 and is_auth_error(e):
+                    logging.info("Auth error while fingerprinting collection. Refreshing token and retrying once.")
+                    continue
+                raise
+        computed[key] = (incremental.fingerprint(inputs), inputs)
+        return computed[key]
+
+    return fingerprint
+
+
+def unchanged_test_kinds(incremental_state, incremental_fingerprint, env: str, collection_concept_id: str,
+                         granule_json: dict, collection_overrides: dict) -> set:
+    """Generic tests of a collection that --incremental will skip."""
+    if incremental_state is None:
+        return set()
+    current, _ = incremental_fingerprint(collection_concept_id, granule_json, collection_overrides)
+    return {test_kind for test_kind in ("spatial", "temporal")
+            if incremental_state.unchanged(env, collection_concept_id, test_kind, current)}
+
+
+@pytest.fixture(scope="function")
+def incremental_check(request, incremental_state, incremental_fingerprint, env, collection_concept_id, granule_json,
+                      overrides):
+    """
+    With --incremental, skip a generic test whose collection inputs are unchanged since it last
+    passed, and record the outcome and fingerprint of the tests that do run.
+    """
+    if incremental_state is None:
+        yield
+        return
+    test_kind = "spatial" if "spatial" in request.node.name else "temporal"
+    collection_overrides = resolve_overrides(overrides, collection_concept_id)
+    current, inputs = incremental_fingerprint(collection_concept_id, granule_json, collection_overrides)
+    last = incremental_state.unchanged(env, collection_concept_id, test_kind, current)
+    if last is not None:
+        verified_at = datetime.fromtimestamp(last["verified_at"]).isoformat(timespec="seconds")
+        pytest.skip(f"Inputs of {collection_concept_id} unchanged since {test_kind} passed at {verified_at}")
+    yield
+    report = getattr(request.node, "rep_call", None)
+    if report is not None and not report.skipped:
+        incremental_state.record(env, collection_concept_id, test_kind, current, report.outcome, inputs)
+
+
+def get_collection_revision(collection_res: dict):
+    # The CMR json format has no revision-id for collections; 'updated' changes with every revision.
+    return collection_res.get("revision_id") or collection_res.get("updated")
+
+
+def search_variables(request_session: requests.Session, cmr_mode: str, concept_ids: List[str], token: str,
+                     response_format: str = 'json') -> List[dict]:
+    params = [('concept_id[]', concept_id) for concept_id in concept_ids]
+    params.append(('page_size', len(concept_ids)))
+    response = request_session.get(f"{cmr_mode}variables.{response_format}", params=params,
+                                   headers={'Authorization': f'Bearer {token}'})
+    response.raise_for_status()
+    return response.json().get('items', [])
+
+
+def search_variables_in_batches(request_session: requests.Session, cmr_mode: str, concept_ids: List[str], token: str,
+                                response_format: str = 'json') -> List[dict]:
+    '''
+    Search CMR for variables in VARIABLE_BATCH_SIZE slices issued concurrently over the
+    shared session. Batch results are reassembled in submission order; any failed batch
+    (e.g. an expired token) raises so the caller can refresh the token and retry once.
+    '''
+    batches = [concept_ids[i:i + VARIABLE_BATCH_SIZE] for i in range(0, len(concept_ids), VARIABLE_BATCH_SIZE)]
+    if len(batches) <= 1:
+        return search_variables(request_session, cmr_mode, concept_ids, token, response_format) if batches else []
+
+    with ThreadPoolExecutor(max_workers=min(VARIABLE_FETCH_WORKERS, len(batches))) as executor:
+        results = executor.map(
+            lambda batch: search_variables(request_session, cmr_mode, batch, token, response_format), batches)
+        return [item for batch_items in results for item in batch_items]
+
+
+def list_variable_revisions(request_session: requests.Session, cmr_mode: str, variable_concept_ids: List[str],
+                            token: str) -> Dict[str, int]:
+    items = search_variables_in_batches(request_session, cmr_mode, variable_concept_ids, token)
+    return {item.get('concept_id'): item.get('revision_id') for item in items}
+
+
+def fetch_variable_records(request_session: requests.Session, cmr_mode: str, variable_concept_ids: List[str],
+                           token: str) -> List[dict]:
+    return search_variables_in_batches(request_session, cmr_mode, variable_concept_ids, token, 'umm_json')
+
+
+def fetch_collection_variables(env: str, cmr_mode: str, collection_concept_id: str, token: str,
+                               cache: UmmVarCache, request_session: requests.Session) -> Optional[List[dict]]:
+    '''
+    Get the UMM-Var records associated to a collection. Records already in the cache at
+    their current revision are reused; only new or changed revisions are downloaded. The
+    collection itself is always looked up, so a cached index of an older collection revision
+    is not used.
+
+    Returns
+    -------
+    List of UMM-Var umm_json items, or None if the collection has no variable associations
+    '''
+    collection_res = cmr.queries.CollectionQuery(mode=cmr_mode).concept_id(collection_concept_id).token(token).get()[0]
+    collection_associations = collection_res.get("associations")
+    variable_concept_ids = collection_associations.get("variables")
+
+    if variable_concept_ids is None:
+        return None
+
+    cached = cache.load_collection(env, collection_concept_id, get_collection_revision(collection_res),
+                                   variable_concept_ids)
+    if cached is not None:
+        logging.info("Using %d cached UMM-Var records for %s", len(cached), collection_concept_id)
+        return cached
+
+    revisions = list_variable_revisions(request_session, cmr_mode, variable_concept_ids, token)
+
+    records = {}
+    stale_concept_ids = []
+    for concept_id in variable_concept_ids:
+        record = cache.get_record(env, concept_id, revisions.get(concept_id))
+        if record is None:
+            stale_concept_ids.append(concept_id)
+        else:
+            records[concept_id] = record
+
+    if stale_concept_ids:
+        logging.info("Fetching %d of %d UMM-Var records for %s",
+                     len(stale_concept_ids), len(variable_concept_ids), collection_concept_id)
+        for record in fetch_variable_records(request_session, cmr_mode, stale_concept_ids, token):
+            cache.put_record(env, record)
+            records[record['meta']['concept-id']] = record
+
+    variables = [records[concept_id] for concept_id in variable_concept_ids if concept_id in records]
+    cache.store_collection(env, collection_concept_id, get_collection_revision(collection_res), variables)
+    return variables
+
+
 @pytest.fixture(scope="function")
-def collection_variables(cmr_mode, collection_concept_id, env, bearer_token_manager):
+def collection_variables(cmr_mode, collection_concept_id, env, bearer_token_manager, umm_var_cache, request_session,
+                         phase_timer):
     for attempt in range(2):
         token = bearer_token_manager(refresh=(attempt == 1))
         try:
-            collection_query = cmr.queries.CollectionQuery(mode=cmr_mode)
-            variable_query = cmr.queries.VariableQuery(mode=cmr_mode)
-
-            collection_res = collection_query.concept_id(collection_concept_id).token(token).get()[0]
-            collection_associations = collection_res.get("associations")
-            variable_concept_ids = collection_associations.get("variables")
+            with phase_timer.phase("variable_fetch"):
+                variables = fetch_collection_variables(env, cmr_mode, collection_concept_id, token, umm_var_cache,
+                                                       request_session)
 
-            if variable_concept_ids is None:
+            if variables is None:
                 pytest.fail(f'There are no umm-v associated with this collection in {env}')
 
-            variables = []
-            for i in range(0, len(variable_concept_ids), 40):
-                variables_items = variable_query \
-                    .concept_id(variable_concept_ids[i:i + 40]) \
-                    .token(token) \
-                    .format('umm_json') \
-                    .get_all()
-                variables.extend(json.loads(variables_items[0]).get('items'))
-
             return variables
         except Exception as e:
             if attempt == 0 and is_auth_error(e):
@@ -715,6 +1038,10 @@ def get_science_vars(collection_variable_list: List[Dict]):
     return science_vars
 
 
+def get_science_var_names(collection_variable_list: List[Dict]) -> List[str]:
+    return [var['umm']['Name'] for var in get_science_vars(collection_variable_list) if 'Name' in var['umm']]
+
+
 def get_variable_name_from_umm_json(variable_umm_json) -> str:
     if 'umm' in variable_umm_json and 'Name' in variable_umm_json['umm']:
         name = variable_umm_json['umm']['Name']
@@ -756,6 +1083,12 @@ def create_smaller_bounding_box(east, west, north, south, scale_factor):
 
 
 def get_lat_lon_var_names(tree: xr.DataTree, collection_variable_list: List[Dict]):
+    lat_var_name, lon_var_name, _ = resolve_lat_lon_var_names(tree, collection_variable_list)
+    return lat_var_name, lon_var_name
+
+
+def resolve_lat_lon_var_names(tree: xr.DataTree, collection_variable_list: List[Dict]):
+    """Returns (lat_var_name, lon_var_name, method) where method names the step that found them."""
     dataset = tree.ds
     # Try getting it from UMM-Var first
     lat_var_json, lon_var_json, _ = get_coordinate_vars_from_umm(collection_variable_list)
@@ -763,7 +1096,7 @@ def get_lat_lon_var_names(tree: xr.DataTree, collection_variable_list: List[Dict
     lon_var_name = get_variable_name_from_umm_json(lon_var_json)
 
     if lat_var_name and lon_var_name:
-        return lat_var_name, lon_var_name
+        return lat_var_name, lon_var_name, "umm_var"
 
     logging.warning("Unable to find lat/lon vars in UMM-Var")
 
@@ -775,7 +1108,7 @@ def get_lat_lon_var_names(tree: xr.DataTree, collection_variable_list: List[Dict
         if lat_var_names and lon_var_names:
             lat_var_name = lat_var_names if isinstance(lat_var_names, str) else lat_var_names[0]
             lon_var_name = lon_var_names if isinstance(lon_var_names, str) else lon_var_names[0]
-            return lat_var_name, lon_var_name
+            return lat_var_name, lon_var_name, "l2ss-py"
 
     except ValueError:
         logging.warning("Unable to find lat/lon vars using l2ss-py")
@@ -786,7 +1119,7 @@ def get_lat_lon_var_names(tree: xr.DataTree, collection_variable_list: List[Dict
                          if lat.lower() in VALID_LATITUDE_VARIABLE_NAMES][0]
         longitude = [lon for lon in dataset.cf.coordinates['longitude']
                          if lon.lower() in VALID_LONGITUDE_VARIABLE_NAMES][0]
-        return latitude, longitude
+        return latitude, longitude, "cf_xarray"
     except:
         logging.warning("Unable to find lat/lon vars using cf_xarray")
 
@@ -799,206 +1132,404 @@ def get_lat_lon_var_names(tree: xr.DataTree, collection_variable_list: List[Dict
         if coord.attrs['units'] == 'degrees_east' and lon_var_name is None:
             lon_var_name = coord_name
     if lat_var_name and lon_var_name:
-        return lat_var_name, lon_var_name
+        return lat_var_name, lon_var_name, "units"
     else:
         logging.warning("Unable to find lat/lon vars using 'units' attribute")
 
     # Out of options, fail the test because we couldn't determine lat/lon variables
     pytest.fail(f"Unable to find latitude and longitude variables.")
 
-@pytest.mark.timeout(1200)
-def test_spatial_subset(collection_concept_id, env, granule_json, collection_variables,
-                        harmony_env, tmp_path: pathlib.Path, bearer_token_manager, skip_spatial, overrides, spatial_bbox):
-    test_spatial_subset.__doc__ = f"Verify spatial subset for {collection_concept_id} in {env}"
+def probe_subsetted_file(path, collection_variable_list: List[Dict], chunks=None, known: Optional[dict] = None):
+    """
+    Resolve lat/lon from the file header and open only them and the candidate science
+    variables. known is a previous resolution for the collection; when its variables are
+    in the file they are used directly.
 
-    collection_overrides = resolve_overrides(overrides, collection_concept_id)
-    if not should_run_generic("spatial", collection_overrides):
-        pytest.skip(f"Generic spatial disabled for {collection_concept_id}")
+    Returns (tree, resolution), or None to fall back to a full open. resolution holds
+    lat, lon, time, method and the candidate science variable paths.
+    """
+    header = netcdf_probe.probe_header(path)
+    if header is None:
+        return None
 
-    custom_tests = find_custom_tests(collection_concept_id, env)
-    if (custom_tests.get("collection") or custom_tests.get("group")) and not collection_overrides.get("also_run_generic", False):
-        pytest.skip(f"Custom collection/group tests present; skipping generic spatial for {collection_concept_id}")
-    if custom_tests.get("provider") and collection_overrides.get("replace_generic", False):
-        pytest.skip(f"Custom provider tests present; skipping generic spatial for {collection_concept_id}")
+    if known and header.find(known.get("lat")) and header.find(known.get("lon")):
+        resolution = dict(known, lat=header.find(known["lat"]).path, lon=header.find(known["lon"]).path)
+    else:
+        lat_var_json, lon_var_json, time_var_json = get_coordinate_vars_from_umm(collection_variable_list)
+        umm_names = (get_variable_name_from_umm_json(lat_var_json), get_variable_name_from_umm_json(lon_var_json))
+        lat_var_name, lon_var_name, method = netcdf_probe.resolve_lat_lon(
+            header, umm_names, VALID_LATITUDE_VARIABLE_NAMES, VALID_LONGITUDE_VARIABLE_NAMES)
+        if not (lat_var_name and lon_var_name):
+            logging.info("Unable to resolve lat/lon from the header of %s", path)
+            return None
+        resolution = {
+            "lat": lat_var_name,
+            "lon": lon_var_name,
+            "time": netcdf_probe.resolve_time(header, get_variable_name_from_umm_json(time_var_json)),
+            "method": method,
+        }
+
+    science_paths = rank_science_candidates(header, resolution, collection_variable_list)
+    resolution["science_candidates"] = science_paths[:PROBE_SCIENCE_VARIABLE_LIMIT]
+
+    # Only the top-ranked science variables are opened, with the coordinates they need
+    needed = [resolution["lat"], resolution["lon"], *resolution["science_candidates"]]
+    try:
+        tree = netcdf_probe.open_variables(path, header, needed, chunks)
+    except Exception as e:
+        logging.warning("Unable to open selected variables of %s, opening the whole file: %s", path, e)
+        return None
+    return tree, resolution
 
-    if collection_overrides.get("skip_spatial"):
-        pytest.skip(f"Spatial override skip for {collection_concept_id}")
-    if collection_concept_id in skip_spatial and not collection_overrides.get("force_spatial"):
-        pytest.skip(f"Known collection to skip for spatial testing {collection_concept_id}")
 
-    logging.info("Using granule %s for test", granule_json['meta']['concept-id'])
+def rank_science_candidates(header: netcdf_probe.FileHeader, resolution: dict,
+                            collection_variable_list: List[Dict]) -> List[str]:
+    """Ranked science variable paths for resolution's lat/lon, with a remembered choice first."""
+    lat, lon = header.find(resolution["lat"]), header.find(resolution["lon"])
+    if lat is None or lon is None:
+        return []
+    ranked = netcdf_probe.rank_science_variables(header.variables, lat.path, lon.path,
+                                                 get_science_var_names(collection_variable_list))
+    known = header.find(resolution.get("science"))
+    if known is not None and known.path in ranked:
+        ranked.remove(known.path)
+        ranked.insert(0, known.path)
+    return ranked
 
-    # Compute a box that is smaller than the chosen spatial extent.
+
+def tree_has_variables(tree: xr.DataTree, *paths: str) -> bool:
+    for path in paths:
+        try:
+            tree[path]
+        except KeyError:
+            return False
+    return True
+
+
+def select_science_variable(tree: xr.DataTree, candidates: List[str]):
+    """
+    Pick the science variable used to mask lat/lon from ranked candidate paths. A mask is
+    only built for the first candidate that opens, not for every variable tried.
+
+    Returns (science variable, mask, path), or (None, None, None).
+    """
+    for path in candidates:
+        try:
+            candidate = tree[path]
+        except KeyError:
+            continue
+        if not isinstance(candidate, xr.DataArray):
+            continue
+        try:
+            return candidate, subset_verification.science_mask(candidate), path
+        except Exception as e:
+            logging.info("Unable to mask with science variable %s: %s", path, e)
+    return None, None, None
+
+
+def get_spatial_subset_bounds(granule_json: dict, spatial_bbox, collection_overrides: dict):
+    """Compute a box that is smaller than the chosen spatial extent. Returns (north, south, east, west)."""
     if spatial_bbox:
         west, south, east, north = spatial_bbox
     else:
         north, south, east, west = get_bounding_box(granule_json)
     spatial_scale = collection_overrides.get("spatial_bbox_scale", DEFAULT_SPATIAL_BBOX_SCALE)
     east, west, north, south = create_smaller_bounding_box(east, west, north, south, float(spatial_scale))
+    return north, south, east, west
 
+
+def build_spatial_request(collection_concept_id: str, granule_json: dict, bounds) -> harmony.Request:
+    north, south, east, west = bounds
+    request_bbox = harmony.BBox(w=west, s=south, e=east, n=north)
+    request_collection = harmony.Collection(id=collection_concept_id)
+    return harmony.Request(collection=request_collection, spatial=request_bbox,
+                           granule_id=[granule_json['meta']['concept-id']])
+
+
+def build_temporal_request(collection_concept_id: str, granule_json: dict, collection_overrides: dict) -> harmony.Request:
     start_time = granule_json['umm']["TemporalExtent"]["RangeDateTime"]["BeginningDateTime"]
     end_time = granule_json['umm']["TemporalExtent"]["RangeDateTime"]["EndingDateTime"]
-    
-    request_bbox = harmony.BBox(w=west, s=south, e=east, n=north)
+    temporal_fraction = collection_overrides.get("temporal_fraction", DEFAULT_TEMPORAL_FRACTION)
+    temporal_subset = get_middle_temporal_extent(start_time, end_time, float(temporal_fraction))
+
     request_collection = harmony.Collection(id=collection_concept_id)
-    harmony_request = harmony.Request(collection=request_collection, spatial=request_bbox,
-                                      granule_id=[granule_json['meta']['concept-id']])
-    subsetted_filepath = None
-    for attempt in range(2):
+    return harmony.Request(collection=request_collection,
+                           granule_id=[granule_json['meta']['concept-id']],
+                           temporal=temporal_subset)
+
+
+def build_generic_requests(collection_concept_id: str, env: str, granule_json: dict, spatial_bbox,
+                           collection_overrides: dict, skip_lists: Dict[str, set],
+                           required_kind: Optional[str] = None) -> Dict[str, harmony.Request]:
+    """
+    Build the Harmony requests for every generic test that will run for a collection.
+    Errors building the request for required_kind are raised; errors for the other
+    kinds are only logged since their own test will report them.
+    """
+    builders = {
+        "spatial": lambda: build_spatial_request(
+            collection_concept_id, granule_json,
+            get_spatial_subset_bounds(granule_json, spatial_bbox, collection_overrides)),
+        "temporal": lambda: build_temporal_request(collection_concept_id, granule_json, collection_overrides),
+    }
+    harmony_requests = {}
+    for test_kind, build in builders.items():
+        if test_kind != required_kind and generic_skip_reason(
+                test_kind, collection_concept_id, env, collection_overrides, skip_lists[test_kind]):
+            continue
         try:
-            harmony_client = harmony.Client(env=harmony_env, token=bearer_token_manager(refresh=(attempt == 1)))
-            logging.info("Sending harmony request %s", harmony_client.request_as_url(harmony_request))
-
-            # Submit harmony request and download result
-            job_id = harmony_client.submit(harmony_request)
-            logging.info("Submitted harmony job %s", job_id)
-            harmony_client.wait_for_processing(job_id, show_progress=False)
-            for filename in [file_future.result()
-                             for file_future
-                             in harmony_client.download_all(job_id, directory=f'{tmp_path}', overwrite=True)]:
-                logging.info(f'Downloaded: %s', filename)
-                subsetted_filepath = pathlib.Path(filename)
-            break
+            harmony_requests[test_kind] = build()
         except Exception as e:
-            if attempt == 0 and is_auth_error(e):
-                logging.info("Auth error while running Harmony request. Refreshing token and retrying once.")
-                continue
-            raise
+            if test_kind == required_kind:
+                raise
+            logging.warning("Unable to build %s request for %s: %s", test_kind, collection_concept_id, e)
+    return harmony_requests
 
-    # Verify spatial subset worked
-    subsetted_tree = xr.open_datatree(subsetted_filepath, decode_times=False)
-    group = None
-    lat_var_name, lon_var_name = get_lat_lon_var_names(subsetted_tree, collection_variables)
 
-    assert lat_var_name and lon_var_name
+# Generic tests whose Harmony jobs are submitted together, by test function
+GENERIC_TEST_KINDS = {"test_spatial_subset": "spatial", "test_temporal_subset": "temporal"}
 
-    var_ds = None
-    msk = None
-
-    science_vars = get_science_vars(collection_variables)
-    if science_vars:
-        for var in science_vars:
-            science_var_name = var['umm']['Name']
-            candidate = subsetted_tree.get(science_var_name)
-            if isinstance(candidate, xr.DataArray):
-                var_ds = candidate
-                try:
-                    msk = np.logical_not(np.isnan(candidate.data.squeeze()))
-                    break
-                except Exception:
-                    continue
-        else:
-            var_ds, msk = None, None
-    else:
-        var_ds, msk = None, None
-        for node in subsetted_tree.subtree:
-            if node.is_empty:
-                continue
-            for science_var_name, var_candidate in node.data_vars.items():
-                if any(x in str(science_var_name) for x in (lat_var_name, lon_var_name, "time")):
-                    continue
-                try:
-                    msk = np.logical_not(np.isnan(var_candidate.data.squeeze()))
-                    var_ds = var_candidate
-                    break
-                except Exception:
-                    continue
-            if var_ds is not None:
+
+@pytest.fixture(scope="session")
+def scheduled_generic_tests(request) -> Dict[str, set]:
+    """
+    Generic test kinds selected to run for each collection in this session. Tests deselected
+    with -k or -m, or marked skip, are left out, so their Harmony jobs are never submitted.
+    """
+    scheduled = {}
+    for item in request.session.items:
+        kind = GENERIC_TEST_KINDS.get(getattr(item, "originalname", None))
+        callspec = getattr(item, "callspec", None)
+        concept_id = callspec.params.get("collection_concept_id") if callspec else None
+        if kind and concept_id and item.get_closest_marker("skip") is None:
+            scheduled.setdefault(concept_id, set()).add(kind)
+    return scheduled
+
+
+def upcoming_collection_ids(request, count: int) -> List[str]:
+    """
+    Collections parametrized on the tests queued after the current one, in run order. Empty
+    under pytest-xdist: every worker collects all the tests but only runs those the controller
+    sends it, so the tests after this one in session.items may run on other workers.
+    """
+    if os.environ.get("PYTEST_XDIST_WORKER"):
+        return []
+    current = request.node.callspec.params.get("collection_concept_id")
+    items = request.session.items
+    seen = {current}
+    upcoming = []
+    for item in items[items.index(request.node) + 1:]:
+        callspec = getattr(item, "callspec", None)
+        concept_id = callspec.params.get("collection_concept_id") if callspec else None
+        if concept_id and concept_id not in seen:
+            seen.add(concept_id)
+            upcoming.append(concept_id)
+            if len(upcoming) >= count:
                 break
+    return upcoming
 
-    if var_ds is None or msk is None:
-        logging.warning("Unable to find a science variable to use. Proceeding to test longitude and latitude only.")
-        llat = subsetted_tree[lat_var_name]
-        llon = subsetted_tree[lon_var_name]
-    else:
+
+@pytest.fixture(scope="session")
+def harmony_job_engine(harmony_env, bearer_token_manager, tmp_path_factory):
+    claims_dir = None
+    if os.environ.get("PYTEST_XDIST_WORKER"):
+        # Shared by all xdist workers of this run so each request is only submitted once
+        claims_dir = tmp_path_factory.getbasetemp().parent.joinpath("harmony_jobs")
+
+    engine = HarmonyJobEngine(
+        lambda refresh: make_harmony_client(harmony_env, bearer_token_manager(refresh=refresh)),
+        claims_dir=claims_dir,
+    )
+    yield engine
+    engine.close()
+
+
+@pytest.fixture(scope="function")
+def submit_harmony_jobs(request, pytestconfig, collection_concept_id, env, cmr_mode, granule_json, spatial_bbox,
+                        overrides, skip_spatial, skip_temporal, harmony_job_engine, authed_request, granule_cache,
+                        incremental_state, incremental_fingerprint, scheduled_generic_tests, phase_timer):
+    """
+    Submit the Harmony jobs for every generic test of this collection at once, plus those
+    of the next --harmony-lookahead collections in serial runs, and return the job for the
+    requested test. Only the tests selected in this session and not skipped get a job.
+    This collection's submissions are timed as harmony_submit, and the lookahead separately as
+    harmony_lookahead.
+    Jobs run in Harmony while earlier tests are still verifying their output.
+    """
+    skip_lists = {"spatial": skip_spatial, "temporal": skip_temporal}
+
+    def _submit_lookahead(upcoming: List[str]):
+        for concept_id in upcoming:
+            try:
+                upcoming_overrides = resolve_overrides(overrides, concept_id)
+                upcoming_bbox = resolve_spatial_bbox(pytestconfig, upcoming_overrides)
+                granule, _ = select_granule(env, cmr_mode, concept_id, authed_request, upcoming_bbox,
+                                           resolve_granule_concept_id(pytestconfig, upcoming_overrides),
+                                           granule_cache)
+                if granule is None:
+                    continue
+                unchanged = unchanged_test_kinds(incremental_state, incremental_fingerprint, env, concept_id, granule,
+                                                 upcoming_overrides)
+                scheduled = scheduled_generic_tests.get(concept_id, set())
+                harmony_job_engine.submit_many(
+                    harmony_request for kind, harmony_request in build_generic_requests(
+                        concept_id, env, granule, upcoming_bbox, upcoming_overrides, skip_lists).items()
+                    if kind in scheduled and kind not in unchanged)
+            except Exception as e:
+                logging.warning("Unable to submit lookahead harmony jobs for %s: %s", concept_id, e)
+
+    def _submit(test_kind: str) -> HarmonyJob:
+        collection_overrides = resolve_overrides(overrides, collection_concept_id)
+        with phase_timer.phase("harmony_submit"):
+            harmony_requests = build_generic_requests(collection_concept_id, env, granule_json, spatial_bbox,
+                                                      collection_overrides, skip_lists, required_kind=test_kind)
+            unchanged = unchanged_test_kinds(incremental_state, incremental_fingerprint, env, collection_concept_id,
+                                             granule_json, collection_overrides) - {test_kind}
+            scheduled = scheduled_generic_tests.get(collection_concept_id, set()) | {test_kind}
+            jobs = {kind: harmony_job_engine.submit(harmony_request)
+                    for kind, harmony_request in harmony_requests.items()
+                    if kind in scheduled and kind not in unchanged}
+        lookahead = pytestconfig.getoption("harmony_lookahead")
+        upcoming = upcoming_collection_ids(request, lookahead) if lookahead else []
+        if upcoming:
+            with phase_timer.phase("harmony_lookahead"):
+                _submit_lookahead(upcoming)
+        return jobs[test_kind]
+
+    return _submit
+
+
+def wait_for_harmony_job(harmony_job_engine: HarmonyJobEngine, job: HarmonyJob, phase_timer: PhaseTimer) -> dict:
+    """Wait for job, recording the time blocked on it and the time it spent queued and processing in Harmony."""
+    with phase_timer.phase("harmony_wait"):
         try:
-            msk = np.logical_not(np.isnan(var_ds.data.squeeze()))
-            llat = subsetted_tree[lat_var_name].where(msk)
-            llon = subsetted_tree[lon_var_name].where(msk)
-        except ValueError:
-            llat = subsetted_tree[lat_var_name]
-            llon = subsetted_tree[lon_var_name]
+            return harmony_job_engine.wait(job)
+        finally:
+            phase_timer.add("harmony_queue", seconds=job.queue_seconds())
+            phase_timer.add("harmony_processing", seconds=job.processing_seconds())
+
+
+@pytest.mark.timeout(1200)
+def test_spatial_subset(collection_concept_id, env, granule_json, collection_variables,
+                        tmp_path: pathlib.Path, skip_spatial, overrides, spatial_bbox,
+                        harmony_job_engine, submit_harmony_jobs, authed_request, verify_chunks,
+                        umm_var_cache, coordinate_cache, phase_timer, incremental_check):
+    test_spatial_subset.__doc__ = f"Verify spatial subset for {collection_concept_id} in {env}"
+
+    collection_overrides = resolve_overrides(overrides, collection_concept_id)
+    skip_reason = generic_skip_reason("spatial", collection_concept_id, env, collection_overrides, skip_spatial)
+    if skip_reason:
+        pytest.skip(skip_reason)
+
+    logging.info("Using granule %s for test", granule_json['meta']['concept-id'])
+
+    north, south, east, west = get_spatial_subset_bounds(granule_json, spatial_bbox, collection_overrides)
+
+    job = submit_harmony_jobs("spatial")
+    wait_for_harmony_job(harmony_job_engine, job, phase_timer)
+
+    result_urls = None
+    with phase_timer.phase("harmony_results"):
+        for attempt in range(2):
+            try:
+                harmony_client = harmony_job_engine.client(refresh=(attempt == 1))
+                result_urls = list(harmony_client.result_urls(job.job_id))
+                break
+            except Exception as e:
+                if attempt == 0 and is_auth_error(e):
+                    logging.info("Auth error while listing Harmony results. Refreshing token and retrying once.")
+                    continue
+                raise
+
+    with phase_timer.phase("download") as download_timing:
+        downloads = download_utils.download_all(authed_request, result_urls, tmp_path)
+    for result in downloads:
+        logging.info(f'Downloaded: %s', result.path)
+    download_summary = download_utils.summarize_downloads(f"harmony job {job.job_id}", downloads)
+    download_timing.update(files=download_summary["files"], bytes=download_summary["bytes"],
+                           bytes_per_second=download_summary["bytes_per_second"])
+    subsetted_filepath = downloads[-1].path if downloads else None
+
+    # Verify spatial subset worked
+    collection_entry = umm_var_cache.collection_entry(env, collection_concept_id)
+    known_coordinates = coordinate_cache.get(env, collection_concept_id, collection_entry)
+
+    with phase_timer.phase("open"):
+        probed = probe_subsetted_file(subsetted_filepath, collection_variables, verify_chunks, known_coordinates)
+        if probed is not None:
+            subsetted_tree, resolution = probed
+            lat_var_name, lon_var_name = resolution["lat"], resolution["lon"]
+        else:
+            subsetted_tree = subset_verification.open_subsetted_tree(subsetted_filepath, verify_chunks)
+            if known_coordinates and tree_has_variables(subsetted_tree, known_coordinates["lat"],
+                                                        known_coordinates["lon"]):
+                resolution = dict(known_coordinates)
+            else:
+                lat_var_name, lon_var_name, method = resolve_lat_lon_var_names(subsetted_tree, collection_variables)
+                resolution = {"lat": lat_var_name, "lon": lon_var_name, "time": None, "method": method}
+            tree_header = netcdf_probe.FileHeader(str(subsetted_filepath),
+                                                  variables=netcdf_probe.describe_tree(subsetted_tree))
+            resolution["science_candidates"] = rank_science_candidates(tree_header, resolution, collection_variables)
+            lat_var_name, lon_var_name = resolution["lat"], resolution["lon"]
+    group = None
+
+    assert lat_var_name and lon_var_name
 
-    lat_max = llat.max()
-    lat_min = llat.min()
+    with phase_timer.phase("verification"):
+        var_ds, msk, science_var_path = select_science_variable(subsetted_tree, resolution.pop("science_candidates"))
+        resolution["science"] = science_var_path
 
-    lon_min = llon.min()
-    lon_max = llon.max()
+        if var_ds is None or msk is None:
+            logging.warning("Unable to find a science variable to use. Proceeding to test longitude and latitude only.")
+            msk = None
 
-    lon_min = (lon_min + 180) % 360 - 180
-    lon_max = (lon_max + 180) % 360 - 180
+        lat_var_fill_value = subsetted_tree[lat_var_name].encoding.get('_FillValue')
+        lon_var_fill_value = subsetted_tree[lon_var_name].encoding.get('_FillValue')
 
-    lat_var_fill_value = subsetted_tree[lat_var_name].encoding.get('_FillValue')
-    lon_var_fill_value = subsetted_tree[lon_var_name].encoding.get('_FillValue')
+        bounds = subset_verification.verify_bounds(subsetted_tree[lat_var_name], subsetted_tree[lon_var_name], msk,
+                                                   (west, south, east, north),
+                                                   (lat_var_fill_value, lon_var_fill_value))
+    logging.info("Subset bounds check: %s", bounds)
 
     partial_pass = False
     if lat_var_fill_value:
-        if (lat_max <= north or np.isclose(lat_max, north)) and (lat_min >= south or np.isclose(lat_min, south)):
-            logging.info("Successful Latitude subsetting")
-        elif np.isnan(lat_max) and np.isnan(lat_min):
+        if bounds.lat_valid_count == 0:
             logging.info("Partial Lat Success - no Data")
             partial_pass = True
+        elif bounds.lat_in_bounds:
+            logging.info("Successful Latitude subsetting")
         else:
-            assert False
+            assert False, (f"{bounds.lat_out_of_bounds} latitude values outside [{south}, {north}] "
+                           f"(min {bounds.lat_min}, max {bounds.lat_max})")
 
     if lon_var_fill_value:
-        if (lon_max <= east or np.isclose(lon_max, east)) and (lon_min >= west or np.isclose(lon_min, west)):
-            logging.info("Successful Longitude subsetting")
-        elif np.isnan(lon_max) and np.isnan(lon_min):
+        if bounds.lon_valid_count == 0:
             logging.info("Partial Lon Success - no Data")
             partial_pass = True
+        elif bounds.lon_in_bounds:
+            logging.info("Successful Longitude subsetting")
         else:
-            assert False
+            assert False, (f"{bounds.lon_out_of_bounds} longitude values outside [{west}, {east}] "
+                           f"(min {bounds.lon_min}, max {bounds.lon_max})")
 
     if partial_pass:
-        valid_lon = np.isfinite(llon) & (llon != lon_var_fill_value)
-        valid_lat = np.isfinite(llat) & (llat != lat_var_fill_value)
-
-        if not np.any(valid_lon) or not np.any(valid_lat):
+        if not bounds.lon_valid_count or not bounds.lat_valid_count:
             pytest.fail("No data in lon and lat")
 
+    # Only remembered once the bounds checks passed, so a wrong pick is resolved again next run
+    coordinate_cache.put(env, collection_concept_id, collection_entry, resolution)
+
 @pytest.mark.timeout(1800)
 def test_temporal_subset(collection_concept_id, env, granule_json, collection_variables,
-                        harmony_env, tmp_path: pathlib.Path, bearer_token_manager, skip_temporal, overrides):
+                         skip_temporal, overrides, harmony_job_engine, submit_harmony_jobs, phase_timer,
+                         incremental_check):
     test_temporal_subset.__doc__ = f"Verify temporal subset for {collection_concept_id} in {env}"
 
     collection_overrides = resolve_overrides(overrides, collection_concept_id)
-    if not should_run_generic("temporal", collection_overrides):
-        pytest.skip(f"Generic temporal disabled for {collection_concept_id}")
+    skip_reason = generic_skip_reason("temporal", collection_concept_id, env, collection_overrides, skip_temporal)
+    if skip_reason:
+        pytest.skip(skip_reason)
 
-    custom_tests = find_custom_tests(collection_concept_id, env)
-    if (custom_tests.get("collection") or custom_tests.get("group")) and not collection_overrides.get("also_run_generic", False):
-        pytest.skip(f"Custom collection/group tests present; skipping generic temporal for {collection_concept_id}")
-    if custom_tests.get("provider") and collection_overrides.get("replace_generic", False):
-        pytest.skip(f"Custom provider tests present; skipping generic temporal for {collection_concept_id}")
-
-    if collection_overrides.get("skip_temporal"):
-        pytest.skip(f"Temporal override skip for {collection_concept_id}")
-    if collection_concept_id in skip_temporal and not collection_overrides.get("force_temporal"):
-        pytest.skip(f"Known collection to skip for temporal testing {collection_concept_id}")
-
-    start_time = granule_json['umm']["TemporalExtent"]["RangeDateTime"]["BeginningDateTime"]
-    end_time = granule_json['umm']["TemporalExtent"]["RangeDateTime"]["EndingDateTime"]
-    temporal_fraction = collection_overrides.get("temporal_fraction", DEFAULT_TEMPORAL_FRACTION)
-    temporal_subset = get_middle_temporal_extent(start_time, end_time, float(temporal_fraction))
-    
-    request_collection = harmony.Collection(id=collection_concept_id)
-    harmony_request = harmony.Request(collection=request_collection,
-                                      granule_id=[granule_json['meta']['concept-id']],
-                                      temporal=temporal_subset)
-    for attempt in range(2):
-        try:
-            harmony_client = harmony.Client(env=harmony_env, token=bearer_token_manager(refresh=(attempt == 1)))
-            logging.info("Sending harmony request %s", harmony_client.request_as_url(harmony_request))
-
-            # Submit harmony request and download result
-            job_id = harmony_client.submit(harmony_request)
-            logging.info("Submitted harmony job %s", job_id)
-            harmony_client.wait_for_processing(job_id, show_progress=False)
-            assert harmony_client.status(job_id).get('status') == "successful"
-            break
-        except Exception as e:
-            if attempt == 0 and is_auth_error(e):
-                logging.info("Auth error while running Harmony request. Refreshing token and retrying once.")
-                continue
-            raise
+    job = submit_harmony_jobs("temporal")
+    status = wait_for_harmony_job(harmony_job_engine, job, phase_timer)
+    assert status.get('status') == "successful"
@@ -1,24 +1,15 @@
 import sys
 import json
 from junitparser import JUnitXml, JUnitXmlError
-import re
+
+import failure_rules
 
 def extract_labels(case):
     """Extract labels based on test case results."""
     labels = []
     for result in case.result:
-        if hasattr(result, "message") and "No granules found" in str(result.message):
-            labels.append("No Granules")
-        if hasattr(result, "message") and "There are no umm-v associated with this collection" in str(result.message):
-            labels.append("No UMM-V")
-        if hasattr(result, "message") and re.search(r"Failed: Timeout \(>\d+(\.\d+)?s\) from pytest-timeout", str(result.message)):
-            labels.append("Timeout")
-        if hasattr(result, "message") and "Unable to download" in str(result.message):
-            labels.append("Forbidden")
-        if hasattr(result, "message") and "Could not determine time variable" in str(result.message):
-            labels.append("No Time Var")
-        if hasattr(result, "message") and "Unable to find latitude and longitude variables" in str(result.message):
-            labels.append("No Lat/Lon")
+        if hasattr(result, "message"):
+            labels.extend(failure_rules.labels(result.message))
 
     return labels
 